@@ -0,0 +1,170 @@
+"""
+전체 종목 동시 수집 엔진 (asyncio).
+
+quick_stock_check.get_stock_data와 같은 페이지(main·frgn·coinfo·sise_day)를 같은
+파서로 읽어 STOCK_DATA_COLUMN_ORDER 스키마의 행을 만들되, 종목별 페이지 요청을
+동시에 보냅니다. 동시 요청 수는 max_concurrency로, 초당 요청 수는 rate_limiter의
+호스트별 한도(다른 프로세스와 공유)로 제한됩니다.
+journal(crawl_journal.CrawlJournal)을 주면 끝난 종목을 바로 기록하고, 이미 기록된 종목은
+요청 없이 기록된 행을 씁니다.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from quick_stock_check import (
+    DAILY_URL,
+    FINANCE_URL,
+    INVESTOR_URL,
+    MAIN_URL,
+    MARKET_NAMES,
+    MARKET_SUM_URL,
+    build_stock_row,
+    fetch_soup,
+    parse_individual_stock_pages,
+    parse_market_sum_rows,
+    parse_max_page,
+    parse_prev_day,
+)
+from rate_limiter import get_limit, set_limit
+
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncStockCollector:
+    def __init__(self, max_concurrency=DEFAULT_CONCURRENCY, on_row=None, max_pages=None,
+                 journal=None):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.on_row = on_row
+        self.max_pages = max_pages
+        self.journal = journal
+        self.collected = 0
+        self.skipped = 0
+
+    async def _soup(self, url):
+        """동시 요청 수 한도 안에서 페이지를 받아 파싱 (요청 한도 대기·블로킹 I/O는 스레드풀)."""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fetch_soup, url)
+
+    async def _collect_stock(self, market_name, listing):
+        name, code, current_price, current_volume = listing
+        if self.journal is not None and code in self.journal:
+            return self.journal.row(code)
+
+        try:
+            main_soup, investor_soup, finance_soup, daily_soup = await asyncio.gather(
+                self._soup(MAIN_URL.format(code=code)),
+                self._soup(INVESTOR_URL.format(code=code)),
+                self._soup(FINANCE_URL.format(code=code)),
+                self._soup(DAILY_URL.format(code=code)),
+            )
+            loop = asyncio.get_running_loop()
+            details = await loop.run_in_executor(
+                self._executor, parse_individual_stock_pages,
+                main_soup, investor_soup, finance_soup,
+            )
+        except Exception as e:
+            # 저널에 남기지 않음 (--resume 때 다시 수집)
+            print(f"{name} 데이터 수집 오류: {str(e)}")
+            return None
+
+        per, pbr, roe = details[:3]
+        # ETF/펀드 추가 필터링: 받은 종목 페이지에 PER, PBR, ROE가 모두 없으면 제외
+        if not per and not pbr and not roe:
+            print(f"  - {name}: PER/PBR/ROE 데이터 없음 (ETF/펀드로 추정) - 제외")
+            self.skipped += 1
+            if self.journal is not None:
+                self.journal.mark_skipped(code)
+            return None
+
+        if not all([name, code, current_price]):
+            return None
+
+        try:
+            prev_close, prev_volume = parse_prev_day(daily_soup)
+            row = build_stock_row(
+                name, code, market_name, current_price, current_volume,
+                details, prev_close, prev_volume,
+            )
+        except Exception as e:
+            print(f"오류 발생 - 종목: {name}, 오류: {str(e)}")
+            return None
+
+        self.collected += 1
+        if self.journal is not None:
+            self.journal.append(row)
+        if self.on_row:
+            self.on_row(row)
+        if self.collected % 50 == 0:
+            elapsed = time.monotonic() - self._started
+            print(f"  - {self.collected}개 종목 수집 완료 ({elapsed:.0f}초, 최근: {name})")
+        return row
+
+    async def _collect_page(self, market_type, page, first_soup=None):
+        market_name = MARKET_NAMES[market_type]
+        try:
+            soup = first_soup
+            if soup is None:
+                soup = await self._soup(
+                    MARKET_SUM_URL.format(market_type=market_type, page=page)
+                )
+            listings = parse_market_sum_rows(soup)
+        except Exception as e:
+            print(f"{market_name} 페이지 {page} 수집 오류: {str(e)}")
+            return []
+
+        rows = await asyncio.gather(
+            *(self._collect_stock(market_name, listing) for listing in listings)
+        )
+        return [row for row in rows if row]
+
+    async def _collect_market(self, market_type):
+        market_name = MARKET_NAMES[market_type]
+        first = await self._soup(MARKET_SUM_URL.format(market_type=market_type, page=1))
+        max_page = parse_max_page(first)
+        if self.max_pages:
+            max_page = min(max_page, self.max_pages)
+        print(f"{market_name} 전체 페이지 수: {max_page}")
+
+        pages = await asyncio.gather(
+            self._collect_page(market_type, 1, first_soup=first),
+            *(self._collect_page(market_type, page) for page in range(2, max_page + 1)),
+        )
+        rows = [row for page_rows in pages for row in page_rows]
+        print(f"{market_name} 수집 완료: {len(rows)}개 종목")
+        return rows
+
+    async def run(self, market_types=(0, 1)):
+        """시장별 목록 → 종목별 상세를 동시 수집. 결과는 목록 페이지 순서를 유지."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            self._executor = executor
+            markets = await asyncio.gather(
+                *(self._collect_market(market_type) for market_type in market_types)
+            )
+        return [row for market_rows in markets for row in market_rows]
+
+
+def collect_stock_data(max_concurrency=DEFAULT_CONCURRENCY, requests_per_second=None,
+                       on_row=None, market_types=(0, 1), max_pages=None, journal=None):
+    """
+    get_stock_data()와 같은 행 목록을 동시 수집으로 반환.
+    requests_per_second: 지정 시 이 프로세스의 finance.naver.com 한도를 덮어씀.
+    on_row: 종목 한 건이 완료될 때마다 호출되는 콜백 (완료 순서).
+    max_pages: 시장별 목록 페이지 수 상한 (테스트·벤치마크용).
+    journal: CrawlJournal (중단 후 이어서 수집).
+    """
+    if requests_per_second is not None:
+        set_limit('finance.naver.com', requests_per_second)
+    rps, burst = get_limit('finance.naver.com')
+
+    collector = AsyncStockCollector(
+        max_concurrency=max_concurrency, on_row=on_row, max_pages=max_pages, journal=journal
+    )
+    print(
+        f"동시 수집: 최대 {collector.max_concurrency}개 요청, "
+        f"초당 {rps:g}회 이하 (버스트 {burst:g})"
+    )
+    return asyncio.run(collector.run(market_types=market_types))
@@ -1,78 +1,23 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
-import glob
-import re
+
+import contrarian_scoring
+import snapshot_catalog
+from stock_snapshot import load_snapshot
 
 def find_latest_stock_data_file():
-    """가장 최신 주식 데이터 파일을 찾기"""
-    
-    # 패턴에 맞는 모든 파일 찾기
-    patterns = [
-        'full_stock_data_*.xlsx',
-        'stock_data_*.xlsx', 
-        '*stock_data*.xlsx'
-    ]
-    
-    all_files = []
-    for pattern in patterns:
-        files = glob.glob(pattern)
-        all_files.extend(files)
-    
-    if not all_files:
+    """가장 최신 주식 데이터 스냅샷 (snapshot_catalog)"""
+    entry = snapshot_catalog.latest()
+    if not entry:
         print("❌ 주식 데이터 파일을 찾을 수 없습니다.")
-        print("다음 형식의 파일이 필요합니다:")
-        print("  - full_stock_data_YYYYMMDD_HHMM.xlsx")
+        print("먼저 quick_stock_check.py로 데이터를 수집하세요.")
         return None
     
-    # 중복 제거
-    unique_files = list(set(all_files))
-    
-    # 파일명에서 날짜/시간 추출하여 정렬
-    file_info = []
-    for file in unique_files:
-        # 날짜시간 패턴 찾기 (YYYYMMDD_HHMM)
-        match = re.search(r'(\d{8}_\d{4})', file)
-        if match:
-            datetime_str = match.group(1)
-            try:
-                file_datetime = datetime.strptime(datetime_str, '%Y%m%d_%H%M')
-                file_info.append((file, file_datetime))
-            except:
-                continue
-    
-    if not file_info:
-        print(f"❌ 날짜 형식을 인식할 수 있는 파일이 없습니다.")
-        print(f"발견된 파일들: {unique_files}")
-        return None
-    
-    # 날짜순으로 정렬 (최신이 맨 마지막)
-    file_info.sort(key=lambda x: x[1])
-    latest_file = file_info[-1][0]
-    
-    print(f"📁 최신 데이터 파일 발견: {latest_file}")
-    print(f"📅 수집 시간: {file_info[-1][1].strftime('%Y년 %m월 %d일 %H시 %M분')}")
-    return latest_file
-
-def clean_numeric_data(value):
-    """문자열 숫자 데이터를 float로 변환"""
-    if pd.isna(value) or value == '' or value == 'N/A':
-        return np.nan
-    
-    if isinstance(value, str):
-        value = value.replace(',', '')
-        if value.startswith('-'):
-            try:
-                return -float(value[1:])
-            except:
-                return np.nan
-        try:
-            return float(value)
-        except:
-            return np.nan
-    
-    return float(value) if not pd.isna(value) else np.nan
+    collected = datetime.fromisoformat(entry['collected_at'])
+    print(f"📁 최신 데이터 파일 발견: {entry['path']}")
+    print(f"📅 수집 시간: {collected.strftime('%Y년 %m월 %d일 %H시 %M분')}")
+    return entry['path']
 
 def analyze_stocks():
     """주식 분석 실행"""
@@ -88,17 +33,10 @@ def analyze_stocks():
     
     try:
         # 데이터 읽기
-        df = pd.read_excel(latest_file)
+        df = load_snapshot(latest_file)
         print(f"✅ 총 {len(df)}개 종목 데이터 로드 완료")
         
-        # 숫자 데이터 정리
-        df['PER'] = df['PER'].apply(clean_numeric_data)
-        df['PBR'] = df['PBR'].apply(clean_numeric_data)
-        df['ROE'] = df['ROE'].apply(clean_numeric_data)
-        df['현재가'] = df['현재가'].apply(clean_numeric_data)
-        df['전일종가'] = df['전일종가'].apply(clean_numeric_data)
-        df['거래량'] = df['거래량'].apply(clean_numeric_data)
-        df['전일거래량'] = df['전일거래량'].apply(clean_numeric_data)
+        # 숫자 열(PER·현재가·거래량 등)은 load_snapshot이 float64로 반환 (stock_schema)
         
         # 가격 변화율 계산
         df['가격변화율'] = ((df['현재가'] - df['전일종가']) / df['전일종가'] * 100).round(2)
@@ -118,54 +56,8 @@ def analyze_stocks():
         
         print(f"📊 분석 가능한 종목: {len(valid_data)}개")
         
-        # 조건별 점수 계산
-        def calculate_score(row):
-            score = 0
-            
-            # 1. 거래량 급증 (관심도 증가)
-            if row['거래량변화율'] >= 200:  # 200% 이상 급증
-                score += 30
-            elif row['거래량변화율'] >= 100:  # 100% 이상 급증
-                score += 25
-            elif row['거래량변화율'] >= 50:   # 50% 이상 급증
-                score += 20
-            elif row['거래량변화율'] >= 30:   # 30% 이상 급증
-                score += 15
-            
-            # 2. 낮은 PER (저평가)
-            if 0 < row['PER'] <= 5:      # 매우 저평가
-                score += 25
-            elif 5 < row['PER'] <= 10:   # 저평가
-                score += 20
-            elif 10 < row['PER'] <= 15:  # 적정
-                score += 15
-            elif 15 < row['PER'] <= 20:  # 보통
-                score += 10
-            
-            # 3. 높은 ROE (수익성)
-            if row['ROE'] >= 20:         # 매우 우수
-                score += 25
-            elif row['ROE'] >= 15:       # 우수
-                score += 20
-            elif row['ROE'] >= 10:       # 양호
-                score += 15
-            elif row['ROE'] >= 5:        # 보통
-                score += 10
-            elif row['ROE'] >= 3:        # 최소 수준
-                score += 5
-            
-            # 4. 가격 조정 후 반등 (역발상)
-            if -3 <= row['가격변화율'] <= -0.5:  # 소폭 하락
-                score += 15
-            elif -7 <= row['가격변화율'] < -3:   # 중간 하락
-                score += 10
-            elif 0 <= row['가격변화율'] <= 3:    # 보합~소폭상승
-                score += 5
-            
-            return score
-        
-        # 점수 계산
-        valid_data['투자점수'] = valid_data.apply(calculate_score, axis=1)
+        # 조건별 점수 계산 (거래량 급증·낮은 PER·높은 ROE·소폭 조정)
+        valid_data['투자점수'] = contrarian_scoring.score(valid_data, contrarian_scoring.WEEKLY_RISE)
         
         # 점수순 정렬
         result = valid_data.sort_values('투자점수', ascending=False)
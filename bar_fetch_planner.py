@@ -0,0 +1,131 @@
+"""
+일봉 조회 계획 (단계별 필요 봉 수를 모아 종목마다 한 번만 받기).
+
+daily_auto 한 번 실행에서 같은 종목의 sise_day 페이지를 단계마다 따로 받았습니다.
+    quick_stock_check          1페이지 (전일 종가·거래량, 2봉)
+    ma20_breakout_screener     1~4페이지 (20일선 돌파, 21봉)
+    리바운드(ReboundAnalyzer)  1~41페이지 (360일선 전략, 380봉)
+수집 직후 각 단계가 볼 종목과 필요한 봉 수를 먼저 모아, 종목마다 가장 긴 요구량으로
+일봉 저장소(ohlcv_store)를 한 번만 갱신합니다. 이후 단계는 저장소에서 읽고,
+daily_auto가 설정하는 OHLCV_FRESH_SINCE 덕분에 이미 갱신한 종목은 다시 요청하지 않습니다.
+quick_stock_check의 1페이지는 ohlcv_store의 최근 봉 갱신과 같은 URL이라 응답 캐시로 한 번만 받습니다.
+
+    plan = BarFetchPlan()
+    plan.require('ma20_breakout', codes)      단계 요구 추가 (봉 수는 STAGE_LOOKBACK)
+    plan.execute()                            종목마다 ohlcv_store.update(code, 최대 lookback) 한 번
+    daily_plan(df)                            스냅샷에서 daily_auto 단계별 대상 종목으로 계획
+
+    python bar_fetch_planner.py               최신 스냅샷 기준 일괄 갱신
+    python bar_fetch_planner.py --dry-run     계획만 출력
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import sys
+import time
+
+import pandas as pd
+
+import ohlcv_store
+import snapshot_catalog
+from stock_classifier import classify
+from stock_snapshot import load_snapshot
+
+# 단계별 저장소 조회 길이 (필요 봉 수보다 여유 있게, 각 단계가 update에 넘기는 값과 같음)
+STAGE_LOOKBACK = {
+    'quick_stock_check': ohlcv_store.RECENT_PAGE_ROWS,  # 2봉 (전일 종가·거래량)
+    'ma20_breakout': 40,                                # 21봉 (fetch_daily_prices 4페이지)
+    'rebound': 400,                                     # 380봉 (ReboundAnalyzer.update_bars)
+}
+
+
+def _code_key(code) -> str:
+    return str(code).replace('.0', '').zfill(6)
+
+
+class BarFetchPlan:
+    """단계별 일봉 요구를 모아 종목마다 가장 긴 lookback으로 한 번 갱신"""
+
+    def __init__(self):
+        self.lookbacks = {}
+        self.stages = {}
+
+    def require(self, stage: str, codes, lookback: int | None = None) -> None:
+        lookback = lookback or STAGE_LOOKBACK[stage]
+        codes = [_code_key(c) for c in codes]
+        self.stages[stage] = (len(codes), lookback)
+        for code in codes:
+            if lookback > self.lookbacks.get(code, 0):
+                self.lookbacks[code] = lookback
+
+    def __len__(self):
+        return len(self.lookbacks)
+
+    def requests_saved(self) -> int:
+        """단계마다 따로 갱신했을 때보다 줄어드는 종목별 갱신 횟수"""
+        return sum(count for count, _ in self.stages.values()) - len(self.lookbacks)
+
+    def execute(self, progress_every: int = 100) -> dict:
+        """종목마다 ohlcv_store.update 한 번 → {'updated': 성공 종목 수, 'bars': 새로 쓴 봉 수, 'failed': [코드]}"""
+        # 긴 요구부터 (처음 보는 종목은 짧게 받았다가 다시 받지 않도록 한 번에 최대 길이로)
+        order = sorted(self.lookbacks.items(), key=lambda item: -item[1])
+        summary = {'updated': 0, 'bars': 0, 'failed': []}
+        for i, (code, lookback) in enumerate(order, start=1):
+            if progress_every and i % progress_every == 0:
+                print(f"   ... 일봉 갱신 {i}/{len(order)}")
+            try:
+                summary['bars'] += ohlcv_store.update(code, lookback=lookback)
+                summary['updated'] += 1
+            except Exception as e:
+                print(f"  [일봉] {code} 갱신 실패: {e}")
+                summary['failed'].append(code)
+        return summary
+
+
+def daily_plan(df: pd.DataFrame) -> BarFetchPlan:
+    """
+    daily_auto 단계별 대상 종목으로 계획 (quick_stock_check는 전일 값을 수집 중에 이미 얻으므로 제외).
+    - ma20_breakout: ROE > MIN_ROE (ma20_breakout_screener와 같은 필터)
+    - rebound: 일반 주식 (daily_rebound_analysis와 같은 classify)
+    """
+    from ma20_breakout_screener import MIN_ROE
+
+    plan = BarFetchPlan()
+    codes = df['종목코드'].astype('string').fillna('')
+    names = df['종목명'].astype('string').fillna('') if '종목명' in df.columns else [''] * len(df)
+    if 'ROE' in df.columns:
+        plan.require('ma20_breakout', codes[(df['ROE'] > MIN_ROE).to_numpy()])
+    plan.require('rebound', [code for code, name in zip(codes, names) if code and classify(code, name)])
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="단계별 일봉 요구를 모아 종목마다 한 번만 갱신")
+    parser.add_argument('--dry-run', action='store_true', help='계획만 출력')
+    args = parser.parse_args()
+
+    entry = snapshot_catalog.latest()
+    if not entry:
+        print('[오류] full_stock_data 스냅샷이 없습니다. 먼저 quick_stock_check.py를 실행하세요.')
+        return 1
+
+    plan = daily_plan(load_snapshot(entry['path']))
+    print(f"📊 일봉 조회 계획: {len(plan):,}종목 (단계별 중복 갱신 {plan.requests_saved():,}회 절약)")
+    for stage, (count, lookback) in plan.stages.items():
+        print(f"  - {stage}: {count:,}종목 × 최근 {lookback}봉")
+    if args.dry_run:
+        return 0
+
+    started = time.perf_counter()
+    summary = plan.execute()
+    print(f"✅ 일봉 갱신 {summary['updated']:,}종목, 새 봉 {summary['bars']:,}개 "
+          f"({time.perf_counter() - started:.1f}초)")
+    if summary['failed']:
+        print(f"❌ 갱신 실패 {len(summary['failed'])}종목 (해당 단계에서 다시 시도)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+HTML 파서 백엔드 비교 (녹화된 픽스처 기준).
+
+각 백엔드(html.parser, lxml, ...)로 픽스처를 파싱해 quick_stock_check·price_history의
+추출 함수를 돌리고, 걸린 시간과 html.parser 결과와의 일치 여부를 출력합니다.
+추출값이 하나라도 다르면 종료 코드 1 (백엔드를 바꾸기 전 확인용).
+
+    python naver_fixture_server.py record        # 픽스처 녹화 (최초 1회)
+    python bench_parsers.py --repeat 3
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from html_parser import FALLBACK_PARSER, is_available, make_soup
+from naver_fixture_server import DAILY_PATH, DEFAULT_FIXTURE_DIR, MARKET_SUM_PATH, FixtureStore
+from price_history import parse_sise_day_rows
+from quick_stock_check import (
+    parse_individual_stock_pages,
+    parse_market_sum_rows,
+    parse_max_page,
+    parse_prev_day,
+)
+
+CANDIDATE_PARSERS = ['html.parser', 'lxml', 'html5lib']
+
+
+def build_jobs(store: FixtureStore):
+    """(이름, 입력 텍스트 목록, 추출 함수) 목록. 추출 함수는 soup 목록을 받아 비교 가능한 값을 반환."""
+    texts = {k: store.text(k) for k in store.manifest}
+    jobs = []
+    for key in sorted(k for k in texts if k.startswith(MARKET_SUM_PATH)):
+        jobs.append((key, [texts[key]], lambda s: (parse_max_page(s[0]), parse_market_sum_rows(s[0]))))
+    for code, keys in store.stock_pages():
+        jobs.append((f"stock:{code}", [texts[k] for k in keys], lambda s: parse_individual_stock_pages(*s)))
+    for key in sorted(k for k in texts if k.startswith(DAILY_PATH)):
+        jobs.append((key, [texts[key]], lambda s: (parse_prev_day(s[0]), parse_sise_day_rows(s[0]))))
+    return jobs
+
+
+def run_parser(parser: str, jobs, repeat: int):
+    """(초, {작업 이름: 추출값})"""
+    results = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, markups, extract in jobs:
+            results[name] = extract([make_soup(m, parser) for m in markups])
+    return time.perf_counter() - started, results
+
+
+def bench_selectolax(jobs, repeat: int):
+    """selectolax는 BeautifulSoup API가 아니라 추출값 비교 없이 트리 생성 시간만 측정."""
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        return None
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, markups, _ in jobs:
+            for m in markups:
+                HTMLParser(m)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 파서 백엔드 속도·추출값 비교")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_FIXTURE_DIR, help="픽스처 폴더")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--parsers", nargs="+", default=CANDIDATE_PARSERS)
+    parser.add_argument("--show", type=int, default=5, help="불일치 예시 출력 개수")
+    args = parser.parse_args()
+
+    store = FixtureStore(args.dir)
+    if not store.manifest:
+        print(f"[오류] 픽스처가 없습니다: {args.dir} (먼저 naver_fixture_server.py record 실행)")
+        return 2
+
+    jobs = build_jobs(store)
+    pages = sum(len(markups) for _, markups, _ in jobs)
+    print(f"📊 파서 벤치마크: 작업 {len(jobs)}개 / 페이지 {pages}개 × {args.repeat}회")
+
+    baseline_time, baseline = run_parser(FALLBACK_PARSER, jobs, args.repeat)
+    print(f"  - {FALLBACK_PARSER:12s} {baseline_time:7.2f}초 (기준)")
+
+    mismatched = False
+    for name in args.parsers:
+        if name == FALLBACK_PARSER:
+            continue
+        if not is_available(name):
+            print(f"  - {name:12s} 설치되지 않음")
+            continue
+        elapsed, results = run_parser(name, jobs, args.repeat)
+        diffs = [job for job in baseline if results.get(job) != baseline[job]]
+        verdict = "추출값 동일" if not diffs else f"❌ 추출값 불일치 {len(diffs)}건"
+        print(f"  - {name:12s} {elapsed:7.2f}초 ({baseline_time / elapsed:.2f}배) {verdict}")
+        for job in diffs[:args.show]:
+            print(f"      {job}\n        {FALLBACK_PARSER}: {baseline[job]}\n        {name}: {results.get(job)}")
+        mismatched = mismatched or bool(diffs)
+
+    tree_only = bench_selectolax(jobs, args.repeat)
+    if tree_only is not None:
+        print(f"  - {'selectolax':12s} {tree_only:7.2f}초 (트리 생성만, 추출 함수 미지원)")
+
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
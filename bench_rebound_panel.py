@@ -0,0 +1,163 @@
+"""
+리바운드 전략 계산 비교 (종목별 분석 vs 패널 모드).
+
+가상 일봉(랜덤워크 + 거래량 급감·45일선·360일선 패턴)을 종목 수만큼 만들어,
+ReboundAnalyzer의 종목별 분석(analyze_volume_drop / analyze_ma45 / analyze_ma360)과
+rebound_panel 패널 계산의 결과 dict가 같은지 확인하고 계산 시간만 비교합니다 (일봉 수집 제외).
+패널은 두 가지로 계산합니다: 전체 일봉에서 rolling / 이동평균 상태(ma_state) + 최근 60봉.
+결과가 하나라도 다르면 종료 코드 1.
+
+    python bench_rebound_panel.py                 # 2,500종목 × 400봉
+    python bench_rebound_panel.py --stocks 500
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import ma_state
+import rebound_panel
+from rebound_strategies_analyzer import ReboundAnalyzer
+
+
+def _pattern(rng, close, volume, open_):
+    """마지막 구간에 전략별 패턴을 무작위로 넣음 (신호가 나오는 종목이 생기도록)."""
+    n = len(close)
+    kind = rng.integers(0, 4)
+    if kind == 1 and n >= 3:
+        # 거래량 급감: 그저께 대비 어제 폭증, 오늘 급감 + 음봉
+        volume[-2] = volume[-3] * rng.uniform(4, 12)
+        volume[-1] = volume[-2] * rng.uniform(0.05, 0.3)
+        open_[-1] = close[-1] * rng.uniform(1.0, 1.04)
+    elif kind == 2 and n >= 60:
+        # 45일선: 급등 후 하락하며 거래량 감소
+        at = n - rng.integers(8, 50)
+        close[at:] *= 1.25
+        drift = np.linspace(1.0, rng.uniform(0.75, 0.95), n - at)
+        close[at:] *= drift
+        volume[at:at + 5] *= 4
+    elif kind == 3 and n >= 380:
+        # 360일선: 우상향 후 -10% 이상 이탈, 최근 회복
+        close[:] *= np.linspace(0.7, 1.0, n)
+        at = n - rng.integers(20, 55)
+        close[at:at + 8] *= rng.uniform(0.75, 0.88)
+        volume[-5:] *= rng.uniform(0.8, 2.0)
+    return close, volume, open_
+
+
+def make_histories(stocks: int, bars: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2026-10-16', periods=bars)
+    histories = {}
+    for i in range(stocks):
+        n = bars if rng.random() > 0.1 else int(rng.integers(2, bars))
+        close = 10_000 * np.cumprod(1 + rng.normal(0, 0.02, n))
+        volume = rng.lognormal(11, 1, n).round()
+        open_ = close * (1 + rng.normal(0, 0.01, n))
+        close, volume, open_ = _pattern(rng, close, volume, open_)
+        close = close.round()
+        histories[f'{i:06d}'] = pd.DataFrame({
+            'date': dates[-n:],
+            'open': open_.round(),
+            'high': np.maximum(open_, close).round() + rng.integers(0, 200, n),
+            'low': np.minimum(open_, close).round(),
+            'close': close,
+            'volume': volume.astype('int64'),
+        })
+    return histories
+
+
+def analyze_per_stock(stocks, histories) -> dict:
+    """기존 방식: 종목마다 지표를 계산하고 전략 함수 호출 (analyze_stock과 같은 조건)."""
+    analyzer = ReboundAnalyzer()
+    for stock in stocks:
+        df = ReboundAnalyzer.add_indicators(histories[stock['종목코드']].copy())
+        n = len(df)
+        for key, func in (('volume_drop', analyzer.analyze_volume_drop),
+                          ('ma45', analyzer.analyze_ma45),
+                          ('ma360', analyzer.analyze_ma360)):
+            if n >= rebound_panel.MIN_BARS[key]:
+                result = func(stock, df)
+                if result:
+                    analyzer.results[key].append(result)
+    return analyzer.get_results()
+
+
+def make_states(histories) -> dict:
+    """저장된 이동평균 상태 대신 (실제로는 ma_state.refresh가 봉마다 갱신해 둔 값)"""
+    return {
+        code: ma_state.MovingAverageState.build(code, df['date'].dt.strftime('%Y-%m-%d'), df['close'])
+        for code, df in histories.items()
+    }
+
+
+def _same(a, b) -> bool:
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return type(a) is type(b)
+    return type(a) is type(b) and a == b
+
+
+def compare(expected: dict, actual: dict) -> list[str]:
+    """다른 항목 설명 목록"""
+    diffs = []
+    for key in rebound_panel.STRATEGIES:
+        if len(expected[key]) != len(actual[key]):
+            diffs.append(f"{key}: {len(expected[key])}건 vs {len(actual[key])}건")
+            continue
+        for old, new in zip(expected[key], actual[key]):
+            if list(old) != list(new) or not all(_same(old[k], new[k]) for k in old):
+                diffs.append(f"{key} {old.get('code')}: {old} vs {new}")
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리바운드 전략 종목별 vs 패널 계산 비교")
+    parser.add_argument("--stocks", type=int, default=2_500)
+    parser.add_argument("--bars", type=int, default=400)
+    parser.add_argument("--show", type=int, default=5, help="불일치 예시 출력 개수")
+    args = parser.parse_args()
+
+    histories = make_histories(args.stocks, args.bars)
+    stocks = [{'종목코드': code, '종목명': f'종목{code}'} for code in histories]
+    print(f"📊 리바운드 전략 계산: {len(stocks):,}종목 × 최대 {args.bars}봉 (일봉 수집 제외)")
+
+    started = time.perf_counter()
+    expected = analyze_per_stock(stocks, histories)
+    before = time.perf_counter() - started
+
+    # ohlcv_store.load_frame과 같은 형태 (종목코드 열 + 일봉, 종목별로 모여 있음)
+    bars = pd.concat([df.assign(code=code) for code, df in histories.items()], ignore_index=True)
+    started = time.perf_counter()
+    actual = ReboundAnalyzer().analyze_universe(stocks, bars=bars)
+    after = time.perf_counter() - started
+
+    states = make_states(histories)
+    recent = bars.groupby('code', sort=False).tail(rebound_panel.WINDOW)
+    started = time.perf_counter()
+    with_states = ReboundAnalyzer().analyze_universe(stocks, bars=recent, states=states)
+    after_states = time.perf_counter() - started
+
+    counts = ', '.join(f"{key} {len(expected[key])}건" for key in rebound_panel.STRATEGIES)
+    print(f"  - 종목별 분석                  {before:8.2f}초")
+    print(f"  - 패널 (전체 일봉 rolling)     {after:8.2f}초 ({before / after:.0f}배)")
+    print(f"  - 패널 (이동평균 상태 + {rebound_panel.WINDOW}봉) {after_states:8.2f}초 ({before / after_states:.0f}배)")
+    print(f"  - 신호: {counts}")
+
+    diffs = compare(expected, actual) + [f"[상태] {line}" for line in compare(expected, with_states)]
+    if diffs:
+        print(f"❌ 결과 불일치 {len(diffs)}건")
+        for line in diffs[:args.show]:
+            print(f"      {line}")
+        return 1
+    print("✅ 결과 동일")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+fill_trading_amounts_df 속도 비교 (행 단위 기준 구현 vs 열 단위 구현).
+
+수집 직후처럼 문자열('1,234', '')이 섞인 표와 스냅샷처럼 float64로 변환된 표를 행 수별로 만들어
+두 구현의 결과가 값·dtype·셀 타입까지 같은지 확인하고 걸린 시간을 출력합니다.
+결과가 하나라도 다르면 종료 코드 1.
+
+    python bench_trading_amounts.py                       # 3,000행 / 300,000행
+    python bench_trading_amounts.py --rows 3000 --repeat 5
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from stock_data_utils import (
+    _is_empty,
+    calc_change_rate_pct,
+    calc_trading_amount,
+    ensure_trading_amount_columns,
+    fill_trading_amounts_df,
+    reorder_stock_data_columns,
+)
+from stock_schema import coerce_stock_frame
+
+
+def fill_trading_amounts_rowwise(df: pd.DataFrame) -> pd.DataFrame:
+    """기존(행 단위) 구현. 결과 비교 기준."""
+    if df is None or len(df) == 0:
+        return df
+
+    out = ensure_trading_amount_columns(df)
+    for target, price_col, volume_col in (('거래대금', '현재가', '거래량'),
+                                          ('전일거래대금', '전일종가', '전일거래량')):
+        for idx in out.index:
+            if _is_empty(out.at[idx, target]):
+                val = calc_trading_amount(
+                    out.at[idx, price_col] if price_col in out.columns else None,
+                    out.at[idx, volume_col] if volume_col in out.columns else None,
+                )
+                if val is not None:
+                    out.at[idx, target] = val
+
+    rates = []
+    for idx in out.index:
+        rate = calc_change_rate_pct(out.at[idx, '거래대금'], out.at[idx, '전일거래대금'])
+        rates.append(np.nan if rate == '' else rate)
+    out['거래대금증감율'] = rates
+
+    return reorder_stock_data_columns(out)
+
+
+def _text(values: np.ndarray, blank: np.ndarray) -> list:
+    """숫자를 수집기 형식 문자열('1,234')로, blank 위치는 ''."""
+    return ['' if b else f'{int(v):,}' for v, b in zip(values, blank)]
+
+
+def make_collected_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """수집 직후 형태: 숫자가 문자열, 빈 값 ''. 거래대금·전일거래대금은 일부만 채워짐."""
+    rng = np.random.default_rng(seed)
+    price = rng.integers(0, 500_000, rows)
+    prev_price = np.maximum(price + rng.integers(-5_000, 5_000, rows), 0)
+    volume = rng.integers(0, 20_000_000, rows)
+    prev_volume = rng.integers(0, 20_000_000, rows)
+    amount = price * volume
+
+    def blanks(rate):
+        return rng.random(rows) < rate
+
+    frame = pd.DataFrame({
+        '종목명': [f'종목{i}' for i in range(rows)],
+        '종목코드': [f'{i % 1_000_000:06d}' for i in range(rows)],
+        '현재가': _text(price, blanks(0.02)),
+        '전일종가': _text(prev_price, blanks(0.05)),
+        '거래량': _text(volume, blanks(0.02)),
+        '전일거래량': _text(prev_volume, blanks(0.05)),
+        '거래대금': _text(amount, blanks(0.7)),
+        '전일거래대금': _text(prev_price * prev_volume, blanks(0.7)),
+        '거래대금증감율': '',
+    }, dtype=object)
+    # 수집기가 넣는 int / '  ' 값도 섞음
+    spaces = blanks(0.01)
+    frame.loc[spaces, '거래대금'] = '  '
+    ints = blanks(0.1)
+    frame.loc[ints, '현재가'] = price[ints].astype(object)
+    return frame
+
+
+def _cells(series: pd.Series) -> list:
+    return [('nan', None) if isinstance(v, float) and np.isnan(v) else (type(v).__name__, v)
+            for v in series.tolist()]
+
+
+def compare(expected: pd.DataFrame, actual: pd.DataFrame) -> list[str]:
+    """다른 열 이름 목록 (열 순서·dtype·셀 타입과 값 비교)."""
+    if list(expected.columns) != list(actual.columns):
+        return ['<열 순서>']
+    return [col for col in expected.columns
+            if expected[col].dtype != actual[col].dtype or _cells(expected[col]) != _cells(actual[col])]
+
+
+def timed(func, frame: pd.DataFrame, repeat: int):
+    """(1회 평균 초, 결과)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(frame)
+    return (time.perf_counter() - started) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fill_trading_amounts_df 속도·결과 비교")
+    parser.add_argument("--rows", type=int, nargs="+", default=[3_000, 300_000])
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"📊 fill_trading_amounts_df 벤치마크 (반복 {args.repeat}회 평균)")
+    mismatched = False
+    for rows in args.rows:
+        collected = make_collected_frame(rows)
+        for label, frame in (('수집 직후(문자열)', collected), ('스냅샷(float64)', coerce_stock_frame(collected))):
+            before, expected = timed(fill_trading_amounts_rowwise, frame, args.repeat)
+            after, actual = timed(fill_trading_amounts_df, frame, args.repeat)
+            diffs = compare(expected, actual)
+            verdict = "결과 동일" if not diffs else f"❌ 결과 불일치: {', '.join(diffs)}"
+            print(f"  - {rows:>9,}행 {label:14s} 행 단위 {before * 1000:9.1f}ms → "
+                  f"열 단위 {after * 1000:7.1f}ms ({before / after:6.1f}배) {verdict}")
+            mismatched = mismatched or bool(diffs)
+
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+역발상 점수표 (구간별 점수를 표로 정의하고 열 단위로 계산).
+
+분석기마다 행 단위 if/elif로 계산하던 점수·등급 규칙을 표로 옮겼습니다. 표의 각 항목은
+위에서부터 먼저 맞는 구간의 점수를 받고(if/elif와 같음), 어느 구간에도 맞지 않거나 값이 없으면(NaN) 0점입니다.
+전체 종목(또는 여러 날 스냅샷을 합친 표)을 np.select 몇 번으로 계산합니다.
+
+    score(df, table)          점수 열 (int64)
+    grade(df, rules, default) 등급 열 (조건을 모두 만족하는 첫 등급, 없으면 default)
+
+구간 표기: '[a, b]' 양끝 포함, '(a, b)' 양끝 제외, 한쪽 제한이 없으면 -inf / inf.
+항목에 조건 dict를 붙이면 다른 열도 그 구간에 있을 때만 해당 점수 (예: PER 음수 + ROE 양수).
+
+    WEEKLY_CONTRARIAN / WEEKLY_GRADES   주간 역발상 분석 (weekly_stock_analyzer*)
+    WEEKLY_RISE                         1주일 상승 가능성 (auto_latest_analyzer)
+    SCREENER_PRIORITY                   역발상 스크리너 우선순위, 기본 100점 (contrarian_stock_screener)
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# 주간 역발상 점수 (최대 100점)
+WEEKLY_CONTRARIAN = {
+    'base': 0,
+    'parts': [
+        # 거래량 감소 (최대 40점)
+        ('volume_change', [
+            ('(-inf, -95]', 40), ('(-inf, -90]', 35), ('(-inf, -85]', 30),
+            ('(-inf, -80]', 25), ('(-inf, -70]', 20), ('(-inf, -50]', 15),
+        ]),
+        # 작은 음봉 (최대 30점)
+        ('price_change', [
+            ('[-3, -1]', 30), ('[-5, -1]', 25), ('[-7, -1]', 20), ('[-10, -1]', 15),
+        ]),
+        # ROE (최대 20점)
+        ('ROE_clean', [
+            ('[20, inf)', 20), ('[15, inf)', 17), ('[10, inf)', 14), ('[5, inf)', 11), ('[1, inf)', 8),
+        ]),
+        # PER 보정 (±10점), PER 음수라도 ROE 양수면 일시적 현상으로 가산점 (현대에이치티형)
+        ('PER_clean', [
+            ('(-inf, 0)', 5, {'ROE_clean': '(0, inf)'}), ('(-inf, 0)', -5),
+            ('[5, 20]', 10), ('[1, 30]', 7), ('(50, inf)', -5),
+        ]),
+    ],
+}
+
+WEEKLY_GRADES = [
+    ('🏆S', {'volume_change': '(-inf, -85]', 'price_change': '[-7, -1]',
+             'ROE_clean': '(0, inf)', 'contrarian_score': '[50, inf)'}),
+    ('🥈A', {'volume_change': '(-inf, -70]', 'price_change': '(-inf, -1]',
+             'ROE_clean': '(0, inf)', 'contrarian_score': '[30, inf)'}),
+    ('🥉B', {'volume_change': '(-inf, -50]', 'price_change': '(-inf, 0]',
+             'ROE_clean': '(0, inf)', 'contrarian_score': '[15, inf)'}),
+]
+
+# 1주일 상승 가능성 (거래량 급증 + 저PER + 고ROE + 소폭 조정)
+WEEKLY_RISE = {
+    'base': 0,
+    'parts': [
+        ('거래량변화율', [('[200, inf)', 30), ('[100, inf)', 25), ('[50, inf)', 20), ('[30, inf)', 15)]),
+        ('PER', [('(0, 5]', 25), ('(5, 10]', 20), ('(10, 15]', 15), ('(15, 20]', 10)]),
+        ('ROE', [('[20, inf)', 25), ('[15, inf)', 20), ('[10, inf)', 15), ('[5, inf)', 10), ('[3, inf)', 5)]),
+        ('가격변화율', [('[-3, -0.5]', 15), ('[-7, -3)', 10), ('[0, 3]', 5)]),
+    ],
+}
+
+# 역발상 스크리너 우선순위 (PER·PBR 제외, 시가총액 단위: 억원)
+SCREENER_PRIORITY = {
+    'base': 100,
+    'parts': [
+        ('거래량변화율', [('(-inf, -95]', 25), ('(-inf, -90]', 20), ('(-inf, -85]', 15)]),
+        ('ROE', [('[20, inf)', 20), ('[15, inf)', 15), ('[10, inf)', 10), ('[5, inf)', 5)]),
+        ('시가총액', [('[10000, inf)', 15), ('[5000, inf)', 12), ('[1000, inf)', 8), ('[500, inf)', 5)]),
+        # 적당한 하락폭 (-3% 내외가 이상적)
+        ('가격변화율', [('[-4, -2]', 10), ('[-5, -1]', 5)]),
+        # 전일 거래량 (유동성)
+        ('전일거래량', [('[500000, inf)', 10), ('[200000, inf)', 7), ('[100000, inf)', 5), ('[50000, inf)', 3)]),
+    ],
+}
+
+
+@lru_cache(maxsize=None)
+def _interval(spec: str):
+    """'[a, b)' → (a, b, a 포함 여부, b 포함 여부)"""
+    lower, upper = (part.strip() for part in spec[1:-1].split(','))
+    return float(lower), float(upper), spec[0] == '[', spec[-1] == ']'
+
+
+def _values(df: pd.DataFrame, column: str) -> np.ndarray:
+    return df[column].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _within(values: np.ndarray, spec: str) -> np.ndarray:
+    """구간 안에 있는지 (NaN은 항상 False)."""
+    lower, upper, lower_closed, upper_closed = _interval(spec)
+    mask = ~np.isnan(values)
+    if not math.isinf(lower):
+        mask &= values >= lower if lower_closed else values > lower
+    if not math.isinf(upper):
+        mask &= values <= upper if upper_closed else values < upper
+    return mask
+
+
+def _conditions(df: pd.DataFrame, columns: dict, cache: dict) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for column, spec in columns.items():
+        if column not in cache:
+            cache[column] = _values(df, column)
+        mask &= _within(cache[column], spec)
+    return mask
+
+
+def score(df: pd.DataFrame, table: dict) -> pd.Series:
+    """점수표(table)로 계산한 점수 열. 항목별로 처음 맞는 구간의 점수를 더함."""
+    total = np.full(len(df), table['base'], dtype='int64')
+    cache = {}
+    for column, tiers in table['parts']:
+        conditions = [
+            _conditions(df, {column: tier[0], **(tier[2] if len(tier) > 2 else {})}, cache)
+            for tier in tiers
+        ]
+        total += np.select(conditions, [tier[1] for tier in tiers], default=0)
+    return pd.Series(total, index=df.index)
+
+
+def grade(df: pd.DataFrame, rules: list, default: str) -> pd.Series:
+    """등급 열. rules는 (등급, {열: 구간}) 목록으로 위에서부터 모든 조건을 만족하는 첫 등급."""
+    cache = {}
+    conditions = [_conditions(df, columns, cache) for _, columns in rules]
+    labels = np.select(conditions, [label for label, _ in rules], default=default)
+    return pd.Series(labels, index=df.index)
@@ -3,94 +3,50 @@ from console_utf8 import enable as enable_utf8_console
 enable_utf8_console()
 
 import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
-import glob
-import re
+
+import contrarian_scoring
+import snapshot_catalog
+from stock_snapshot import load_snapshot
 
 def find_latest_stock_data_file():
-    """가장 최신 주식 데이터 파일을 찾기"""
-    patterns = [
-        'full_stock_data_*.xlsx',
-        'stock_data_*.xlsx', 
-        '*stock_data*.xlsx'
-    ]
-    
-    all_files = []
-    for pattern in patterns:
-        files = glob.glob(pattern)
-        all_files.extend(files)
-    
-    if not all_files:
+    """가장 최신 주식 데이터 스냅샷 (snapshot_catalog)"""
+    entry = snapshot_catalog.latest()
+    if not entry:
         print("❌ 주식 데이터 파일을 찾을 수 없습니다.")
         return None
     
-    unique_files = list(set(all_files))
-    file_info = []
-    for file in unique_files:
-        match = re.search(r'(\d{8}_\d{4})', file)
-        if match:
-            datetime_str = match.group(1)
-            try:
-                file_datetime = datetime.strptime(datetime_str, '%Y%m%d_%H%M')
-                file_info.append((file, file_datetime))
-            except:
-                continue
-    
-    if not file_info:
-        print(f"❌ 날짜 형식을 인식할 수 있는 파일이 없습니다.")
-        return None
-    
-    file_info.sort(key=lambda x: x[1])
-    latest_file = file_info[-1][0]
-    
-    print(f"📁 최신 데이터 파일: {latest_file}")
-    print(f"📅 수집 시간: {file_info[-1][1].strftime('%Y년 %m월 %d일 %H시 %M분')}")
-    return latest_file
+    collected = datetime.fromisoformat(entry['collected_at'])
+    print(f"📁 최신 데이터 파일: {entry['path']}")
+    print(f"📅 수집 시간: {collected.strftime('%Y년 %m월 %d일 %H시 %M분')}")
+    return entry['path']
 
-def clean_numeric_data(value):
-    """문자열 숫자 데이터를 float로 변환"""
-    if pd.isna(value) or value == '' or value == 'N/A':
-        return np.nan
-    
-    if isinstance(value, str):
-        value = value.replace(',', '')
-        if value.startswith('-'):
-            try:
-                return -float(value[1:])
-            except:
-                return np.nan
-        try:
-            return float(value)
-        except:
-            return np.nan
-    
-    return float(value) if not pd.isna(value) else np.nan
-
-def contrarian_screening():
-    """역발상 투자 종목 스크리닝 (PER, PBR 조건 제외)"""
+def contrarian_screening(df=None):
+    """
+    역발상 투자 종목 스크리닝 (PER, PBR 조건 제외)
+    df: 전체 종목 DataFrame (없으면 최신 스냅샷을 읽음)
+    반환: (엑셀 파일 이름, {시트 이름: DataFrame}) — 후보가 없거나 오류면 (None, {})
+    """
     
     print("🔍 역발상 투자 종목 스크리닝 시작...")
     
-    # 최신 파일 찾기
-    latest_file = find_latest_stock_data_file()
-    if not latest_file:
-        return
+    if df is None:
+        # 최신 파일 찾기
+        latest_file = find_latest_stock_data_file()
+        if not latest_file:
+            return None, {}
     
     try:
-        # 데이터 읽기
-        df = pd.read_excel(latest_file)
-        print(f"✅ 총 {len(df)}개 종목 데이터 로드")
+        if df is None:
+            # 데이터 읽기
+            df = load_snapshot(latest_file)
+            print(f"✅ 총 {len(df)}개 종목 데이터 로드")
+        else:
+            df = df.copy()
+            print(f"✅ 총 {len(df)}개 종목 데이터")
         
-        # 숫자 데이터 정리
-        numeric_columns = [
-            'PER', 'PBR', 'ROE', '시가총액', '현재가', '전일종가',
-            '거래량', '전일거래량', '거래대금', '전일거래대금', '거래대금증감율',
-        ]
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = df[col].apply(clean_numeric_data)
+        # 숫자 열(PER·현재가·거래량 등)은 load_snapshot이 float64로 반환 (stock_schema)
         
         # 계산된 지표 추가
         df['가격변화율'] = ((df['현재가'] - df['전일종가']) / df['전일종가'] * 100).round(2)
@@ -150,58 +106,9 @@ def contrarian_screening():
         # 최종 결과
         final_result = filtered6.copy()
         
-        # 점수 계산 (우선순위) - PER, PBR 제외
-        def calculate_score(row):
-            score = 100  # 기본 점수
-            
-            # 거래량 감소폭에 따른 가점
-            if row['거래량변화율'] <= -95:
-                score += 25
-            elif row['거래량변화율'] <= -90:
-                score += 20
-            elif row['거래량변화율'] <= -85:
-                score += 15
-            
-            # ROE 높을수록 가점
-            if row['ROE'] >= 20:
-                score += 20
-            elif row['ROE'] >= 15:
-                score += 15
-            elif row['ROE'] >= 10:
-                score += 10
-            elif row['ROE'] >= 5:
-                score += 5
-            
-            # 시가총액 안정성 가점
-            if row['시가총액'] >= 10000:  # 1조 이상 대형주
-                score += 15
-            elif row['시가총액'] >= 5000:  # 5천억 이상
-                score += 12
-            elif row['시가총액'] >= 1000:  # 1천억 이상
-                score += 8
-            elif row['시가총액'] >= 500:   # 500억 이상
-                score += 5
-            
-            # 적당한 하락폭 가점 (-3% 내외가 이상적)
-            if -4 <= row['가격변화율'] <= -2:
-                score += 10
-            elif -5 <= row['가격변화율'] <= -1:
-                score += 5
-            
-            # 전일 거래량이 많을수록 가점 (유동성)
-            if row['전일거래량'] >= 500000:  # 50만개 이상
-                score += 10
-            elif row['전일거래량'] >= 200000:  # 20만개 이상
-                score += 7
-            elif row['전일거래량'] >= 100000:  # 10만개 이상
-                score += 5
-            elif row['전일거래량'] >= 50000:   # 5만개 이상
-                score += 3
-            
-            return score
-        
         if len(final_result) > 0:
-            final_result['투자점수'] = final_result.apply(calculate_score, axis=1)
+            # 점수 계산 (우선순위) - PER, PBR 제외
+            final_result['투자점수'] = contrarian_scoring.score(final_result, contrarian_scoring.SCREENER_PRIORITY)
             final_result = final_result.sort_values('투자점수', ascending=False)
             
             print(f"\n🎯 최종 역발상 투자 후보: {len(final_result)}개")
@@ -232,46 +139,48 @@ def contrarian_screening():
             print(f"   중형주 (1천억~1조): {len(mid_cap)}개")
             print(f"   소형주 (1천억 미만): {len(small_cap)}개")
             
+            # 최종 결과
+            sheets = {'역발상투자후보': final_result}
+            
+            # 시총별 분류
+            if len(large_cap) > 0:
+                sheets['대형주'] = large_cap
+            if len(mid_cap) > 0:
+                sheets['중형주'] = mid_cap
+            if len(small_cap) > 0:
+                sheets['소형주'] = small_cap
+            
+            # 단계별 필터링 결과
+            sheets['기본조건만족'] = filtered5
+            
+            # 조건별 통계
+            sheets['필터링통계'] = pd.DataFrame({
+                '조건': [
+                    '전체 종목',
+                    '거래량 85% 감소',
+                    '+ 음봉',
+                    '+ 시총 500억 이상',
+                    '+ ROE 양수',
+                    '+ 전일거래량 5만개 이상',
+                    '+ 하락폭 -7%~-1%'
+                ],
+                '종목수': [
+                    len(valid_data),
+                    len(filtered1),
+                    len(filtered2),
+                    len(filtered3),
+                    len(filtered4),
+                    len(filtered5),
+                    len(filtered6)
+                ]
+            })
+            
             # Excel 저장
             output_filename = f"contrarian_stocks_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
             
             with pd.ExcelWriter(output_filename, engine='openpyxl') as writer:
-                # 최종 결과
-                final_result.to_excel(writer, sheet_name='역발상투자후보', index=False)
-                
-                # 시총별 분류
-                if len(large_cap) > 0:
-                    large_cap.to_excel(writer, sheet_name='대형주', index=False)
-                if len(mid_cap) > 0:
-                    mid_cap.to_excel(writer, sheet_name='중형주', index=False)
-                if len(small_cap) > 0:
-                    small_cap.to_excel(writer, sheet_name='소형주', index=False)
-                
-                # 단계별 필터링 결과
-                filtered5.to_excel(writer, sheet_name='기본조건만족', index=False)
-                
-                # 조건별 통계
-                stats_df = pd.DataFrame({
-                    '조건': [
-                        '전체 종목',
-                        '거래량 85% 감소',
-                        '+ 음봉',
-                        '+ 시총 500억 이상',
-                        '+ ROE 양수',
-                        '+ 전일거래량 5만개 이상',
-                        '+ 하락폭 -7%~-1%'
-                    ],
-                    '종목수': [
-                        len(valid_data),
-                        len(filtered1),
-                        len(filtered2),
-                        len(filtered3),
-                        len(filtered4),
-                        len(filtered5),
-                        len(filtered6)
-                    ]
-                })
-                stats_df.to_excel(writer, sheet_name='필터링통계', index=False)
+                for sheet_name, frame in sheets.items():
+                    frame.to_excel(writer, sheet_name=sheet_name, index=False)
             
             print(f"\n💾 결과가 '{output_filename}' 파일로 저장되었습니다!")
             
@@ -287,6 +196,8 @@ def contrarian_screening():
                 print(f"   평균 거래량 감소: {avg_volume_change:.1f}%")
                 print(f"   평균 가격 변화: {avg_price_change:.1f}%")
                 print(f"   평균 시가총액: {avg_market_cap:,.0f}억원")
+            
+            return output_filename, sheets
         
         else:
             print(f"\n😅 모든 조건을 만족하는 종목이 없습니다.")
@@ -305,6 +216,8 @@ def contrarian_screening():
         
     except Exception as e:
         print(f"❌ 오류 발생: {str(e)}")
+    
+    return None, {}
 
 if __name__ == "__main__":
     contrarian_screening()
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+전체 종목 수집 저널 (중단 후 이어서 수집).
+
+종목 한 건이 끝날 때마다 결과 행을 거래일별 JSONL 파일에 한 줄씩 덧붙입니다.
+수집이 중간에 죽어도 이미 끝난 종목은 파일에 남아 있으므로,
+quick_stock_check.py --resume 으로 다시 실행하면 저널에 있는 종목은 요청 없이 건너뜁니다.
+
+파일: CRAWL_JOURNAL_DIR (기본: 프로젝트/.crawl_journal)/stock_data_YYYYMMDD.jsonl
+    {"code": "005930", "row": {...}}        수집 완료
+    {"code": "069500", "skipped": true}     ETF/펀드 추정 등으로 제외
+"""
+import json
+import os
+import threading
+from datetime import date
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+
+def journal_dir() -> Path:
+    return Path(os.getenv("CRAWL_JOURNAL_DIR", "") or PROJECT_ROOT / ".crawl_journal")
+
+
+class CrawlJournal:
+    def __init__(self, trading_day: date | None = None, path: Path | None = None):
+        if path is None:
+            if trading_day is None:
+                from market_calendar import get_last_krx_trading_day
+
+                trading_day = get_last_krx_trading_day()
+            path = journal_dir() / f"stock_data_{trading_day.strftime('%Y%m%d')}.jsonl"
+        self.path = Path(path)
+        self._rows = {}
+        self._skipped = set()
+        self._lock = threading.Lock()
+        self._fh = None
+
+    def open(self, resume: bool = False) -> int:
+        """
+        저널 열기. resume이면 기존 기록을 읽어 들이고, 아니면 새로 시작.
+        이어받은 종목 수(수집 완료 + 제외)를 반환.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self.path.exists():
+            self._load()
+            mode = "a"
+        else:
+            mode = "w"
+        self._fh = open(self.path, mode, encoding="utf-8")
+        return len(self._rows) + len(self._skipped)
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단된 마지막 줄
+                    continue
+                code = entry.get("code")
+                if not code:
+                    continue
+                if entry.get("skipped"):
+                    self._skipped.add(code)
+                    self._rows.pop(code, None)
+                else:
+                    self._rows[code] = entry["row"]
+                    self._skipped.discard(code)
+
+        # 잘린 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈 보정
+        with open(self.path, "rb+") as fh:
+            fh.seek(0, os.SEEK_END)
+            if fh.tell():
+                fh.seek(-1, os.SEEK_END)
+                if fh.read(1) != b"\n":
+                    fh.write(b"\n")
+
+    def __contains__(self, code) -> bool:
+        return code in self._rows or code in self._skipped
+
+    def row(self, code):
+        """기록된 행 (제외된 종목이면 None)."""
+        return self._rows.get(code)
+
+    def _write(self, entry: dict) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+
+    def append(self, row: dict) -> None:
+        """수집 완료 행 기록."""
+        code = row["종목코드"]
+        self._write({"code": code, "row": row})
+        self._rows[code] = row
+
+    def mark_skipped(self, code: str) -> None:
+        """제외 종목 기록 (이어서 수집할 때 다시 요청하지 않음)."""
+        self._write({"code": code, "skipped": True})
+        self._skipped.add(code)
+
+    def close(self) -> None:
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,83 +1,47 @@
 #!/usr/bin/env python3
+"""
+매일 전체 주식 전략 실행 (한 프로세스 안의 단계 DAG, pipeline_runner).
+
+    수집(collect) ─┬─ 전체 종목 시트(full_data_upload)
+                   ├─ 역발상 스크리닝(contrarian) ─────────────────────────┐
+                   └─ 일봉 일괄 갱신(bars) ─┬─ 20일선 돌파(ma20) ──────────┼─ 구글 시트 일괄 업로드(publish)
+                                             └─ 리바운드(rebound) ──────────┘
+
+단계 사이 데이터(전체 종목 DataFrame, 역발상 결과 시트)는 메모리로 넘기고,
+서로 기다릴 필요가 없는 단계는 동시에 실행합니다. 단계별 소요 시간은 .pipeline/runs.jsonl에 기록.
+구글 시트는 마지막 publish 단계에서 당일 탭과 리바운드 탭을 모아 한 번에 올립니다 (sheets_batch,
+분석 단계가 실패하면 그 섹션·탭만 빠짐). 업로드 단계는 업로드 대기열(sheets_outbox)에 넣기만 하고 넘어가며,
+전송 스레드가 분석과 동시에 보내고 429·5xx는 재시도합니다. 끝에서 남은 전송을 기다리고, 그래도 못 보낸
+작업은 대기열에 남아 다음 실행에서 이어서 보냅니다.
+"""
 from console_utf8 import enable as enable_utf8_console
 
 enable_utf8_console()
 
 import argparse
-import subprocess
-import sys
-import time
 import os
-import glob
+import sys
 import pandas as pd
 from datetime import datetime
+import sheets_outbox
 from google_sheets_uploader import GoogleSheetsUploader
 from market_calendar import resolve_sheet_tab
+from pipeline_runner import Stage, run_pipeline
 from stock_data_utils import fill_trading_amounts_df
 
 
-def run_python_script(script_name, description, extra_args=None):
-    """Python 스크립트 실행"""
-    print(f"\n{'='*60}")
-    print(f"[시작] {description}")
-    print(f"시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*60}")
-
-    try:
-        python_path = sys.executable
-        script_path = os.path.join(os.getcwd(), script_name)
-
-        env = os.environ.copy()
-        env["PYTHONIOENCODING"] = "utf-8"
-        env["PYTHONUTF8"] = "1"
-
-        cmd = [python_path, script_path]
-        if extra_args:
-            cmd.extend(extra_args)
-
-        result = subprocess.run(
-            cmd,
-            cwd=os.getcwd(),
-            env=env,
-        )
-
-        if result.returncode == 0:
-            print(f"[완료] {description}")
-            return True
-        print(f"[실패] {description} (종료 코드: {result.returncode})")
-        return False
-
-    except Exception as e:
-        print(f"[오류] {description} 실행 중: {str(e)}")
-        return False
-
-
-def find_latest_files():
-    """최신 생성된 파일들 찾기"""
-    today = datetime.now().strftime('%Y%m%d')
-
-    stock_data_files = glob.glob(f'full_stock_data*{today}*.xlsx')
-    analysis_files = glob.glob(f'contrarian_stocks*{today}*.xlsx')
-
-    if not stock_data_files:
-        stock_data_files = glob.glob('full_stock_data*.xlsx')
-    if not analysis_files:
-        analysis_files = glob.glob('contrarian_stocks*.xlsx')
-
-    latest_stock_data = max(stock_data_files, key=os.path.getctime) if stock_data_files else None
-    latest_analysis = max(analysis_files, key=os.path.getctime) if analysis_files else None
-
-    return latest_stock_data, latest_analysis
-
-
-def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
+def upload_to_google_sheets(stock_df, analysis_sheets, sheet_tab: str,
+                            stock_data_file=None, analysis_file=None, extra_sections=(), batch=None):
     """
     구글 시트에 날짜별 탭(YYYY-MM-DD)으로 업로드.
+    stock_df: 전체 종목, analysis_sheets: 역발상 결과 {시트 이름: DataFrame} (파일 이름은 요약 표시용)
+    extra_sections: 탭 끝에 붙일 섹션 (20일선 돌파 등)
+    batch: SheetsBatch를 넘기면 탭 내용만 넣어 두고 전송은 호출한 쪽에서.
     같은 날 다시 실행하면 해당 탭을 비운 뒤 덮어씀.
     """
     print("\n[구글 시트] 업로드 시작...")
 
-    uploader = GoogleSheetsUploader()
+    uploader = batch.uploader if batch is not None else GoogleSheetsUploader()
     if not getattr(uploader, "gc", None):
         print("[오류] 구글 시트 연결 실패 (credentials/google-sa.json, .env SPREADSHEET_ID 확인)")
         return False
@@ -109,9 +73,9 @@ def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
             ],
         }
 
-        if stock_data_file and os.path.exists(stock_data_file):
-            print(f"[업로드] 전체 주식 데이터: {stock_data_file}")
-            df_stock = fill_trading_amounts_df(pd.read_excel(stock_data_file))
+        if stock_df is not None and len(stock_df) > 0:
+            print(f"[업로드] 전체 주식 데이터: {len(stock_df)}개 종목")
+            df_stock = fill_trading_amounts_df(stock_df)
             stock_count = len(df_stock)
 
             df_stock_sorted = df_stock.sort_values(
@@ -131,10 +95,8 @@ def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
         else:
             sections.append(('--- 분석 요약 ---', pd.DataFrame(summary_rows)))
 
-        if analysis_file and os.path.exists(analysis_file):
-            print(f"[업로드] 역발상 분석: {analysis_file}")
-            excel_file = pd.ExcelFile(analysis_file)
-
+        if analysis_sheets:
+            print(f"[업로드] 역발상 분석: {', '.join(analysis_sheets)}")
             sheet_titles = {
                 '역발상투자후보': '--- 역발상 투자 후보 ---',
                 '대형주': '--- 대형주 ---',
@@ -144,8 +106,7 @@ def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
                 '필터링통계': '--- 필터링 통계 ---',
             }
 
-            for sheet_name in excel_file.sheet_names:
-                df_sheet = pd.read_excel(analysis_file, sheet_name=sheet_name)
+            for sheet_name, df_sheet in analysis_sheets.items():
                 if '현재가' in df_sheet.columns:
                     df_sheet = fill_trading_amounts_df(df_sheet)
                 title = sheet_titles.get(sheet_name, f'--- {sheet_name} ---')
@@ -159,9 +120,10 @@ def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
             summary_df.loc[summary_df['항목'] == '전체 종목 수', '값'] = f"{stock_count:,}개"
             summary_df.loc[summary_df['항목'] == '역발상 후보 종목 수', '값'] = f"{contrarian_count}개"
 
-        success = uploader.upload_sections_to_daily_tab(date_tab, sections)
+        sections.extend(extra_sections)
+        success = uploader.upload_sections_to_daily_tab(date_tab, sections, batch=batch)
 
-        if success:
+        if success and batch is None:
             url = uploader.get_spreadsheet_url()
             print(f"\n[완료] 구글 시트 업로드 (탭: {date_tab})")
             if url:
@@ -173,6 +135,83 @@ def upload_to_google_sheets(stock_data_file, analysis_file, sheet_tab: str):
         return False
 
 
+def build_stages(tab: str) -> list:
+    """매일 실행 단계 (입력·출력 이름으로 연결, pipeline_runner)"""
+    from bar_fetch_planner import daily_plan
+    from contrarian_stock_screener import contrarian_screening
+    from daily_rebound_analysis import run_all_strategies
+    from ma20_breakout_screener import ma20_sections, screen_ma20_breakout
+    from quick_stock_check import collect_snapshot, print_data_quality, upload_full_stock_data
+    from sheets_batch import SheetsBatch
+
+    def collect():
+        stock_df, stock_file = collect_snapshot()
+        if stock_df is None:
+            raise RuntimeError("수집된 종목 없음")
+        print_data_quality(stock_df)
+        return stock_df, stock_file
+
+    def full_data_upload(stock_df, stock_file):
+        return upload_full_stock_data(stock_df, stock_file, wait=False)
+
+    def bars(stock_df):
+        # 이후 단계는 이 시각 이후 갱신된 종목을 다시 요청하지 않음 (ohlcv_store OHLCV_FRESH_SINCE)
+        os.environ["OHLCV_FRESH_SINCE"] = datetime.now().isoformat(timespec="seconds")
+        summary = daily_plan(stock_df).execute()
+        print(f"[일봉] {summary['updated']:,}종목 갱신, 새 봉 {summary['bars']:,}개, 실패 {len(summary['failed'])}종목")
+        return summary
+
+    def ma20(stock_df):
+        result_df = screen_ma20_breakout(stock_df=stock_df)
+        if result_df is None:
+            raise RuntimeError("20일선 돌파 스크리닝 실패")
+        return result_df
+
+    def rebound(stock_df):
+        results = run_all_strategies(sheet_tab=tab, stock_data=stock_df.to_dict('records'), upload=False)
+        if results is None:
+            raise RuntimeError("리바운드 분석 실패")
+        return results
+
+    def publish(stock_df, stock_file, contrarian_file, contrarian_sheets, ma20_result, rebound_results):
+        # 당일 탭(요약·TOP500·역발상·20일선)과 리바운드 탭을 한 번에: 탭 생성·지우기 1회 + 값 쓰기 1회
+        # 대기열에 넣고 바로 끝냄 (전송·재시도는 sheets_outbox 전송 스레드, main 끝에서 기다림)
+        uploader = GoogleSheetsUploader()
+        if not getattr(uploader, "service", None):
+            raise RuntimeError("구글 시트 연결 실패 (credentials/google-sa.json, .env SPREADSHEET_ID 확인)")
+        batch = SheetsBatch(uploader)
+        extra = ma20_sections(ma20_result) if ma20_result is not None else ()
+        if not upload_to_google_sheets(stock_df, contrarian_sheets or {}, tab,
+                                       stock_data_file=stock_file, analysis_file=contrarian_file,
+                                       extra_sections=extra, batch=batch):
+            raise RuntimeError("당일 탭 준비 실패")
+        if rebound_results is not None:
+            uploader.upload_rebound_signals(rebound_results, date_str=tab, batch=batch)
+        keys = sheets_outbox.enqueue_tabs(batch)
+        sheets_outbox.start()
+        print(f"[대기열] 구글 시트 탭 {len(keys)}개 업로드 예약")
+        return keys
+
+    return [
+        Stage('collect', collect, outputs=('stock_df', 'stock_file'),
+              description='전체 종목 데이터 수집'),
+        Stage('full_data_upload', full_data_upload, inputs=('stock_df', 'stock_file'),
+              description='전체 종목 시트 업로드'),
+        Stage('contrarian', contrarian_screening, inputs=('stock_df',),
+              outputs=('contrarian_file', 'contrarian_sheets'), description='역발상 스크리닝'),
+        Stage('bars', bars, inputs=('stock_df',), description='일봉 일괄 갱신'),
+        # 일봉 갱신이 일부 실패해도 각 단계가 남은 종목을 직접 받으므로 after로만 기다림
+        Stage('ma20', ma20, inputs=('stock_df',), outputs=('ma20_result',), after=('bars',),
+              description='20일선 돌파 스크리닝'),
+        Stage('rebound', rebound, inputs=('stock_df',), outputs=('rebound_results',), after=('bars',),
+              description='리바운드 전략'),
+        # 분석 단계 하나가 실패해도 나머지 결과는 올림
+        Stage('publish', publish, inputs=('stock_df', 'stock_file'),
+              optional=('contrarian_file', 'contrarian_sheets', 'ma20_result', 'rebound_results'),
+              description='구글 시트 일괄 업로드 예약'),
+    ]
+
+
 def main(sheet_tab: str | None = None):
     """매일 주식 분석 + 구글 시트 업로드 자동화 (전체 전략)"""
     parser = argparse.ArgumentParser(description="전체 주식 전략 일괄 실행")
@@ -191,55 +230,16 @@ def main(sheet_tab: str | None = None):
     print(f"경로: {os.getcwd()}")
     print("=" * 60)
 
-    data_success = run_python_script(
-        "quick_stock_check.py",
-        "전체 종목 데이터 수집 (시가총액 포함)",
-    )
-
-    if not data_success:
-        print("[중단] 데이터 수집 실패")
-        sys.exit(1)
-
-    print("\n10초 대기 (파일 저장 완료)...")
-    time.sleep(10)
-
-    analysis_success = run_python_script(
-        "contrarian_stock_screener.py",
-        "역발상 투자 종목 스크리닝",
-    )
-
-    upload_success = False
-    if data_success:
-        time.sleep(5)
-        stock_data_file, analysis_file = find_latest_files()
-        if stock_data_file or analysis_file:
-            upload_success = upload_to_google_sheets(stock_data_file, analysis_file, tab)
-        else:
-            print("[오류] 업로드할 파일 없음")
-
-    ma20_success = run_python_script(
-        "ma20_breakout_screener.py",
-        "20일선 상향 돌파 스크리닝",
-        extra_args=["--sheet-tab", tab],
-    )
-
-    rebound_success = run_python_script(
-        "daily_rebound_analysis.py",
-        "리바운드 전략 (거래량급감·45일선·360일선)",
-        extra_args=["--sheet-tab", tab],
-    )
-
-    print(f"\n{'='*60}")
-    print("실행 결과")
-    print(f"  데이터 수집:   {'성공' if data_success else '실패'}")
-    print(f"  역발상 분석:   {'성공' if analysis_success else '실패'}")
-    print(f"  구글 시트:     {'성공' if upload_success else '실패'}")
-    print(f"  20일선 돌파:   {'성공' if ma20_success else '실패'}")
-    print(f"  리바운드 전략: {'성공' if rebound_success else '실패'}")
+    # 이전 실행에서 못 보낸 구글 시트 작업은 분석과 동시에 보냄
+    sheets_outbox.start()
+    run = run_pipeline(build_stages(tab))
+    print("\n[구글 시트] 대기열 전송 기다리는 중...")
+    uploaded = sheets_outbox.deliver(sheets_outbox.pending())
+    run.print_summary()
+    print(f"기록: {run.record()}")
     print(f"완료: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 60)
 
-    if not all([data_success, ma20_success, rebound_success]):
+    if not uploaded or not all(run.ok(name) for name in ('collect', 'ma20', 'rebound', 'publish')):
         sys.exit(1)
 
 
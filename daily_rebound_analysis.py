@@ -1,36 +1,26 @@
 import argparse
 import os
 import sys
-import glob
 from datetime import datetime
 import pandas as pd
-from quick_stock_check import get_stock_data, is_regular_stock  # 기존 코드 활용
+from quick_stock_check import get_stock_data  # 기존 코드 활용
 from rebound_strategies_analyzer import ReboundAnalyzer
 from google_sheets_uploader import GoogleSheetsUploader
 from market_calendar import resolve_sheet_tab
+from stock_classifier import classify
+from stock_snapshot import load_snapshot
+import snapshot_catalog
 
 def get_latest_stock_data_file():
-    """가장 최근에 생성된 주식 데이터 파일 찾기"""
-    # 파일 패턴 설정 (stock_data_*.xlsx 또는 full_stock_data_*.xlsx)
-    patterns = ['stock_data_*.xlsx', 'full_stock_data_*.xlsx']
-    all_files = []
-    
-    for pattern in patterns:
-        all_files.extend(glob.glob(pattern))
-    
-    if not all_files:
+    """가장 최근 주식 데이터 스냅샷 (24시간 이내 수집분만)"""
+    entry = snapshot_catalog.latest()
+    if not entry:
         return None
     
-    # 파일 수정 시간 기준으로 정렬
-    latest_file = max(all_files, key=os.path.getmtime)
-    
-    # 파일이 오늘 생성된 것인지 확인 (24시간 이내)
-    file_mtime = os.path.getmtime(latest_file)
-    current_time = datetime.now().timestamp()
-    
-    # 24시간(86400초) 이내에 생성된 파일이면 사용
-    if current_time - file_mtime < 86400:
-        return latest_file
+    # 24시간(86400초) 이내에 수집된 스냅샷이면 사용
+    collected = datetime.fromisoformat(entry['collected_at'])
+    if (datetime.now() - collected).total_seconds() < 86400:
+        return entry['path']
     
     return None
 
@@ -42,7 +32,7 @@ def load_or_collect_stock_data():
     if latest_file:
         print(f"🔄 최신 데이터 파일 발견: {latest_file}")
         try:
-            df = pd.read_excel(latest_file)
+            df = load_snapshot(latest_file)
             print(f"✅ {len(df)}개 종목 데이터 로드 완료")
             
             # DataFrame을 딕셔너리 리스트로 변환
@@ -131,8 +121,12 @@ def _print_rebound_summary(results):
     print(f"- 360일선 전략: {len(results['ma360'])}개 종목")
 
 
-def _run_rebound_analysis(strategies, sheet_tab=None, excel_suffix=None, title="리바운드"):
-    """지정 전략을 전 종목에 대해 실행 후 구글 시트·엑셀 저장."""
+def _run_rebound_analysis(strategies, sheet_tab=None, excel_suffix=None, title="리바운드", stock_data=None,
+                          upload=True):
+    """
+    지정 전략을 전 종목에 대해 실행 후 구글 시트·엑셀 저장. stock_data(종목 dict 목록)가 없으면 스냅샷을 읽음.
+    upload=False면 구글 시트는 건너뜀 (daily_auto가 다른 탭과 함께 한 번에 올림).
+    """
     tab = resolve_sheet_tab(sheet_tab)
     labels = [STRATEGY_LABELS[s] for s in strategies]
     print(f"🚀 {title} 분석 시작 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
@@ -140,25 +134,25 @@ def _run_rebound_analysis(strategies, sheet_tab=None, excel_suffix=None, title="
     print(f"   구글 시트 탭 접두: {tab}")
 
     print("1. 주가 데이터 준비 중...")
-    stock_data = load_or_collect_stock_data()
+    if stock_data is None:
+        stock_data = load_or_collect_stock_data()
 
     print("2. 리바운드 신호 분석 중...")
     analyzer = ReboundAnalyzer()
-    total = len(stock_data)
-    for i, data in enumerate(stock_data, start=1):
-        if i % 50 == 0:
-            print(f"   ... 진행 {i}/{total}")
-        if is_regular_stock(data.get('종목명', '')):
-            analyzer.analyze_stock(data, strategies=strategies)
+    regular = [data for data in stock_data if classify(data.get('종목코드'), data.get('종목명', ''))]
+    print(f"   일반 주식 {len(regular)}/{len(stock_data)}개 일봉 갱신")
+    # 일봉은 종목별로 갱신하고, 신호는 전 종목 패널로 한 번에 계산
+    analyzer.analyze_universe(regular, strategies=strategies)
 
     results = analyzer.get_results()
 
-    print("3. 구글 시트 업로드 중...")
-    uploader = GoogleSheetsUploader()
-    if getattr(uploader, 'gc', None):
-        uploader.upload_rebound_signals(results, date_str=tab, strategy_keys=strategies)
-    else:
-        print("⚠️ 구글 시트 연결 실패 — 엑셀만 저장합니다.")
+    if upload:
+        print("3. 구글 시트 업로드 중...")
+        uploader = GoogleSheetsUploader()
+        if getattr(uploader, 'gc', None):
+            uploader.upload_rebound_signals(results, date_str=tab, strategy_keys=strategies)
+        else:
+            print("⚠️ 구글 시트 연결 실패 — 엑셀만 저장합니다.")
 
     print("4. 엑셀 파일 저장 중...")
     save_to_excel(results, excel_suffix)
@@ -209,17 +203,20 @@ def run_ma360_strategy(sheet_tab: str | None = None):
         print(f"❌ 오류 발생: {str(e)}")
 
 
-def run_all_strategies(sheet_tab: str | None = None):
-    """모든 리바운드 전략 실행 (거래량 급감·45일선·360일선)"""
+def run_all_strategies(sheet_tab: str | None = None, stock_data=None, upload=True):
+    """모든 리바운드 전략 실행 (거래량 급감·45일선·360일선). 결과 dict, 오류면 None."""
     try:
-        _run_rebound_analysis(
+        return _run_rebound_analysis(
             ('volume_drop', 'ma45', 'ma360'),
             sheet_tab=sheet_tab,
             excel_suffix=None,
             title='전체 리바운드',
+            stock_data=stock_data,
+            upload=upload,
         )
     except Exception as e:
         print(f"❌ 오류 발생: {str(e)}")
+        return None
 
 def main():
     """명령줄 인수에 따라 특정 전략 실행"""
@@ -1,14 +1,15 @@
 import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
 from credentials_path import resolve_credentials_path
+from sheet_sections import SectionIndex, end_row, layout, sections_from_column
+import sheets_client
+import sheets_outbox
+from sheets_batch import SheetsBatch
 
 # Load environment variables
 load_dotenv()
@@ -24,15 +25,15 @@ NUMERIC_COLUMNS = frozenset({
 
 
 class GoogleSheetsUploader:
-    def __init__(self):
+    def __init__(self, credentials_file=None):
         # 환경 변수 로드
         load_dotenv()
         
         self.SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-        self.CREDENTIALS_FILE = resolve_credentials_path()
+        self.CREDENTIALS_FILE = credentials_file or resolve_credentials_path()
         self.SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
         
-        if not os.path.exists(self.CREDENTIALS_FILE):
+        if not sheets_client.credentials_available(self.CREDENTIALS_FILE):
             print(f"[경고] {self.CREDENTIALS_FILE} 파일이 없습니다.")
             return
 
@@ -42,9 +43,7 @@ class GoogleSheetsUploader:
 
         # Google Sheets API + gspread 연결
         try:
-            self.credentials = service_account.Credentials.from_service_account_file(
-                self.CREDENTIALS_FILE, scopes=self.SCOPES)
-            self.service = build('sheets', 'v4', credentials=self.credentials)
+            self.service = sheets_client.build_service(self.CREDENTIALS_FILE, self.SCOPES)
             self.setup_connection()
             print("[OK] 구글 시트 API 인증 성공")
         except Exception as e:
@@ -110,8 +109,12 @@ class GoogleSheetsUploader:
         except Exception as e:
             print(f"데이터 업데이트 중 오류 발생: {str(e)}")
     
-    def upload_rebound_signals(self, results, date_str: str | None = None, strategy_keys=None):
-        """리바운드 신호 업로드. strategy_keys로 업로드할 전략만 지정 가능."""
+    def upload_rebound_signals(self, results, date_str: str | None = None, strategy_keys=None, batch=None):
+        """
+        리바운드 신호 업로드. strategy_keys로 업로드할 전략만 지정 가능.
+        전략별 탭과 _전체 탭을 SheetsBatch 하나로 모아 업로드 대기열(sheets_outbox)로 보내고 전송을 기다림
+        (batch를 넘기면 넣기만 하고 전송은 호출한 쪽에서).
+        """
         try:
             date_str = date_str or datetime.now().strftime('%Y-%m-%d')
 
@@ -121,34 +124,37 @@ class GoogleSheetsUploader:
                 'ma360': '360일선',
             }
             keys = tuple(strategy_keys) if strategy_keys else tuple(strategies.keys())
+            pending = batch if batch is not None else SheetsBatch(self)
+
+            def signal_rows(signals):
+                df = pd.DataFrame(signals)
+                return [df.columns.tolist()] + df.values.tolist()
 
             for key in keys:
                 if key not in strategies:
                     continue
                 name = strategies[key]
-                sheet_name = f"{date_str}_{name}"
-                self.create_sheet(sheet_name)
-                
                 if results.get(key):
-                    df = pd.DataFrame(results[key])
-                    self.update_sheet(df, sheet_name)
+                    pending.put_tab(f"{date_str}_{name}", signal_rows(results[key]), raw=True)
                 else:
+                    pending.put_tab(f"{date_str}_{name}", [], raw=True)
                     print(f"신호 없음: {name}")
-            
+
             all_signals = []
             for key in keys:
                 all_signals.extend(results.get(key) or [])
 
             if len(keys) > 1 and all_signals:
-                sheet_name = f"{date_str}_전체"
-                self.create_sheet(sheet_name)
-                df_all = pd.DataFrame(all_signals)
-                self.update_sheet(df_all, sheet_name)
-            
-            print("리바운드 신호 업로드 완료")
-            
+                pending.put_tab(f"{date_str}_전체", signal_rows(all_signals), raw=True)
+
+            if batch is None and not sheets_outbox.deliver(sheets_outbox.enqueue_tabs(pending)):
+                return False
+            print("리바운드 신호 업로드 완료" if batch is None else "리바운드 신호 업로드 준비 완료")
+            return True
+
         except Exception as e:
             print(f"리바운드 신호 업로드 중 오류 발생: {str(e)}")
+            return False
 
     def setup_connection(self):
         """구글 시트 연결 설정"""
@@ -158,12 +164,11 @@ class GoogleSheetsUploader:
                 'https://www.googleapis.com/auth/drive'
             ]
             
-            if not os.path.exists(self.CREDENTIALS_FILE):
+            if not sheets_client.credentials_available(self.CREDENTIALS_FILE):
                 print(f"[오류] {self.CREDENTIALS_FILE} 파일이 없습니다.")
                 return False
             
-            creds = Credentials.from_service_account_file(self.CREDENTIALS_FILE, scopes=scope)
-            self.gc = gspread.authorize(creds)
+            self.gc = sheets_client.authorize(self.CREDENTIALS_FILE, scope)
             print("[OK] 구글 시트 연결 성공")
             return True
             
@@ -230,27 +235,23 @@ class GoogleSheetsUploader:
         rows.extend([[], []])
         return rows
 
-    def upload_sections_to_daily_tab(self, date_tab_name, sections):
+    def upload_sections_to_daily_tab(self, date_tab_name, sections, batch=None):
         """
         하루치 결과를 하나의 탭에 섹션별로 업로드.
         sections: [(섹션제목, DataFrame 또는 None), ...]
+        batch: SheetsBatch를 넘기면 탭 내용만 넣어 두고 전송은 호출한 쪽에서 (다른 탭과 함께 한 번에 전송).
+        넘기지 않으면 업로드 대기열(sheets_outbox)로 보내고 전송을 기다림.
         """
         try:
-            worksheet = self.get_or_create_worksheet(date_tab_name)
-            if not worksheet:
+            pending = batch if batch is not None else SheetsBatch(self)
+            blocks = [(section_title, self._section_rows(section_title, df)) for section_title, df in sections]
+            # 섹션 위치는 전송 뒤 색인에 기록 (이후 섹션 추가·교체는 이 위치만 다시 씀)
+            pending.put_tab(date_tab_name, [row for _, block in blocks for row in block], sections=layout(blocks))
+            if batch is not None:
+                return True
+            if not sheets_outbox.deliver(sheets_outbox.enqueue_tabs(pending)):
                 return False
 
-            rows = []
-            for section_title, df in sections:
-                rows.extend(self._section_rows(section_title, df))
-
-            if rows:
-                worksheet.update(
-                    values=rows,
-                    range_name="A1",
-                    value_input_option="USER_ENTERED",
-                )
-
             section_count = sum(1 for _, df in sections if df is not None and len(df) > 0)
             print(f"[OK] 탭 '{date_tab_name}' 업로드 완료 (섹션 {section_count}개)")
             return True
@@ -259,54 +260,34 @@ class GoogleSheetsUploader:
             print(f"[오류] 탭 '{date_tab_name}' 업로드 실패: {str(e)}")
             return False
 
-    def append_sections_to_tab(self, tab_name, sections, replace_section_titles=None):
+    def _tab_sections(self, worksheet):
+        """
+        탭의 섹션 위치. 로컬 색인의 제목 행이 시트와 맞으면 그대로 쓰고 (제목 칸만 읽음),
+        색인이 없거나 맞지 않으면 A열만 읽어 복원.
+        """
+        sections = SectionIndex().get(self.SPREADSHEET_ID, worksheet.title, worksheet.id)
+        if sections:
+            cells = worksheet.batch_get([f"A{section['start']}" for section in sections])
+            titles = [cell[0][0] if cell and cell[0] else '' for cell in cells]
+            if titles == [section['title'] for section in sections]:
+                return sections
+        return sections_from_column(worksheet.col_values(1))
+
+    def append_sections_to_tab(self, tab_name, sections, replace_section_titles=None, wait=True):
         """
         기존 탭 내용을 유지한 채 섹션을 하단에 추가.
-        replace_section_titles에 있는 제목이 이미 있으면 해당 섹션만 교체.
+        replace_section_titles에 있는 제목이 이미 있으면 해당 섹션 범위만 제자리에서 교체.
+        업로드 대기열(sheets_outbox)로 보내고, wait이면 전송을 기다림 (실패·시간 초과면 False, 작업은 남아 다시 시도).
         """
         try:
-            spreadsheet = self.create_or_get_spreadsheet()
-            if not spreadsheet:
+            key = sheets_outbox.enqueue_sections(self, tab_name, sections, replace_section_titles)
+            if not wait:
+                sheets_outbox.start()
+                print(f"[대기열] 탭 '{tab_name}' 섹션 추가 예약")
+                return True
+            if not sheets_outbox.deliver([key]):
                 return False
 
-            try:
-                worksheet = spreadsheet.worksheet(tab_name)
-            except gspread.WorksheetNotFound:
-                worksheet = spreadsheet.add_worksheet(title=tab_name, rows=8000, cols=40)
-                print(f"[생성] 탭 '{tab_name}' 새로 추가")
-
-            existing = worksheet.get_all_values()
-            replace_titles = set(replace_section_titles or [])
-
-            if replace_titles and existing:
-                kept = []
-                skip = False
-                for row in existing:
-                    title = row[0] if row else ''
-                    if title in replace_titles:
-                        skip = True
-                        continue
-                    if skip:
-                        if title.startswith('---') and title.endswith('---') and title not in replace_titles:
-                            skip = False
-                            kept.append(row)
-                        continue
-                    kept.append(row)
-                while kept and not any(kept[-1]):
-                    kept.pop()
-                existing = kept
-
-            new_rows = []
-            for section_title, df in sections:
-                new_rows.extend(self._section_rows(section_title, df))
-
-            combined = existing + ([[]] if existing else []) + new_rows
-            worksheet.update(
-                values=combined,
-                range_name="A1",
-                value_input_option="USER_ENTERED",
-            )
-
             section_count = sum(1 for _, df in sections if df is not None and len(df) > 0)
             print(f"[OK] 탭 '{tab_name}' 섹션 추가 완료 ({section_count}개)")
             return True
@@ -315,6 +296,85 @@ class GoogleSheetsUploader:
             print(f"[오류] 탭 '{tab_name}' 섹션 추가 실패: {str(e)}")
             return False
 
+    def write_sections(self, tab_name, blocks, replace_section_titles=None):
+        """
+        append_sections_to_tab의 전송 부분 (sheets_outbox 전송 스레드에서 호출) → 쓴 칸 수.
+        blocks: [(섹션제목, _section_rows 행 목록)]. 오류는 예외로 올림.
+        탭 전체를 읽거나 다시 쓰지 않고, 바뀐 섹션 범위를 values.batchUpdate 한 번으로 쓰고 남는 행만 비움.
+        """
+        if not getattr(self, "gc", None) or not self.SPREADSHEET_ID:
+            raise RuntimeError("구글 시트 연결 없음 (credentials, .env SPREADSHEET_ID 확인)")
+        spreadsheet = self.gc.open_by_key(self.SPREADSHEET_ID)
+
+        try:
+            worksheet = spreadsheet.worksheet(tab_name)
+            current = self._tab_sections(worksheet)
+        except gspread.WorksheetNotFound:
+            worksheet = spreadsheet.add_worksheet(title=tab_name, rows=8000, cols=40)
+            print(f"[생성] 탭 '{tab_name}' 새로 추가")
+            current = []
+
+        replace_titles = set(replace_section_titles or [])
+        by_title = {section['title']: section for section in current}
+        writes, clears, inserts = [], [], []
+
+        for section_title, rows in blocks:
+            width = max(len(row) for row in rows)
+            section = by_title.get(section_title) if section_title in replace_titles else None
+
+            if section is None:
+                # 새 섹션은 마지막 섹션 뒤에
+                section = {'title': section_title, 'start': end_row(current) + 1, 'rows': len(rows), 'cols': width}
+                current.append(section)
+                writes.append((section, rows))
+                continue
+
+            is_last = section['start'] + section['rows'] - 1 == end_row(current)
+            grow = len(rows) - section['rows']
+            if grow > 0 and not is_last:
+                # 가운데 섹션이 길어지면 뒤 섹션을 행 삽입으로 밀어냄
+                inserts.append((section['start'] + section['rows'] - 1, grow))
+                for other in current:
+                    if other['start'] > section['start']:
+                        other['start'] += grow
+            elif grow < 0:
+                # 줄어든 만큼 남는 행만 비움 (가운데 섹션은 빈 행으로 자리 유지)
+                clears.append((section, len(rows), section['rows'] - 1))
+            if section['cols'] is None:
+                # 열 수를 모르는 섹션(A열로 복원)은 남은 행도 먼저 비움
+                clears.append((section, 0, min(len(rows), section['rows']) - 1))
+            else:
+                # 빈 행·짧은 행도 이전 열 수만큼 ''로 채워 남은 값을 덮어씀
+                rows = [row + [''] * (section['cols'] - len(row)) for row in rows]
+            section['rows'] = len(rows) if grow > 0 or is_last else section['rows']
+            section['cols'] = max(width, section['cols'] or 0)
+            writes.append((section, rows))
+
+        if inserts:
+            # 각 위치는 앞서 기록한 삽입이 반영된 좌표이므로 기록한 순서대로 적용
+            spreadsheet.batch_update({'requests': [
+                {'insertDimension': {
+                    'range': {'sheetId': worksheet.id, 'dimension': 'ROWS',
+                              'startIndex': at, 'endIndex': at + count},
+                    'inheritFromBefore': True,
+                }}
+                for at, count in inserts
+            ]})
+        needed = end_row(current) - worksheet.row_count
+        if needed > 0:
+            worksheet.add_rows(needed)
+        if clears:
+            # 삽입으로 밀린 뒤의 최종 위치 기준
+            worksheet.batch_clear([
+                f"{section['start'] + first}:{section['start'] + last}" for section, first, last in clears
+            ])
+        worksheet.batch_update(
+            [{'range': f"A{section['start']}", 'values': rows} for section, rows in writes],
+            value_input_option="USER_ENTERED",
+        )
+        SectionIndex().put(self.SPREADSHEET_ID, tab_name, worksheet.id, current)
+        return sum(len(row) for _, rows in writes for row in rows)
+
     def prepare_dataframe_for_upload(self, df):
         """업로드용 DataFrame: NaN 처리, 숫자 컬럼은 숫자 값으로 전달 (서식 API 미사용)."""
         out = df.copy()
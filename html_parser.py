@@ -0,0 +1,39 @@
+"""
+네이버 금융 HTML 파서 선택.
+
+모든 추출 함수는 BeautifulSoup API(select·find_all·get_text)를 쓰므로, 여기서는 트리를 만드는
+백엔드만 고릅니다. 기본은 내장 html.parser이고, STOCK_HTML_PARSER=lxml 로 lxml(C 구현)을 쓸 수 있습니다
+(설치되지 않았으면 html.parser).
+
+lxml은 잘못 닫힌 태그를 다르게 복구할 수 있으므로, 기본 백엔드로 바꾸기 전에 녹화된 픽스처에서
+bench_parsers.py로 추출값이 html.parser와 같은지 확인합니다.
+"""
+import os
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+FALLBACK_PARSER = 'html.parser'
+
+
+def is_available(name: str) -> bool:
+    try:
+        BeautifulSoup('<p></p>', name)
+    except FeatureNotFound:
+        return False
+    return True
+
+
+def default_parser() -> str:
+    """STOCK_HTML_PARSER(설치된 경우) > html.parser"""
+    configured = os.getenv('STOCK_HTML_PARSER', '').strip()
+    if configured and is_available(configured):
+        return configured
+    return FALLBACK_PARSER
+
+
+PARSER = default_parser()
+
+
+def make_soup(markup: str, parser: str | None = None) -> BeautifulSoup:
+    """HTML 문자열 → BeautifulSoup (기본 백엔드: PARSER)."""
+    return BeautifulSoup(markup, parser or PARSER)
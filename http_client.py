@@ -0,0 +1,137 @@
+"""
+공용 HTTP 클라이언트 (연결 풀·keep-alive 세션).
+
+모든 크롤러는 requests.get 대신 이 모듈의 get()/fetch_text()를 사용합니다.
+프로세스당 하나의 requests.Session을 공유해 TCP·TLS 연결을 재사용하고,
+User-Agent·압축(gzip/deflate, brotli 설치 시 br)·타임아웃을 한곳에서 관리합니다.
+요청 전에는 rate_limiter.acquire()로 호스트별 요청 한도를 지킵니다.
+fetch_text()는 response_cache를 먼저 확인하므로 캐시된 페이지는 요청하지 않습니다.
+
+NAVER_FINANCE_BASE (예: http://127.0.0.1:8800)를 지정하면 https://finance.naver.com
+요청을 그 주소로 보냅니다 (naver_fixture_server.py로 오프라인 벤치마크할 때).
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import response_cache
+from rate_limiter import acquire
+
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+    'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# (연결 타임아웃, 읽기 타임아웃) 초
+DEFAULT_TIMEOUT = (5, 15)
+
+# 호스트별 연결 풀 크기 (동시 요청 수 이상으로)
+DEFAULT_POOL_SIZE = 10
+HOST_POOL_SIZES = {
+    'finance.naver.com': 32,
+}
+
+
+def _accept_encoding() -> str:
+    """urllib3가 풀 수 있는 압축만 요청 (brotli는 brotli/brotlicffi 설치 시)."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return 'gzip, deflate'
+    return 'gzip, deflate, br'
+
+
+NAVER_FINANCE_ORIGIN = 'https://finance.naver.com'
+
+
+def resolve_url(url: str) -> str:
+    """NAVER_FINANCE_BASE가 지정되어 있으면 네이버 금융 URL을 그 주소로 바꿈."""
+    base = os.getenv('NAVER_FINANCE_BASE', '').strip().rstrip('/')
+    if base and url.startswith(NAVER_FINANCE_ORIGIN + '/'):
+        return base + url[len(NAVER_FINANCE_ORIGIN):]
+    return url
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': _accept_encoding(),
+        'Connection': 'keep-alive',
+    })
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=DEFAULT_POOL_SIZE))
+    session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=DEFAULT_POOL_SIZE))
+    for host, size in HOST_POOL_SIZES.items():
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f'https://{host}/', adapter)
+        session.mount(f'http://{host}/', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """프로세스 공용 세션 (스레드 간 공유, 연결 풀 재사용)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session() -> None:
+    """공용 세션을 닫고 다음 요청에서 새로 만듦 (HOST_POOL_SIZES 변경 반영 등)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def new_session() -> requests.Session:
+    """
+    공용 세션과 쿠키를 나누지 않는 별도 세션 (헤더·연결 풀 설정은 같음).
+    네이버 시가총액 목록의 항목 선택처럼 쿠키로 응답이 달라지는 요청용.
+    """
+    return _build_session()
+
+
+def get(url: str, params=None, headers=None, timeout=DEFAULT_TIMEOUT, session=None) -> requests.Response:
+    """요청 한도 안에서 GET (session 미지정 시 공용 세션)."""
+    url = resolve_url(url)
+    acquire(url)
+    return (session or get_session()).get(url, params=params, headers=headers, timeout=timeout)
+
+
+def post(url: str, data=None, headers=None, timeout=DEFAULT_TIMEOUT, session=None) -> requests.Response:
+    """요청 한도 안에서 POST (session 미지정 시 공용 세션)."""
+    url = resolve_url(url)
+    acquire(url)
+    return (session or get_session()).post(url, data=data, headers=headers, timeout=timeout)
+
+
+def fetch_text(url: str, timeout=DEFAULT_TIMEOUT, use_cache=True) -> str:
+    """
+    GET 후 본문 텍스트 (인코딩은 응답 헤더 기준).
+    2xx가 아니면 requests.HTTPError (403·429·503 등의 오류 본문을 페이지로 파싱하거나 캐시하지 않음).
+    use_cache: 유효한 캐시가 있으면 요청 없이 반환하고, 200 응답은 캐시에 저장.
+    """
+    url = resolve_url(url)
+    if use_cache:
+        cached = response_cache.get(url)
+        if cached is not None:
+            return cached
+    response = get(url, timeout=timeout)
+    response.raise_for_status()
+    text = response.text
+    if use_cache and response.status_code == 200:
+        response_cache.put(url, text)
+    return text
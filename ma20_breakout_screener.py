@@ -10,125 +10,61 @@ from console_utf8 import enable as enable_utf8_console
 enable_utf8_console()
 
 import argparse
-import glob
-import re
 import sys
-import time
 from datetime import datetime
 
-import numpy as np
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 
+import ma_state
+import ohlcv_store
+import snapshot_catalog
+from stock_snapshot import load_snapshot
 from stock_data_utils import fill_trading_amounts_df
 from google_sheets_uploader import GoogleSheetsUploader
 
-HEADERS = {
-    'User-Agent': (
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-        'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    )
-}
-
 MIN_ROE = 5
 MIN_TRADING_VALUE_KRW = 5_000_000_000  # 50억원
 
 
 def find_latest_stock_data_file():
-    """가장 최신 full_stock_data 엑셀 파일."""
-    files = glob.glob('full_stock_data*.xlsx')
-    if not files:
-        return None
-
-    file_info = []
-    for path in files:
-        match = re.search(r'(\d{8}_\d{4})', path)
-        if match:
-            try:
-                dt = datetime.strptime(match.group(1), '%Y%m%d_%H%M')
-                file_info.append((path, dt))
-            except ValueError:
-                continue
-
-    if not file_info:
-        return max(files, key=lambda p: __import__('os').path.getmtime(p))
-
-    file_info.sort(key=lambda x: x[1])
-    return file_info[-1][0]
-
-
-def clean_numeric(value):
-    if pd.isna(value) or value == '':
-        return np.nan
-    try:
-        if isinstance(value, str):
-            value = value.replace(',', '').strip()
-        return float(value)
-    except (TypeError, ValueError):
-        return np.nan
+    """가장 최신 full_stock_data 스냅샷 (snapshot_catalog)."""
+    entry = snapshot_catalog.latest()
+    return entry['path'] if entry else None
 
 
 def fetch_daily_prices(code: str, pages: int = 4) -> pd.DataFrame:
-    """네이버 금융 일별 시세: 시가·종가·거래량."""
-    code = str(code).zfill(6)
-    rows = []
-
-    for page in range(1, pages + 1):
-        url = f'https://finance.naver.com/item/sise_day.naver?code={code}&page={page}'
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=15)
-            soup = BeautifulSoup(resp.text, 'html.parser')
-
-            for tr in soup.select('table.type2 tr'):
-                tds = tr.select('td')
-                if len(tds) < 7:
-                    continue
-                date_txt = tds[0].get_text(strip=True)
-                if not re.match(r'\d{4}\.\d{2}\.\d{2}', date_txt):
-                    continue
-                try:
-                    close = float(tds[1].get_text(strip=True).replace(',', ''))
-                    open_price = float(tds[2].get_text(strip=True).replace(',', ''))
-                    volume = int(tds[5].get_text(strip=True).replace(',', ''))
-                    rows.append({
-                        'date': datetime.strptime(date_txt, '%Y.%m.%d'),
-                        'open': open_price,
-                        'close': close,
-                        'volume': volume,
-                    })
-                except (ValueError, IndexError):
-                    continue
-        except requests.RequestException:
-            continue
-        time.sleep(0.08)
-
-    if not rows:
-        return pd.DataFrame()
-
-    return (
-        pd.DataFrame(rows)
-        .drop_duplicates(subset=['date'])
-        .sort_values('date')
-        .reset_index(drop=True)
-    )
+    """일봉 저장소(ohlcv_store)에서 최근 pages×10일 시가·고가·저가·종가·거래량."""
+    lookback = pages * 10
+    try:
+        return ohlcv_store.get_history(code, lookback=lookback)
+    except requests.RequestException:
+        # 갱신 실패 시 저장된 봉으로 판단
+        return ohlcv_store.load([code], lookback)[str(code).zfill(6)]
 
 
-def detect_ma20_breakout(df: pd.DataFrame) -> tuple[bool, dict | None]:
+def detect_ma20_breakout(df: pd.DataFrame, state=None) -> tuple[bool, dict | None]:
     """
     20일선 상향 돌파 + 돌파일 양봉 + 돌파일 거래대금 50억 이상.
+    state(ma_state.MovingAverageState)의 마지막 날짜가 df와 같으면 20일선을 상태에서 가져옴
+    (df는 최근 2봉이면 충분), 아니면 df 종가로 rolling 계산.
     """
-    if df is None or len(df) < 21:
+    if df is None or len(df) < 2:
         return False, None
 
-    work = df.copy()
-    work['ma20'] = work['close'].rolling(window=20).mean()
-
-    prev = work.iloc[-2]
-    today = work.iloc[-1]
+    prev = df.iloc[-2]
+    today = df.iloc[-1]
+    if state is not None and state.last_date == today['date'].strftime('%Y-%m-%d'):
+        bars = state.bars
+        prev_ma20, today_ma20 = state.average(20, back=1), state.average(20)
+    else:
+        bars = len(df)
+        ma20 = df['close'].rolling(window=20).mean()
+        prev_ma20, today_ma20 = ma20.iloc[-2], ma20.iloc[-1]
+    if bars < 21:
+        return False, None
 
     prev_close, today_close = prev['close'], today['close']
-    prev_ma20, today_ma20 = prev['ma20'], today['ma20']
     today_open = today['open']
     today_volume = today['volume']
 
@@ -165,22 +101,23 @@ def detect_ma20_breakout(df: pd.DataFrame) -> tuple[bool, dict | None]:
     }
 
 
-def screen_ma20_breakout(limit: int = 0, sleep_sec: float = 0.12):
-    """ROE>5 종목 중 조건 충족 종목 추출."""
-    data_file = find_latest_stock_data_file()
-    if not data_file:
-        print('[오류] full_stock_data*.xlsx 파일이 없습니다. 먼저 quick_stock_check.py를 실행하세요.')
-        return None
+def screen_ma20_breakout(limit: int = 0, stock_df: pd.DataFrame | None = None):
+    """ROE>5 종목 중 조건 충족 종목 추출. stock_df(전체 종목)가 없으면 최신 스냅샷을 읽음."""
+    if stock_df is None:
+        data_file = find_latest_stock_data_file()
+        if not data_file:
+            print('[오류] full_stock_data 스냅샷이 없습니다. 먼저 quick_stock_check.py를 실행하세요.')
+            return None
+        print(f'[데이터] {data_file}')
+        stock_df = load_snapshot(data_file)
 
-    print(f'[데이터] {data_file}')
-    base = fill_trading_amounts_df(pd.read_excel(data_file))
+    base = fill_trading_amounts_df(stock_df)
     print(f'[로드] 전체 {len(base)}개 종목')
 
     if 'ROE' not in base.columns:
         print('[오류] ROE 컬럼이 없습니다.')
         return None
 
-    base['ROE'] = base['ROE'].apply(clean_numeric)
     candidates = base[base['ROE'] > MIN_ROE].copy()
     print(f'[필터] ROE > {MIN_ROE}: {len(candidates)}개')
     print(f'[조건] 20일선 상향 돌파 + 돌파일 양봉 + 돌파일 거래대금 >= 50억원')
@@ -197,7 +134,8 @@ def screen_ma20_breakout(limit: int = 0, sleep_sec: float = 0.12):
         name = row.get('종목명', '')
 
         hist = fetch_daily_prices(code)
-        ok, metrics = detect_ma20_breakout(hist)
+        state = ma_state.refresh([code]).get(code)
+        ok, metrics = detect_ma20_breakout(hist, state)
 
         if ok:
             record = row.to_dict()
@@ -211,8 +149,6 @@ def screen_ma20_breakout(limit: int = 0, sleep_sec: float = 0.12):
         if i % 50 == 0:
             print(f'  ... 진행 {i}/{total} (충족 {len(hits)}개)')
 
-        time.sleep(sleep_sec)
-
     result_df = pd.DataFrame(hits)
     if len(result_df) > 0 and 'ROE' in result_df.columns:
         result_df = result_df.sort_values(
@@ -230,15 +166,8 @@ def screen_ma20_breakout(limit: int = 0, sleep_sec: float = 0.12):
 MA20_SECTION_TITLE = '--- 20일선 상향 돌파 ---'
 
 
-def upload_ma20_to_google_sheets(result_df: pd.DataFrame, tab_name: str | None = None) -> bool:
-    """동일 스프레드시트의 날짜 탭에 20일선 돌파 섹션을 추가."""
-    print('\n[구글 시트] 업로드 시작...')
-    uploader = GoogleSheetsUploader()
-    if not getattr(uploader, 'gc', None):
-        print('[오류] 구글 시트 연결 실패 (.env SPREADSHEET_ID, credentials 확인)')
-        return False
-
-    date_tab = tab_name or datetime.now().strftime('%Y-%m-%d')
+def ma20_sections(result_df: pd.DataFrame) -> list:
+    """날짜 탭에 넣을 20일선 돌파 섹션 [(제목, DataFrame 또는 None)]"""
     run_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     summary = pd.DataFrame({
         '항목': ['분석 일시', '조건 충족 종목 수', '조건'],
@@ -249,15 +178,26 @@ def upload_ma20_to_google_sheets(result_df: pd.DataFrame, tab_name: str | None =
         ],
     })
 
-    sections = [
+    return [
         (MA20_SECTION_TITLE, summary),
         ('--- 20일선 돌파 종목 ---', result_df if len(result_df) > 0 else None),
     ]
 
+
+def upload_ma20_to_google_sheets(result_df: pd.DataFrame, tab_name: str | None = None) -> bool:
+    """동일 스프레드시트의 날짜 탭에 20일선 돌파 섹션을 추가."""
+    print('\n[구글 시트] 업로드 시작...')
+    uploader = GoogleSheetsUploader()
+    if not getattr(uploader, 'gc', None):
+        print('[오류] 구글 시트 연결 실패 (.env SPREADSHEET_ID, credentials 확인)')
+        return False
+
+    date_tab = tab_name or datetime.now().strftime('%Y-%m-%d')
+    sections = ma20_sections(result_df)
     ok = uploader.append_sections_to_tab(
         date_tab,
         sections,
-        replace_section_titles={MA20_SECTION_TITLE, '--- 20일선 돌파 종목 ---'},
+        replace_section_titles={title for title, _ in sections},
     )
     if ok:
         url = uploader.get_spreadsheet_url()
@@ -272,13 +212,12 @@ def main():
         description='ROE>5, 20일선 상향 돌파, 양봉, 거래대금 50억+ 스크리닝'
     )
     parser.add_argument('--limit', type=int, default=0, help='테스트용 검사 종목 수 제한')
-    parser.add_argument('--sleep', type=float, default=0.12, help='종목당 요청 간격(초)')
     parser.add_argument('--no-upload', dest='upload', action='store_false', help='구글 시트 업로드 생략')
     parser.add_argument('--sheet-tab', default='', help='업로드할 탭 이름 (기본: 오늘 YYYY-MM-DD)')
     parser.set_defaults(upload=True)
     args = parser.parse_args()
 
-    result_df = screen_ma20_breakout(limit=args.limit, sleep_sec=args.sleep)
+    result_df = screen_ma20_breakout(limit=args.limit)
     if result_df is None:
         sys.exit(1)
 
@@ -0,0 +1,271 @@
+"""
+종목별 이동평균 상태 저장소 (MA5 / MA20 / MA45 / MA360 증분 갱신).
+
+분석할 때마다 일봉 전체에 rolling(window).mean()을 다시 돌리는 대신, 종목마다
+창별 종가 합계와 최근 종가(가장 긴 창 + 1개)를 저장해 두고 새 봉이 오면 합계에서
+빠지는 종가를 빼고 새 종가를 더합니다 (봉 하나에 창마다 O(1)).
+상태가 있으면 최근 봉만 읽어도 이동평균을 정확히 알 수 있어 360일선 전략도 일봉 400개를 읽지 않습니다.
+
+    refresh(codes)              일봉 저장소(ohlcv_store)의 새 봉을 상태에 반영하고 저장 → {코드: MovingAverageState}
+    MovingAverageState          push(date, close) / revise(close) / average(window, back) / series(window, count)
+
+- 종가가 정수(원)이면 합계를 정수로 유지하므로 오차가 쌓이지 않고,
+  값은 pandas rolling(window).mean()과 소수점 끝자리까지 같습니다.
+- 이동평균 값은 창마다 최근 KEEP개 봉만 보관합니다 (리바운드 전략이 최근 60봉을 봄).
+- ohlcv_store처럼 마지막 봉은 장중 미완성 봉일 수 있어 종가가 바뀌면 그 봉만 고치고(revise),
+  그 전 봉의 종가가 달라졌으면(수정주가로 전체를 다시 받은 경우) 저장된 일봉으로 상태를 새로 만듭니다.
+- 일봉 저장소의 첫 봉 날짜가 상태를 만들 때와 다르면 (더 긴 lookback으로 이력을 다시 받은 경우 등)
+  저장된 일봉 전체로 상태를 새로 만듭니다.
+
+저장 위치: 일봉 저장소와 같은 파일 (OHLCV_STORE_PATH, 테이블 ma_state)
+"""
+import json
+import math
+import sqlite3
+import threading
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+import ohlcv_store
+
+WINDOWS = (5, 20, 45, 360)
+KEEP = 60
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    path = ohlcv_store.store_path()
+    if conn is None or getattr(_local, 'path', None) != path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # prev_date·last_date: 상태에 반영된 마지막 두 봉 (다음 갱신 때 일봉과 맞는지 확인)
+        # first_date: 상태에 반영된 첫 봉 (일봉 이력을 더 길게 다시 받았는지 확인)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS ma_state ('
+            ' code TEXT PRIMARY KEY, last_date TEXT NOT NULL, prev_date TEXT,'
+            ' bars INTEGER NOT NULL, payload TEXT NOT NULL, first_date TEXT)'
+        )
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(ma_state)')}
+        if 'first_date' not in columns:
+            # 이전 형식: first_date가 NULL인 상태는 다음 refresh 때 새로 만들어짐
+            conn.execute('ALTER TABLE ma_state ADD COLUMN first_date TEXT')
+        _local.conn, _local.path = conn, path
+    return conn
+
+
+def _normalize_code(code) -> str:
+    return str(code).replace('.0', '').zfill(6)
+
+
+def _exact(close):
+    """정수 종가는 int로 (합계를 정수로 유지)"""
+    close = float(close)
+    return int(close) if close.is_integer() else close
+
+
+def _window_sum(closes: deque, window: int):
+    """최근 window개 종가 합 (소수 종가가 섞였을 때만 다시 합산)"""
+    values = list(islice(reversed(closes), window))
+    if all(isinstance(v, int) for v in values):
+        return sum(values)
+    return math.fsum(values)
+
+
+class MovingAverageState:
+    """한 종목의 이동평균 상태. bars는 지금까지 반영한 봉 수 (종목별 분석의 len(일봉)에 해당)."""
+
+    def __init__(self, code, windows=WINDOWS, keep=KEEP):
+        self.code = _normalize_code(code)
+        self.windows = tuple(windows)
+        self.keep = keep
+        self.bars = 0
+        self.first_date = None
+        self.dates = deque(maxlen=2)
+        self.closes = deque(maxlen=max(self.windows) + 1)
+        self.totals = {w: 0 for w in self.windows}
+        self.averages = {w: deque(maxlen=keep) for w in self.windows}
+
+    @property
+    def last_date(self) -> str | None:
+        return self.dates[-1] if self.dates else None
+
+    @property
+    def prev_date(self) -> str | None:
+        return self.dates[0] if len(self.dates) == 2 else None
+
+    def push(self, date: str, close) -> None:
+        """새 봉 반영"""
+        value = _exact(close)
+        if not self.bars:
+            self.first_date = date
+        self.closes.append(value)
+        self.dates.append(date)
+        self.bars += 1
+        for w in self.windows:
+            total = self.totals[w] + value
+            if self.bars > w:
+                total -= self.closes[-w - 1]
+            if not isinstance(total, int):
+                total = _window_sum(self.closes, w)
+            self.totals[w] = total
+            if self.bars >= w:
+                self.averages[w].append(total / w)
+
+    def revise(self, close) -> None:
+        """마지막 봉 종가 수정 (장중에 받은 봉이 확정된 경우)"""
+        old, value = self.closes[-1], _exact(close)
+        self.closes[-1] = value
+        for w in self.windows:
+            total = self.totals[w] + value - old
+            if not isinstance(total, int):
+                total = _window_sum(self.closes, w)
+            self.totals[w] = total
+            if self.bars >= w:
+                self.averages[w][-1] = total / w
+
+    def average(self, window: int, back: int = 0) -> float:
+        """back봉 전 이동평균 (0: 마지막 봉). 봉이 부족하거나 보관 범위 밖이면 NaN."""
+        values = self.averages[window]
+        return values[-1 - back] if back < len(values) else math.nan
+
+    def series(self, window: int, count: int) -> np.ndarray:
+        """최근 count봉의 이동평균 (마지막 값이 마지막 봉, 값이 없는 앞쪽은 NaN)"""
+        values = list(self.averages[window])[-count:] if count else []
+        out = np.full(count, np.nan)
+        if values:
+            out[count - len(values):] = values
+        return out
+
+    @classmethod
+    def build(cls, code, dates, closes, windows=WINDOWS, keep=KEEP) -> 'MovingAverageState':
+        """일봉 전체(날짜 오름차순)로 상태 만들기. 정수 종가면 누적합으로 한 번에 계산."""
+        state = cls(code, windows, keep)
+        values = [_exact(c) for c in closes]
+        if not all(isinstance(v, int) for v in values):
+            for date, value in zip(dates, values):
+                state.push(date, value)
+            return state
+
+        n = len(values)
+        cumsum = np.concatenate([[0], np.cumsum(np.array(values, dtype='int64'))])
+        for w in state.windows:
+            state.totals[w] = int(cumsum[n] - cumsum[max(n - w, 0)])
+            ends = np.arange(max(w, n - keep + 1), n + 1)
+            state.averages[w].extend(((cumsum[ends] - cumsum[ends - w]) / w).tolist())
+        state.bars = n
+        dates = list(dates)
+        state.first_date = dates[0] if dates else None
+        state.dates.extend(dates[-2:])
+        state.closes.extend(values[-state.closes.maxlen:])
+        return state
+
+    def extend(self, dates, closes) -> bool:
+        """
+        prev_date 이후(포함) 일봉 반영. 저장된 두 봉과 맞지 않으면 False (새로 만들어야 함).
+        """
+        known = list(self.dates)
+        if list(dates[:len(known)]) != known:
+            return False
+        if len(known) == 2 and _exact(closes[0]) != self.closes[-2]:
+            return False
+        last = len(known) - 1
+        if _exact(closes[last]) != self.closes[-1]:
+            self.revise(closes[last])
+        for date, close in zip(dates[last + 1:], closes[last + 1:]):
+            self.push(date, close)
+        return True
+
+    def payload(self) -> str:
+        return json.dumps({
+            'windows': list(self.windows),
+            'keep': self.keep,
+            'closes': list(self.closes),
+            'totals': [self.totals[w] for w in self.windows],
+            'averages': [list(self.averages[w]) for w in self.windows],
+        })
+
+    @classmethod
+    def from_row(cls, code, last_date, prev_date, bars, payload, first_date=None) -> 'MovingAverageState':
+        data = json.loads(payload)
+        state = cls(code, data['windows'], data['keep'])
+        state.bars = bars
+        state.first_date = first_date
+        state.dates.extend([d for d in (prev_date, last_date) if d])
+        state.closes.extend(data['closes'])
+        for w, total, averages in zip(state.windows, data['totals'], data['averages']):
+            state.totals[w] = total
+            state.averages[w].extend(averages)
+        return state
+
+
+def _has_bars(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bars'"
+    ).fetchone() is not None
+
+
+def refresh(codes, windows=WINDOWS, keep=KEEP) -> dict:
+    """
+    일봉 저장소의 새 봉을 종목별 상태에 반영하고 저장. 일봉이 있는 종목만 {코드: 상태}.
+    상태가 있는 종목은 prev_date 이후 봉(보통 2~3개)만 읽고, 없거나 맞지 않으면 저장된 일봉 전체로 만듦.
+    일봉의 첫 날짜가 상태의 first_date와 다르면 (ohlcv_store가 더 긴 이력으로 다시 채운 경우) 역시 새로 만듦.
+    """
+    codes = [_normalize_code(c) for c in codes]
+    conn = _connect()
+    if not _has_bars(conn):
+        return {}
+    windows = tuple(windows)
+    states = {}
+
+    for i in range(0, len(codes), 500):
+        chunk = codes[i:i + 500]
+        marks = ','.join('?' * len(chunk))
+        first_dates = dict(conn.execute(
+            f'SELECT code, MIN(date) FROM bars WHERE code IN ({marks}) GROUP BY code', chunk
+        ))
+        saved, existing = {}, set()
+        for row in conn.execute(
+            f'SELECT code, last_date, prev_date, bars, payload, first_date FROM ma_state WHERE code IN ({marks})',
+            chunk,
+        ):
+            state = MovingAverageState.from_row(*row)
+            existing.add(state.code)
+            # 창·보관 개수를 바꿨거나 일봉 이력을 다시 받았으면 새로 만듦
+            if (state.windows == windows and state.keep == keep
+                    and state.first_date == first_dates.get(state.code)):
+                saved[state.code] = state
+
+        bars = {}
+        for code, date, close in conn.execute(
+            'SELECT b.code, b.date, b.close FROM bars b LEFT JOIN ma_state s ON s.code = b.code'
+            f' WHERE b.code IN ({marks}) AND (s.code IS NULL OR b.date >= COALESCE(s.prev_date, s.last_date))'
+            ' ORDER BY b.code, b.date', chunk
+        ):
+            dates, closes = bars.setdefault(code, ([], []))
+            dates.append(date)
+            closes.append(close)
+
+        for code, (dates, closes) in bars.items():
+            state = saved.get(code)
+            if state is None or not state.extend(dates, closes):
+                if code in existing:
+                    # 저장된 상태와 일봉이 맞지 않음 (수정주가 등) → 일봉 전체로
+                    dates, closes = map(list, zip(*conn.execute(
+                        'SELECT date, close FROM bars WHERE code = ? ORDER BY date', (code,)
+                    ).fetchall()))
+                state = MovingAverageState.build(code, dates, closes, windows, keep)
+            states[code] = state
+
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO ma_state (code, last_date, prev_date, bars, payload, first_date)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                [(states[code].code, states[code].last_date, states[code].prev_date,
+                  states[code].bars, states[code].payload(), states[code].first_date) for code in bars],
+            )
+    return states
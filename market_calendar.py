@@ -38,3 +38,17 @@ def resolve_sheet_tab(explicit: str | None = None, day: date | None = None) -> s
         return explicit.strip()
     ref = get_last_krx_trading_day(day)
     return ref.strftime("%Y-%m-%d")
+
+
+def next_krx_session_open(moment: datetime) -> datetime:
+    """moment(시간대 포함) 이후 처음 열리는 정규장 시작 시각 (UTC)."""
+    import pandas as pd
+
+    return _get_calendar().next_open(pd.Timestamp(moment)).to_pydatetime()
+
+
+def is_krx_market_open(moment: datetime) -> bool:
+    """moment(시간대 포함)가 정규장 시간 안이면 True."""
+    import pandas as pd
+
+    return bool(_get_calendar().is_open_on_minute(pd.Timestamp(moment).floor("min")))
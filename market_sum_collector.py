@@ -0,0 +1,306 @@
+"""
+시가총액 목록(sise_market_sum) 항목 선택으로 전 종목 기본 지표 일괄 수집.
+
+네이버 시가총액 목록은 표에 보일 항목을 최대 6개까지 고를 수 있고(field_submit), 한 페이지에 약 50종목이 나옵니다.
+항목 묶음마다 코스피·코스닥 전체 페이지(약 60페이지)를 받으면 PER·ROE·PBR·시가총액·거래량·전일거래량을
+종목 페이지 없이 얻습니다 (종목당 main·frgn·coinfo·sise_day 4회, 전체 약 1만 회 → 묶음당 약 60회).
+전일종가는 현재가와 전일비(등락률 부호)로, 배당수익률은 보통주배당금 / 현재가로 계산합니다.
+
+목록에 없는 값(업종·52주최고/최저·기관비율·베타·부채비율)이 필요할 때만 종목 main·frgn 페이지를 받아
+빈 칸을 채웁니다 (details, 종목당 2회). 같은 값이 둘 다 있으면 목록 값을 씁니다.
+
+    collect_listing(field_sets)          {종목코드: 값 dict} (일반 주식만, 목록 순서)
+    collect_stock_data(details=True)     quick_stock_check와 같은 스키마의 행 목록
+
+항목 선택은 세션 쿠키에 남으므로 공용 세션과 나눈 별도 세션으로 요청합니다
+(다른 크롤러가 읽는 기본 목록의 열 위치가 바뀌지 않도록). 쿠키가 유지되지 않으면 페이지마다 다시 선택합니다.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import http_client
+from html_parser import make_soup
+from quick_stock_check import (
+    DETAIL_FIELDS,
+    INVESTOR_URL,
+    MAIN_URL,
+    MARKET_NAMES,
+    MARKET_SUM_URL,
+    MainPageView,
+    build_stock_row,
+    extract_additional_finance_data,
+    extract_investor_data,
+    extract_main_page_data,
+    fetch_soup,
+    parse_max_page,
+)
+from stock_classifier import classify
+
+FIELD_SUBMIT_URL = 'https://finance.naver.com/sise/field_submit.naver'
+MAX_FIELDS = 6
+
+# 네이버 항목 id → (목록 머리글, 스키마 열). 단위는 종목 페이지 값과 같음 (억원·원·%·배)
+FIELDS = {
+    'quant': ('거래량', '거래량'),
+    'prev_quant': ('전일거래량', '전일거래량'),
+    'market_sum': ('시가총액', '시가총액'),
+    'per': ('PER', 'PER'),
+    'roe': ('ROE', 'ROE'),
+    'pbr': ('PBR', 'PBR'),
+    'frgn_rate': ('외국인비율', '외국인비율'),
+    'sales': ('매출액', '매출액'),
+    'operating_profit': ('영업이익', '영업이익'),
+    'net_income': ('당기순이익', '당기순이익'),
+    'reserve_ratio': ('유보율', '유보율'),
+    'dividend': ('보통주배당금', '배당금'),
+}
+CORE_FIELDS = ('quant', 'prev_quant', 'market_sum', 'per', 'roe', 'pbr')
+EXTRA_FIELDS = ('frgn_rate', 'sales', 'operating_profit', 'net_income', 'reserve_ratio', 'dividend')
+FIELD_SETS = (CORE_FIELDS, EXTRA_FIELDS)
+
+# 목록으로 얻을 수 없어 종목 페이지(main·frgn)에서 채우는 열
+DETAIL_ONLY_COLUMNS = ('업종', '52주최고', '52주최저', '기관비율', '베타', '부채비율')
+
+# 목록 요청 재시도: 429·5xx·연결 오류는 RETRY_DELAY × 2^(시도-1)초 뒤, REQUEST_ATTEMPTS회까지
+RETRY_STATUS = {429, 500, 502, 503, 504}
+REQUEST_ATTEMPTS = 4
+RETRY_DELAY = 2.0
+
+_RE_LABEL = re.compile(r'\(.*?\)|\s')
+_RE_DIGITS = re.compile(r'[^\d]')
+
+
+def _label(text: str) -> str:
+    """머리글 텍스트에서 단위 괄호·공백 제거 ('거래대금(백만)' → '거래대금')"""
+    return _RE_LABEL.sub('', text)
+
+
+def _value(text: str) -> str:
+    text = text.strip().replace(',', '')
+    return '' if text in ('N/A', '-') else text
+
+
+def _prev_close(price: str, change: str, rate: str) -> str:
+    """현재가 - 전일비 (등락률이 음수면 더함)"""
+    amount = _RE_DIGITS.sub('', change)
+    if not price or not amount:
+        return ''
+    try:
+        sign = -1 if rate.strip().startswith('-') else 1
+        return str(int(float(price)) - sign * int(amount))
+    except ValueError:
+        return ''
+
+
+def parse_listing_page(soup) -> tuple[list[str], list[dict]]:
+    """
+    목록 페이지 → (머리글 목록, 행 목록). 행은 {머리글: 셀 텍스트} + 종목명·종목코드 (일반 주식만).
+    """
+    table = soup.select_one('table.type_2')
+    if table is None:
+        return [], []
+    headers = [_label(th.get_text()) for th in table.select('tr th')]
+    rows = []
+    for tr in table.select('tr'):
+        cells = tr.select('td')
+        if len(cells) != len(headers):
+            continue
+        link = cells[headers.index('종목명')].select_one('a') if '종목명' in headers else None
+        if link is None or 'code=' not in link.get('href', ''):
+            continue
+        name = link.get_text(strip=True)
+        code = link['href'].split('=')[-1]
+        if not classify(code, name):
+            continue
+        row = {label: cell.get_text(strip=True) for label, cell in zip(headers, cells)}
+        row['종목명'], row['종목코드'] = name, code
+        rows.append(row)
+    return headers, rows
+
+
+def _request_text(send, what: str) -> str:
+    """send() 응답 본문. 일시 오류(RETRY_STATUS·연결 오류)는 다시 보내고, 그 밖의 오류·마지막 실패는 예외."""
+    for attempt in range(1, REQUEST_ATTEMPTS + 1):
+        try:
+            response = send()
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.text
+            error = requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        if attempt == REQUEST_ATTEMPTS:
+            raise error
+        delay = RETRY_DELAY * 2 ** (attempt - 1)
+        print(f"[재시도] {what}: {error} → {delay:.0f}초 뒤 ({attempt}/{REQUEST_ATTEMPTS})")
+        time.sleep(delay)
+
+
+def select_fields(session, field_ids, return_url: str) -> str:
+    """field_submit으로 목록 항목 선택 → 돌아온 목록 페이지 본문"""
+    data = [('menu', 'market_sum'), ('returnUrl', http_client.resolve_url(return_url))]
+    data += [('fieldIds', field_id) for field_id in field_ids]
+    return _request_text(
+        lambda: http_client.post(FIELD_SUBMIT_URL, data=data, session=session), f"항목 선택 {return_url}",
+    )
+
+
+def _listing_pages(session, field_ids, market_type: int, max_pages=None):
+    """선택한 항목으로 한 시장의 목록을 페이지마다 행 목록으로"""
+    expected = {FIELDS[f][0] for f in field_ids}
+    page, max_page = 1, 1
+    while page <= max_page:
+        url = MARKET_SUM_URL.format(market_type=market_type, page=page)
+        if page == 1:
+            soup = make_soup(select_fields(session, field_ids, url))
+            max_page = parse_max_page(soup)
+            if max_pages:
+                max_page = min(max_page, max_pages)
+        else:
+            soup = make_soup(_request_text(lambda: http_client.get(url, session=session), url))
+        headers, rows = parse_listing_page(soup)
+        if not expected <= set(headers):
+            # 선택이 쿠키에 남지 않은 경우 이 페이지를 돌려받도록 다시 선택
+            soup = make_soup(select_fields(session, field_ids, url))
+            headers, rows = parse_listing_page(soup)
+            if not expected <= set(headers):
+                missing = ', '.join(sorted(expected - set(headers)))
+                raise RuntimeError(f"{MARKET_NAMES[market_type]} {page}페이지 목록 항목 선택 실패 (없는 항목: {missing})")
+        yield rows
+        page += 1
+
+
+def collect_listing(field_sets=FIELD_SETS, market_types=(0, 1), max_pages=None) -> dict:
+    """
+    항목 묶음마다 시장별 목록 전체 페이지를 받아 종목별 값으로 합침 → {종목코드: {열: 문자열}}.
+    현재가·전일종가는 첫 묶음의 값 (묶음 사이에 시세가 바뀌어도 한 종목 안에서는 같은 시점).
+    """
+    listing = {}
+    for field_ids in field_sets:
+        if len(field_ids) > MAX_FIELDS:
+            raise ValueError(f"항목은 한 번에 {MAX_FIELDS}개까지 선택할 수 있습니다: {field_ids}")
+        columns = {FIELDS[f][0]: FIELDS[f][1] for f in field_ids}
+        session = http_client.new_session()
+        try:
+            for market_type in market_types:
+                for rows in _listing_pages(session, field_ids, market_type, max_pages):
+                    for row in rows:
+                        entry = listing.get(row['종목코드'])
+                        if entry is None:
+                            price = _value(row.get('현재가', ''))
+                            entry = listing[row['종목코드']] = {
+                                '종목명': row['종목명'],
+                                '종목코드': row['종목코드'],
+                                '시장구분': MARKET_NAMES[market_type],
+                                '현재가': price,
+                                '전일종가': _prev_close(price, row.get('전일비', ''), row.get('등락률', '')),
+                            }
+                        for label, column in columns.items():
+                            entry[column] = _value(row.get(label, ''))
+        finally:
+            session.close()
+    return listing
+
+
+def parse_detail_pages(main_soup, investor_soup) -> dict:
+    """종목 main·frgn 페이지에서 상세 값 (coinfo 없이, 목록에 없는 값 보충용)"""
+    data = dict.fromkeys(DETAIL_FIELDS, '')
+    data.update({'영업이익률': '', '순이익률': ''})
+    main_page = MainPageView(main_soup)
+    extract_main_page_data(main_page, data)
+    extract_investor_data(investor_soup, data)
+    extract_additional_finance_data(main_page, data)
+    return data
+
+
+def fetch_details(code: str, name: str = '') -> dict | None:
+    """종목 main·frgn 페이지 값. 요청·파싱 실패면 None (행은 쓰되 저널에는 남기지 않음)."""
+    try:
+        return parse_detail_pages(
+            fetch_soup(MAIN_URL.format(code=code)),
+            fetch_soup(INVESTOR_URL.format(code=code)),
+        )
+    except Exception as e:
+        print(f"{name or code} 상세 데이터 수집 오류: {str(e)}")
+        return None
+
+
+def _dividend_yield(dividend: str, price: str) -> str:
+    try:
+        value = float(dividend) / float(price) * 100
+    except (TypeError, ValueError, ZeroDivisionError):
+        return ''
+    return f"{value:.2f}" if value > 0 else ''
+
+
+def build_row(entry: dict, details: dict | None = None) -> dict:
+    """목록 값(우선) + 종목 페이지 값(빈 칸만)으로 STOCK_DATA_COLUMN_ORDER 스키마의 행"""
+    values = {key: entry.get(key, '') for key in DETAIL_FIELDS}
+    for key, value in (details or {}).items():
+        if key in values and not values[key]:
+            values[key] = value
+    if not values['배당수익률']:
+        values['배당수익률'] = _dividend_yield(values['배당금'], entry.get('현재가', ''))
+    return build_stock_row(
+        entry['종목명'], entry['종목코드'], entry['시장구분'],
+        entry.get('현재가', ''), entry.get('거래량', ''),
+        tuple(values[key] for key in DETAIL_FIELDS),
+        entry.get('전일종가', ''), entry.get('전일거래량', ''),
+    )
+
+
+def _no_fundamentals(entry: dict) -> bool:
+    """ETF/펀드 추정: PER·PBR·ROE를 받았는데 모두 비어 있음"""
+    keys = [key for key in ('PER', 'PBR', 'ROE') if key in entry]
+    return bool(keys) and not any(entry[key] for key in keys)
+
+
+def collect_stock_data(field_sets=FIELD_SETS, details=True, concurrency=8, journal=None,
+                       market_types=(0, 1), max_pages=None):
+    """
+    목록 일괄 수집 + (details) 목록에 없는 값만 종목 페이지에서 → get_stock_data()와 같은 행 목록.
+    journal: CrawlJournal. 저널에 있는 종목은 기록된 행을 쓰고, 새로 만든 행은 기록.
+    """
+    started = time.monotonic()
+    listing = collect_listing(field_sets, market_types=market_types, max_pages=max_pages)
+    print(f"목록 일괄 수집: {len(listing)}개 종목, 항목 묶음 {len(field_sets)}개 ({time.monotonic() - started:.0f}초)")
+
+    rows, pending = {}, []
+    for code, entry in listing.items():
+        if journal is not None and code in journal:
+            row = journal.row(code)
+            if row:
+                rows[code] = row
+            continue
+        if _no_fundamentals(entry):
+            print(f"  - {entry['종목명']}: PER/PBR/ROE 데이터 없음 (ETF/펀드로 추정) - 제외")
+            if journal is not None:
+                journal.mark_skipped(code)
+            continue
+        if not entry.get('현재가'):
+            continue
+        pending.append(entry)
+
+    def finish(entry, extra=None):
+        row = build_row(entry, extra)
+        # 종목 페이지를 못 받은 행은 저널에 남기지 않음 (--resume 때 다시 수집)
+        if journal is not None and not (details and extra is None):
+            journal.append(row)
+        return row
+
+    if details and pending:
+        print(f"종목 페이지 보충 ({', '.join(DETAIL_ONLY_COLUMNS)}): {len(pending)}개 종목 × 2페이지")
+        with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+            extras = executor.map(lambda e: fetch_details(e['종목코드'], e['종목명']), pending)
+            for i, (entry, extra) in enumerate(zip(pending, extras), start=1):
+                rows[entry['종목코드']] = finish(entry, extra)
+                if i % 200 == 0:
+                    print(f"  - {i}/{len(pending)}개 종목 보충 ({time.monotonic() - started:.0f}초)")
+    else:
+        for entry in pending:
+            rows[entry['종목코드']] = finish(entry)
+
+    return [rows[code] for code in listing if code in rows]
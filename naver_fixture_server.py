@@ -0,0 +1,381 @@
+"""
+네이버 금융 응답 녹화·재생 (오프라인 벤치마크용).
+
+record  실제 sise_market_sum·main·frgn·coinfo·sise_day 응답을 픽스처 폴더에 저장
+serve   저장한 픽스처를 로컬 HTTP 서버로 제공 (지연·오류 주입 가능)
+bench   로컬 서버를 띄워 파서 속도·동시 수집 처리량 측정 (네트워크 불필요)
+
+픽스처 폴더 (기본: 프로젝트/fixtures/naver):
+    manifest.json      경로+정렬된 쿼리 → 파일 이름·Content-Type
+    *.html             원본 응답 바이트 (EUC-KR 그대로)
+
+크롤러를 로컬 서버로 돌리려면 NAVER_FINANCE_BASE를 지정합니다:
+    python naver_fixture_server.py serve --port 8800 --latency-ms 80 --error-rate 0.01
+    NAVER_FINANCE_BASE=http://127.0.0.1:8800 HTTP_CACHE=0 python quick_stock_check.py --rps 0 --source pages
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+DEFAULT_FIXTURE_DIR = PROJECT_ROOT / "fixtures" / "naver"
+NAVER_ORIGIN = "https://finance.naver.com"
+
+MARKET_SUM_PATH = "/sise/sise_market_sum.naver"
+STOCK_PAGES = (
+    ("/item/main.naver", {}),
+    ("/item/frgn.naver", {}),
+    ("/item/coinfo.naver", {"target": "finsum_more"}),
+)
+DAILY_PATH = "/item/sise_day.naver"
+
+
+def fixture_key(path_and_query: str) -> str:
+    """호스트를 뺀 경로 + 정렬된 쿼리 (녹화·재생 공통 키)."""
+    parts = urlsplit(path_and_query)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{parts.path}?{query}" if query else parts.path
+
+
+def fixture_filename(key: str) -> str:
+    return re.sub(r"[^0-9A-Za-z]+", "_", key).strip("_") + ".html"
+
+
+def load_manifest(fixture_dir: Path) -> dict:
+    path = fixture_dir / "manifest.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_manifest(fixture_dir: Path, manifest: dict) -> None:
+    path = fixture_dir / "manifest.json"
+    path.write_text(json.dumps(manifest, ensure_ascii=False, indent=1, sort_keys=True), encoding="utf-8")
+
+
+# ---------------------------------------------------------------------------
+# record
+# ---------------------------------------------------------------------------
+
+def record(fixture_dir: Path, markets=(0, 1), market_pages=1, stocks_per_market=20,
+           codes=(), daily_pages=4) -> int:
+    """실제 네이버 금융 응답을 녹화. 저장한 응답 수를 반환."""
+    import http_client
+    from html_parser import make_soup
+    from quick_stock_check import parse_market_sum_rows
+
+    if os.getenv("NAVER_FINANCE_BASE"):
+        print("[오류] NAVER_FINANCE_BASE가 지정되어 있습니다. 실제 서버에서 녹화하려면 해제하세요.")
+        return 0
+
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(fixture_dir)
+    saved = 0
+
+    def save(path_and_query):
+        nonlocal saved
+        key = fixture_key(path_and_query)
+        response = http_client.get(NAVER_ORIGIN + key)
+        if response.status_code != 200:
+            print(f"  [건너뜀] {key}: HTTP {response.status_code}")
+            return None
+        name = fixture_filename(key)
+        (fixture_dir / name).write_bytes(response.content)
+        manifest[key] = {
+            "file": name,
+            "content_type": response.headers.get("Content-Type", "text/html;charset=EUC-KR"),
+        }
+        saved += 1
+        return response
+
+    targets = list(codes)
+    for market in markets:
+        for page in range(1, market_pages + 1):
+            response = save(f"{MARKET_SUM_PATH}?sosok={market}&page={page}")
+            if response is None:
+                continue
+            listings = parse_market_sum_rows(make_soup(response.text))
+            if page == 1:
+                targets.extend(code for _, code, _, _ in listings[:stocks_per_market])
+
+    targets = list(dict.fromkeys(targets))
+    print(f"종목 {len(targets)}개 녹화 (일별 시세 {daily_pages}페이지씩)")
+    for i, code in enumerate(targets, 1):
+        for path, extra in STOCK_PAGES:
+            save(f"{path}?{urlencode({'code': code, **extra})}")
+        for page in range(1, daily_pages + 1):
+            save(f"{DAILY_PATH}?code={code}&page={page}")
+        # 인자 없는 sise_day (quick_stock_check의 전일 데이터 조회)
+        save(f"{DAILY_PATH}?code={code}")
+        if i % 10 == 0:
+            save_manifest(fixture_dir, manifest)
+            print(f"  - {i}/{len(targets)} 종목 완료")
+
+    save_manifest(fixture_dir, manifest)
+    print(f"[OK] 응답 {saved}개 저장: {fixture_dir}")
+    return saved
+
+
+# ---------------------------------------------------------------------------
+# serve
+# ---------------------------------------------------------------------------
+
+class FixtureStore:
+    """manifest 키 → (본문, Content-Type). any_code이면 없는 종목 코드를 녹화된 종목으로 대체."""
+
+    def __init__(self, fixture_dir: Path, any_code=False):
+        self.fixture_dir = fixture_dir
+        self.any_code = any_code
+        self.manifest = load_manifest(fixture_dir)
+        self._bodies = {}
+        self._lock = threading.Lock()
+        # (경로, code 외 쿼리) → 녹화된 키 목록
+        self._by_shape = {}
+        for key in self.manifest:
+            self._by_shape.setdefault(self._shape(key), []).append(key)
+
+    @staticmethod
+    def _shape(key):
+        parts = urlsplit(key)
+        rest = tuple(sorted((k, v) for k, v in parse_qsl(parts.query) if k != "code"))
+        return parts.path, rest
+
+    def resolve(self, key):
+        if key in self.manifest:
+            return key
+        if not self.any_code or "code=" not in key:
+            return None
+        candidates = self._by_shape.get(self._shape(key))
+        if not candidates:
+            return None
+        return candidates[zlib.crc32(key.encode("utf-8")) % len(candidates)]
+
+    def text(self, key):
+        """녹화된 응답을 Content-Type의 charset(기본 EUC-KR)으로 디코딩."""
+        body, content_type = self.get(key)
+        content_type = content_type.lower()
+        charset = content_type.split("charset=")[-1].strip() if "charset=" in content_type else "euc-kr"
+        return body.decode(charset, errors="replace")
+
+    def stock_pages(self):
+        """main·frgn·coinfo가 모두 녹화된 종목별 키 묶음 [(코드, (main, frgn, coinfo)), ...]"""
+        codes = sorted({dict(parse_qsl(urlsplit(k).query)).get("code") for k in self.manifest} - {None})
+        result = []
+        for code in codes:
+            keys = tuple(fixture_key(f"{path}?{urlencode({'code': code, **extra})}") for path, extra in STOCK_PAGES)
+            if all(k in self.manifest for k in keys):
+                result.append((code, keys))
+        return result
+
+    def get(self, key):
+        resolved = self.resolve(key)
+        if resolved is None:
+            return None
+        with self._lock:
+            body = self._bodies.get(resolved)
+            if body is None:
+                body = (self.fixture_dir / self.manifest[resolved]["file"]).read_bytes()
+                self._bodies[resolved] = body
+        return body, self.manifest[resolved]["content_type"]
+
+
+def make_server(store: FixtureStore, host="127.0.0.1", port=8800, latency_ms=0.0,
+                jitter_ms=0.0, error_rate=0.0, seed=None) -> ThreadingHTTPServer:
+    """지연(latency_ms ± jitter_ms)·오류(HTTP 503, error_rate 확률)를 주입하는 픽스처 서버."""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stats = {"served": 0, "missing": 0, "errors": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with rng_lock:
+                delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+                fail = rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+
+            if fail:
+                stats["errors"] += 1
+                self._send(503, b"injected error", "text/plain")
+                return
+            found = store.get(fixture_key(self.path))
+            if found is None:
+                stats["missing"] += 1
+                self._send(404, b"fixture not found", "text/plain")
+                return
+            stats["served"] += 1
+            self._send(200, *found)
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    return server
+
+
+def start_in_background(server: ThreadingHTTPServer) -> str:
+    """서버를 데몬 스레드로 시작하고 기준 URL을 반환."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+# ---------------------------------------------------------------------------
+# bench
+# ---------------------------------------------------------------------------
+
+def bench_parse(store: FixtureStore, repeat=3) -> None:
+    """녹화된 페이지 파싱 속도 (네트워크·서버 없이)."""
+    from html_parser import PARSER, make_soup
+    from quick_stock_check import (
+        parse_individual_stock_pages,
+        parse_market_sum_rows,
+        parse_prev_day,
+    )
+
+    keys = list(store.manifest)
+    texts = {k: store.text(k) for k in keys}
+
+    print(f"  (파서: {PARSER}, 백엔드 비교는 bench_parsers.py)")
+
+    def run(label, fn, n):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        elapsed = time.perf_counter() - started
+        count = n * repeat
+        print(f"  - {label}: {count}건 {elapsed:.2f}초 ({count / elapsed:.1f}건/초)" if count else f"  - {label}: 대상 없음")
+
+    sums = [k for k in keys if k.startswith(MARKET_SUM_PATH)]
+    run("시가총액 목록", lambda: [parse_market_sum_rows(make_soup(texts[k])) for k in sums], len(sums))
+
+    triples = [trio for _, trio in store.stock_pages()]
+    run(
+        "종목 상세(main·frgn·coinfo)",
+        lambda: [parse_individual_stock_pages(*(make_soup(texts[k]) for k in trio)) for trio in triples],
+        len(triples),
+    )
+
+    dailies = [k for k in keys if k.startswith(DAILY_PATH)]
+    run("일별 시세", lambda: [parse_prev_day(make_soup(texts[k])) for k in dailies], len(dailies))
+
+
+def bench_crawl(base_url: str, concurrency_levels, max_pages=1) -> None:
+    """로컬 서버 대상 동시 수집 처리량 (요청 한도·캐시 없이)."""
+    import http_client
+    from async_stock_collector import collect_stock_data
+    from rate_limiter import host_of, set_limit
+
+    os.environ["NAVER_FINANCE_BASE"] = base_url
+    os.environ["HTTP_CACHE"] = "0"
+    set_limit(host_of(base_url), 0)
+    http_client.HOST_POOL_SIZES[host_of(base_url)] = max(concurrency_levels)
+
+    for concurrency in concurrency_levels:
+        http_client.reset_session()
+        started = time.perf_counter()
+        rows = collect_stock_data(max_concurrency=concurrency, max_pages=max_pages)
+        elapsed = time.perf_counter() - started
+        print(f"  ▶ 동시 {concurrency}: {len(rows)}개 종목 {elapsed:.2f}초 ({len(rows) / elapsed:.1f}종목/초)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 금융 응답 녹화·재생 서버")
+    parser.add_argument("--dir", type=Path, default=DEFAULT_FIXTURE_DIR, help="픽스처 폴더")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="실제 응답 녹화")
+    rec.add_argument("--markets", type=int, nargs="+", default=[0, 1], help="0=코스피, 1=코스닥")
+    rec.add_argument("--market-pages", type=int, default=1, help="시장별 시가총액 목록 페이지 수")
+    rec.add_argument("--stocks", type=int, default=20, help="시장별 녹화할 종목 수 (목록 1페이지 앞에서부터)")
+    rec.add_argument("--codes", nargs="*", default=[], help="추가로 녹화할 종목 코드")
+    rec.add_argument("--daily-pages", type=int, default=4, help="종목별 일별 시세 페이지 수")
+
+    def add_server_args(p):
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8800)
+        p.add_argument("--latency-ms", type=float, default=0.0, help="응답 지연 (밀리초)")
+        p.add_argument("--jitter-ms", type=float, default=0.0, help="지연 ± 범위 (밀리초)")
+        p.add_argument("--error-rate", type=float, default=0.0, help="HTTP 503 주입 확률 (0~1)")
+        p.add_argument("--seed", type=int, default=None, help="지연·오류 난수 시드")
+        p.add_argument("--any-code", action="store_true", help="녹화되지 않은 종목 코드는 녹화된 종목 응답으로 대체")
+
+    srv = sub.add_parser("serve", help="픽스처 서버 실행")
+    add_server_args(srv)
+
+    bench = sub.add_parser("bench", help="파서·동시 수집 벤치마크")
+    add_server_args(bench)
+    bench.set_defaults(port=0)
+    bench.add_argument("--parse-only", action="store_true", help="파서 속도만 측정")
+    bench.add_argument("--repeat", type=int, default=3, help="파서 측정 반복 횟수")
+    bench.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    bench.add_argument("--max-pages", type=int, default=1, help="시장별 시가총액 목록 페이지 수")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.dir, markets=args.markets, market_pages=args.market_pages,
+               stocks_per_market=args.stocks, codes=args.codes, daily_pages=args.daily_pages)
+        return
+
+    store = FixtureStore(args.dir, any_code=args.any_code)
+    if not store.manifest:
+        print(f"[오류] 픽스처가 없습니다: {args.dir} (먼저 record 실행)")
+        return
+
+    server = make_server(store, host=args.host, port=args.port, latency_ms=args.latency_ms,
+                         jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=args.seed)
+
+    if args.command == "serve":
+        host, port = server.server_address[:2]
+        print(f"픽스처 {len(store.manifest)}개 제공: http://{host}:{port}")
+        print(f"  NAVER_FINANCE_BASE=http://{host}:{port} 로 크롤러 실행")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print(f"제공 {server.stats['served']} / 없음 {server.stats['missing']} / 주입 오류 {server.stats['errors']}")
+        return
+
+    print(f"📊 파서 벤치마크 (픽스처 {len(store.manifest)}개, {args.repeat}회 반복)")
+    bench_parse(store, repeat=args.repeat)
+    if args.parse_only:
+        return
+
+    base_url = start_in_background(server)
+    print(f"\n📊 동시 수집 벤치마크 ({base_url}, 지연 {args.latency_ms:g}ms, 오류율 {args.error_rate:g})")
+    try:
+        bench_crawl(base_url, args.concurrency, max_pages=args.max_pages)
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"제공 {server.stats['served']} / 없음 {server.stats['missing']} / 주입 오류 {server.stats['errors']}")
+
+
+if __name__ == "__main__":
+    main()
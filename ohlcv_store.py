@@ -0,0 +1,213 @@
+"""
+종목별 일봉(OHLCV) 로컬 저장소 (증분 갱신).
+
+ma20_breakout_screener(40일)·rebound_strategies_analyzer(400일)가 매 실행마다 일봉 전체를
+다시 받지 않도록, 한 번 받은 일봉을 SQLite에 쌓아 두고 마지막 저장일 이후 봉만 받습니다.
+
+    update(code, lookback)      저장된 봉이 없거나 부족하면 lookback일치를 한 번에 받고
+                                (price_history: fchart → sise_day), 있으면 최근 봉만 갱신
+                                (보통 sise_day 1페이지, quick_stock_check와 같은 URL이라 응답 캐시 공유)
+    load(codes, lookback)       여러 종목의 최근 lookback개 봉을 한 번에 읽기 → {코드: DataFrame}
+    load_frame(codes, lookback) 같은 봉을 종목코드 열이 있는 한 표로 (rebound_panel 패널 모드)
+    get_history(code, lookback) update 후 한 종목 읽기
+
+OHLCV_FRESH_SINCE(ISO 시각)가 있으면 그 뒤에 이미 확인한 종목은 update가 요청 없이 건너뜁니다
+(daily_auto가 bar_fetch_planner로 종목마다 한 번 갱신한 뒤 이후 단계에 넘겨줌).
+
+저장 위치: OHLCV_STORE_PATH (기본: 프로젝트/.ohlcv/ohlcv.sqlite, 이동평균 상태 ma_state도 같은 파일)
+DataFrame 스키마는 price_history와 같음: date, open, high, low, close, volume (날짜 오름차순)
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import http_client
+from html_parser import make_soup
+from price_history import HISTORY_COLUMNS, get_daily_history, parse_sise_day_rows
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# quick_stock_check.DAILY_URL과 같은 URL (같은 날 응답 캐시를 함께 씀)
+RECENT_URL = 'https://finance.naver.com/item/sise_day.naver?code={code}'
+RECENT_PAGE_ROWS = 10
+
+_local = threading.local()
+
+
+def store_path() -> Path:
+    return Path(os.getenv('OHLCV_STORE_PATH', '') or PROJECT_ROOT / '.ohlcv' / 'ohlcv.sqlite')
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    path = store_path()
+    if conn is None or getattr(_local, 'path', None) != path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS bars ('
+            ' code TEXT NOT NULL, date TEXT NOT NULL,'
+            ' open REAL, high REAL, low REAL, close REAL, volume INTEGER,'
+            ' PRIMARY KEY (code, date)) WITHOUT ROWID'
+        )
+        # depth: 지금까지 요청받은 최대 lookback (그보다 긴 이력이 필요하면 다시 채움)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS series ('
+            ' code TEXT PRIMARY KEY, depth INTEGER NOT NULL, updated_at TEXT NOT NULL)'
+        )
+        _local.conn, _local.path = conn, path
+    return conn
+
+
+def _normalize_code(code) -> str:
+    return str(code).replace('.0', '').zfill(6)
+
+
+def fresh_since() -> datetime | None:
+    """OHLCV_FRESH_SINCE: 이 시각 이후 확인한 종목은 다시 받지 않음 (없으면 None)"""
+    raw = os.getenv('OHLCV_FRESH_SINCE', '').strip()
+    return datetime.fromisoformat(raw) if raw else None
+
+
+def _series_info(conn, code):
+    """(저장된 봉 수, 마지막 날짜, depth, 마지막 확인 시각)"""
+    count, last = conn.execute(
+        'SELECT COUNT(*), MAX(date) FROM bars WHERE code = ?', (code,)
+    ).fetchone()
+    row = conn.execute('SELECT depth, updated_at FROM series WHERE code = ?', (code,)).fetchone()
+    return (count, last, *(row if row else (0, None)))
+
+
+def _touch(conn, code) -> None:
+    with conn:
+        conn.execute(
+            'UPDATE series SET updated_at = ? WHERE code = ?',
+            (datetime.now().isoformat(timespec='seconds'), code),
+        )
+
+
+def _write(conn, code, df: pd.DataFrame, depth: int, replace_all=False) -> None:
+    records = [
+        (code, d.strftime('%Y-%m-%d'), o, h, l, c, int(v))
+        for d, o, h, l, c, v in df[HISTORY_COLUMNS].itertuples(index=False)
+    ]
+    with conn:
+        if replace_all:
+            conn.execute('DELETE FROM bars WHERE code = ?', (code,))
+        conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)', records)
+        conn.execute(
+            'INSERT OR REPLACE INTO series VALUES (?, ?, ?)',
+            (code, depth, datetime.now().isoformat(timespec='seconds')),
+        )
+
+
+def _stored_closes(conn, code, dates) -> dict:
+    if not dates:
+        return {}
+    marks = ','.join('?' * len(dates))
+    return dict(conn.execute(
+        f'SELECT date, close FROM bars WHERE code = ? AND date IN ({marks})', (code, *dates)
+    ).fetchall())
+
+
+def _backfill(conn, code, lookback) -> int:
+    df = get_daily_history(code, days=lookback)
+    if df.empty:
+        return 0
+    _write(conn, code, df, depth=lookback, replace_all=True)
+    return len(df)
+
+
+def update(code, lookback: int = 400) -> int:
+    """
+    저장소를 최신 봉까지 갱신하고 새로 쓴 봉 수를 반환.
+    - 저장된 봉이 없거나 lookback이 지금까지보다 길면: lookback일치 일괄 조회
+    - 마지막 저장일이 최근 페이지(10거래일) 안이면: sise_day 1페이지로 새 봉만 추가
+    - 그보다 오래됐으면: 빠진 기간만큼 일괄 조회
+    - OHLCV_FRESH_SINCE 이후 이미 확인했고 depth가 충분하면: 요청 없이 0
+    겹치는 날짜의 종가가 저장값과 다르면(액면분할 등 수정주가) 전체를 다시 받음.
+    """
+    code = _normalize_code(code)
+    conn = _connect()
+    count, last, depth, checked_at = _series_info(conn, code)
+
+    if count == 0 or lookback > depth:
+        return _backfill(conn, code, max(lookback, depth))
+
+    since = fresh_since()
+    if since and checked_at and datetime.fromisoformat(checked_at) >= since:
+        return 0
+
+    gap = int(np.busday_count(last, datetime.now().date().isoformat())) + 1
+    if gap < RECENT_PAGE_ROWS:
+        soup = make_soup(http_client.fetch_text(RECENT_URL.format(code=code)))
+        recent = pd.DataFrame(parse_sise_day_rows(soup), columns=HISTORY_COLUMNS)
+    else:
+        recent = get_daily_history(code, days=gap + RECENT_PAGE_ROWS)
+    if recent.empty:
+        return 0
+
+    # 마지막 저장 봉은 장중에 받은 미완성 봉일 수 있으므로 비교에서 제외
+    dates = recent['date'].dt.strftime('%Y-%m-%d')
+    overlap = recent[(dates < last).to_numpy()]
+    stored = _stored_closes(conn, code, list(overlap['date'].dt.strftime('%Y-%m-%d')))
+    for d, close in zip(overlap['date'].dt.strftime('%Y-%m-%d'), overlap['close']):
+        if d in stored and abs(stored[d] - close) > 1e-9:
+            print(f"  [일봉 저장소] {code}: {d} 종가가 저장값과 달라 전체를 다시 받습니다 (수정주가)")
+            return _backfill(conn, code, depth)
+
+    fresh = recent[(dates >= last).to_numpy()]
+    if fresh.empty:
+        _touch(conn, code)
+    else:
+        _write(conn, code, fresh, depth=depth)
+    return len(fresh)
+
+
+def load_frame(codes, lookback: int = 400) -> pd.DataFrame:
+    """여러 종목의 최근 lookback개 봉을 한 표로 (code + HISTORY_COLUMNS, 종목별로 모여 있고 날짜 오름차순)."""
+    codes = [_normalize_code(c) for c in codes]
+    conn = _connect()
+    chunks = []
+
+    for i in range(0, len(codes), 500):
+        chunk = codes[i:i + 500]
+        marks = ','.join('?' * len(chunk))
+        # 종목별 최근 lookback개 (날짜 내림차순 순위)
+        frame = pd.read_sql_query(
+            'SELECT code, date, open, high, low, close, volume FROM ('
+            ' SELECT *, ROW_NUMBER() OVER (PARTITION BY code ORDER BY date DESC) AS rn'
+            f' FROM bars WHERE code IN ({marks})'
+            ') WHERE rn <= ? ORDER BY code, date',
+            conn, params=(*chunk, lookback),
+        )
+        if not frame.empty:
+            chunks.append(frame)
+
+    if not chunks:
+        return pd.DataFrame(columns=['code', *HISTORY_COLUMNS])
+    frame = pd.concat(chunks, ignore_index=True)
+    frame['date'] = pd.to_datetime(frame['date'])
+    return frame
+
+
+def load(codes, lookback: int = 400) -> dict:
+    """여러 종목의 최근 lookback개 봉 → {종목코드: DataFrame}. 저장된 봉이 없는 종목은 빈 DataFrame."""
+    codes = [_normalize_code(c) for c in codes]
+    result = {code: pd.DataFrame(columns=HISTORY_COLUMNS) for code in codes}
+    for code, group in load_frame(codes, lookback).groupby('code', sort=False):
+        result[code] = group[HISTORY_COLUMNS].reset_index(drop=True)
+    return result
+
+
+def get_history(code, lookback: int = 400) -> pd.DataFrame:
+    """한 종목 저장소 갱신 후 최근 lookback개 봉."""
+    code = _normalize_code(code)
+    update(code, lookback)
+    return load([code], lookback)[code]
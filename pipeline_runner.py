@@ -0,0 +1,188 @@
+"""
+한 프로세스 안에서 단계 의존 관계(DAG)대로 실행하는 파이프라인.
+
+단계마다 입력·출력 이름을 선언하면, 입력이 모두 준비된 단계부터 스레드 풀에서 실행하고
+출력 값은 메모리로 다음 단계에 넘깁니다 (파일을 glob으로 찾거나 저장을 기다리는 sleep 없음).
+서로 기다릴 필요가 없는 단계는 동시에 돌고, 단계별 시작·소요 시간과 결과를 기록합니다.
+
+    Stage(name, func, inputs=(), outputs=None, after=(), optional=(), description='')
+        func(**{입력 이름: 값}) → 출력이 하나면 값, 여럿이면 같은 순서의 tuple
+        after: 성공 여부와 관계없이 끝날 때까지 기다릴 단계 (같은 구글 시트 탭에 쓰는 순서 등)
+        optional: 만드는 단계가 끝날 때까지 기다리되, 실패·건너뜀이면 None으로 받는 입력
+    run_pipeline(stages, values=None, max_workers=4) → PipelineRun
+
+입력을 내는 단계가 실패하거나 건너뛰어지면 그 입력을 쓰는 단계는 건너뜁니다.
+"""
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+OK, FAILED, SKIPPED = '성공', '실패', '건너뜀'
+
+
+def log_path() -> Path:
+    return Path(os.getenv('PIPELINE_LOG', '') or PROJECT_ROOT / '.pipeline' / 'runs.jsonl')
+
+
+class Stage:
+    def __init__(self, name, func, inputs=(), outputs=None, after=(), optional=(), description=''):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs) if outputs is not None else (name,)
+        self.after = tuple(after)
+        self.optional = tuple(optional)
+        self.description = description or name
+
+
+class PipelineRun:
+    """실행 결과: values(출력 이름 → 값), status(단계 → 성공/실패/건너뜀), timings(단계 → (시작 초, 소요 초))"""
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.values = {}
+        self.status = {}
+        self.errors = {}
+        self.timings = {}
+        self.started_at = datetime.now()
+        self.elapsed = 0.0
+
+    def ok(self, name) -> bool:
+        return self.status.get(name) == OK
+
+    def print_summary(self) -> None:
+        print(f"\n{'='*60}")
+        print("단계별 실행 결과")
+        for stage in self.stages:
+            status = self.status.get(stage.name, SKIPPED)
+            start, took = self.timings.get(stage.name, (None, None))
+            when = f"{start:7.1f}초 시작 {took:7.1f}초" if took is not None else " " * 22
+            print(f"  {stage.description:28s} {status:4s} {when}")
+            if stage.name in self.errors:
+                print(f"      {self.errors[stage.name]}")
+        busy = sum(took for _, took in self.timings.values())
+        print(f"전체 {self.elapsed:.1f}초 (단계 합계 {busy:.1f}초)")
+        print(f"{'='*60}")
+
+    def record(self) -> Path:
+        """실행 기록 한 줄 추가 (PIPELINE_LOG, 기본: 프로젝트/.pipeline/runs.jsonl)"""
+        path = log_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed': round(self.elapsed, 2),
+            'stages': {
+                stage.name: {
+                    'status': self.status.get(stage.name, SKIPPED),
+                    'start': round(self.timings[stage.name][0], 2) if stage.name in self.timings else None,
+                    'elapsed': round(self.timings[stage.name][1], 2) if stage.name in self.timings else None,
+                    'error': self.errors.get(stage.name),
+                }
+                for stage in self.stages
+            },
+        }
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return path
+
+
+def _check(stages, values) -> None:
+    """이름 중복·없는 입력·순환 확인"""
+    names = [stage.name for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"단계 이름 중복: {names}")
+    producers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in producers or output in values:
+                raise ValueError(f"출력 이름 중복: {output}")
+            producers[output] = stage.name
+    for stage in stages:
+        missing = [i for i in stage.inputs + stage.optional if i not in producers and i not in values]
+        unknown = [a for a in stage.after if a not in names]
+        if missing or unknown:
+            raise ValueError(f"{stage.name}: 없는 입력 {missing} / 없는 단계 {unknown}")
+
+    # 위상 정렬이 끝까지 되지 않으면 순환
+    deps = {stage.name: {producers[i] for i in stage.inputs + stage.optional if i in producers} | set(stage.after)
+            for stage in stages}
+    done = set()
+    while len(done) < len(deps):
+        ready = [name for name, needs in deps.items() if name not in done and needs <= done]
+        if not ready:
+            raise ValueError(f"단계 순환: {sorted(set(deps) - done)}")
+        done.update(ready)
+
+
+def _call(stage, values):
+    kwargs = {name: values[name] for name in stage.inputs}
+    kwargs.update({name: values.get(name) for name in stage.optional})
+    result = stage.func(**kwargs)
+    if len(stage.outputs) == 1:
+        return (result,)
+    if not isinstance(result, tuple) or len(result) != len(stage.outputs):
+        raise ValueError(f"{stage.name}: 출력 {len(stage.outputs)}개를 tuple로 반환해야 합니다")
+    return result
+
+
+def run_pipeline(stages, values=None, max_workers: int = 4) -> PipelineRun:
+    """입력이 준비된 단계부터 동시에 실행. 실행 결과(PipelineRun)를 반환 (단계 오류는 예외로 올리지 않음)."""
+    values = dict(values or {})
+    _check(stages, values)
+    run = PipelineRun(stages)
+    run.values = values
+    producer = {output: stage.name for stage in stages for output in stage.outputs}
+    pending = {stage.name: stage for stage in stages}
+    lock = threading.Lock()
+    origin = time.perf_counter()
+
+    def execute(stage):
+        start = time.perf_counter()
+        try:
+            outputs = _call(stage, values)
+            status, error = OK, None
+        except Exception as e:
+            traceback.print_exc()
+            outputs, status, error = None, FAILED, f"{type(e).__name__}: {e}"
+        end = time.perf_counter()
+        with lock:
+            if outputs is not None:
+                values.update(zip(stage.outputs, outputs))
+            run.status[stage.name] = status
+            run.timings[stage.name] = (start - origin, end - start)
+            if error:
+                run.errors[stage.name] = error
+        print(f"[{status}] {stage.description} ({end - start:.1f}초)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = set()
+        while pending or running:
+            before = len(pending)
+            for name, stage in list(pending.items()):
+                upstream = [producer[i] for i in stage.inputs if i in producer]
+                if any(run.status.get(u) in (FAILED, SKIPPED) for u in upstream):
+                    run.status[name] = SKIPPED
+                    del pending[name]
+                    print(f"[{SKIPPED}] {stage.description} (앞 단계 실패)")
+                elif (all(i in values for i in stage.inputs)
+                      and all(a in run.status for a in stage.after)
+                      and all(i in values or run.status.get(producer.get(i)) in (FAILED, SKIPPED)
+                              for i in stage.optional)):
+                    del pending[name]
+                    print(f"\n[시작] {stage.description} ({datetime.now().strftime('%H:%M:%S')})")
+                    running.add(pool.submit(execute, stage))
+            if not running:
+                if len(pending) == before:
+                    raise RuntimeError(f"실행할 수 없는 단계: {sorted(pending)}")
+                continue
+            _, running = wait(running, return_when=FIRST_COMPLETED)
+
+    run.elapsed = time.perf_counter() - origin
+    return run
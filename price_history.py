@@ -0,0 +1,123 @@
+"""
+종목별 일봉(OHLCV) 이력 조회.
+
+기본은 네이버 차트 데이터(fchart) 한 번 요청으로 N일치를 받고, 실패하거나 비어 있으면
+기존처럼 sise_day 페이지(10일/페이지)를 넘기며 읽습니다. 두 경로 모두 같은 스키마를 반환합니다:
+    date(datetime64), open, high, low, close(float), volume(int) — 날짜 오름차순
+
+PRICE_HISTORY_PROVIDER=sise_day 이면 fchart를 쓰지 않습니다.
+"""
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+import http_client
+from html_parser import make_soup
+
+FCHART_URL = (
+    'https://fchart.stock.naver.com/sise.nhn'
+    '?symbol={code}&timeframe=day&count={count}&requestType=0'
+)
+SISE_DAY_URL = 'https://finance.naver.com/item/sise_day.naver?code={code}&page={page}'
+HISTORY_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+# <item data="20240102|78200|79800|78200|79600|17142847" />
+_FCHART_ITEM = re.compile(r'<item\s+data="(\d{8})\|([\d.]+)\|([\d.]+)\|([\d.]+)\|([\d.]+)\|(\d+)"')
+_SISE_DAY_DATE = re.compile(r'\d{4}\.\d{2}\.\d{2}')
+
+
+def _empty_history() -> pd.DataFrame:
+    return pd.DataFrame(columns=HISTORY_COLUMNS)
+
+
+def _to_history(records) -> pd.DataFrame:
+    df = pd.DataFrame(records, columns=HISTORY_COLUMNS)
+    if df.empty:
+        return df
+    df = df.drop_duplicates('date').sort_values('date').reset_index(drop=True)
+    return df
+
+
+def fetch_fchart_history(code: str, days: int = 400) -> pd.DataFrame:
+    """네이버 차트 데이터로 최근 days개 일봉을 한 번에 조회."""
+    text = http_client.fetch_text(FCHART_URL.format(code=str(code).zfill(6), count=days))
+    items = _FCHART_ITEM.findall(text)
+    if not items:
+        return _empty_history()
+
+    df = pd.DataFrame(items, columns=HISTORY_COLUMNS)
+    df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
+    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype(float)
+    df['volume'] = df['volume'].astype('int64')
+    return _to_history(df)
+
+
+def parse_sise_day_rows(soup) -> list[dict]:
+    """
+    일별 시세 페이지의 일봉 행 목록.
+    열 순서: 날짜 | 종가 | 전일비 | 시가 | 고가 | 저가 | 거래량 (숫자 열은 td.num)
+    """
+    rows = []
+    for tr in soup.select('table.type2 tr'):
+        date_cell = tr.select_one('td span')
+        nums = tr.select('td.num')
+        if date_cell is None or len(nums) < 6:
+            continue
+        date_txt = date_cell.get_text(strip=True)
+        if not _SISE_DAY_DATE.fullmatch(date_txt):
+            continue
+        values = [td.get_text(strip=True).replace(',', '') for td in nums]
+        try:
+            rows.append({
+                'date': datetime.strptime(date_txt, '%Y.%m.%d'),
+                'open': float(values[2]),
+                'high': float(values[3]),
+                'low': float(values[4]),
+                'close': float(values[0]),
+                'volume': int(values[5]),
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def fetch_sise_day_history(code: str, days: int = 400) -> pd.DataFrame:
+    """일별 시세 페이지(10일/페이지)를 넘기며 days일 남짓 조회."""
+    code = str(code).zfill(6)
+    soup = make_soup(http_client.fetch_text(SISE_DAY_URL.format(code=code, page=1)))
+
+    # 페이지 네비게이션에서 마지막 페이지 찾기
+    last_page_elem = soup.select_one('table.Nnavi td.pgRR a')
+    if last_page_elem:
+        last_page = int(last_page_elem['href'].split('page=')[1])
+    else:
+        last_page = 10  # 기본값
+
+    # 필요한 페이지 수 계산 (1페이지당 10일치 데이터)
+    required_pages = min((days // 10) + 1, last_page)
+
+    data = []
+    for page in range(1, required_pages + 1):
+        if page > 1:
+            soup = make_soup(http_client.fetch_text(SISE_DAY_URL.format(code=code, page=page)))
+        data.extend(parse_sise_day_rows(soup))
+
+    return _to_history(data)
+
+
+def get_daily_history(code: str, days: int = 400, provider: str | None = None) -> pd.DataFrame:
+    """
+    최근 days일 일봉. provider: 'fchart'(기본) 또는 'sise_day'.
+    fchart가 실패하거나 빈 결과면 sise_day로 다시 조회.
+    """
+    provider = (provider or os.getenv('PRICE_HISTORY_PROVIDER', 'fchart')).strip().lower()
+    if provider != 'sise_day':
+        try:
+            df = fetch_fchart_history(code, days)
+            if not df.empty:
+                return df
+        except Exception as e:
+            print(f"  [fchart] {code} 조회 실패, 일별 시세로 대체: {str(e)}")
+    return fetch_sise_day_history(code, days)
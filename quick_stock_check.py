@@ -2,114 +2,23 @@ from console_utf8 import enable as enable_utf8_console
 
 enable_utf8_console()
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import pandas as pd
 from datetime import datetime
-import time
 import re
 import gspread
-from google.oauth2.service_account import Credentials
 import numpy as np
-import os
 
+import http_client
+import sheets_client
+import sheets_outbox
+from html_parser import make_soup
+from rate_limiter import set_limit
+from stock_classifier import classify, is_regular_stock  # is_regular_stock: 기존 import 경로 호환
 from stock_data_utils import fill_trading_amounts_df, fill_trading_amounts_record
+from stock_schema import coerce_stock_frame
+from stock_snapshot import save_snapshot
 
-def is_regular_stock(name):
-    """
-    일반 주식인지 판단하는 함수
-    ETF, 펀드, 채권 등을 제외하고 순수 주식 종목만 선별
-    """
-    
-    # 명백한 ETF/펀드 브랜드명들
-    etf_brands = [
-        'KODEX', 'TIGER', 'KBSTAR', 'KOSEF', 'KINDEX', 'ARIRANG', 'HANARO',
-        'RISE', 'ACE', 'KIWOOM', 'PLUS', 'SOL', 'WON', '1Q', 'ITF', 'BNK',
-        'FOCUS', 'TREX', 'HK', '파워', '마이티', 'DAISHIN343', '아이엠에셋',
-        'KCGI', 'KB발해인프라', '맥쿼리인프라', '맵스리얼티', '한국ANKOR유전'
-    ]
-    
-    # ETF/펀드 관련 키워드
-    fund_keywords = [
-        'ETF', 'ETN', 'REIT', '리츠', '펀드',
-        '채권', '통안채', '물가채', '금융채', '국고채', '회사채',
-        '단기자금', '단기통안채', '단기금융채', '액티브',
-        '스팩', 'SPAC'  # SPAC(특수목적인수회사) 추가
-    ]
-    
-    # 투자 관련 키워드 (일반 주식에는 없는)
-    investment_keywords = [
-        '인덱스', '합성', '선물', '옵션', '인버스', '레버리지',
-        '커버드콜', '위클리커버드콜', '데일리커버드콜', '고정커버드콜',
-        'TOP', 'Plus', 'TR', '포커스', '테마', '밸류', '성장', '소부장'
-    ]
-    
-    # 지수 관련 키워드
-    index_keywords = ['S&P', 'MSCI', 'CSI', 'FTSE', 'Nikkei', 'DAX', 'NASDAQ', 'SOLACTIVE', 'KRX']
-    
-    # 국가/지역 관련 (해외투자 ETF)
-    country_keywords = ['미국', '중국', '일본', '독일', '인도', '글로벌', '아시아', '유로']
-    
-    # 1. ETF 브랜드명 체크
-    for brand in etf_brands:
-        if name.startswith(brand):
-            return False
-    
-    # 2. 펀드/채권 키워드 체크
-    for keyword in fund_keywords:
-        if keyword in name:
-            return False
-    
-    # 3. 투자 관련 키워드 체크
-    for keyword in investment_keywords:
-        if keyword in name:
-            return False
-    
-    # 4. 지수 관련 키워드 체크
-    for keyword in index_keywords:
-        if keyword in name:
-            return False
-    
-    # 5. 국가/지역 키워드 체크 (단, 실제 기업명에 포함된 경우는 예외)
-    for keyword in country_keywords:
-        if keyword in name:
-            # 실제 기업명의 일부가 아니라 투자 상품명인 경우만 제외
-            if any(invest_word in name for invest_word in ['배당', '성장', '테크', '반도체', '나스닥']):
-                return False
-    
-    # 6. 증권사 운용 상품 (실제 증권회사 주식은 제외하지 않음)
-    securities_products = [
-        'NH투자', 'SK증권', '메리츠', '미래에셋', '삼성선물', '신한투자',
-        '유안타', '유진투자', '키움', '하나금융', '한화투자',
-        'KB증권', 'IBK투자', '교보증권', '대신증권', '현대차증권'
-    ]
-    
-    for keyword in securities_products:
-        if keyword in name and not ('증권' in name or '금융' in name or '은행' in name):
-            return False
-    
-    # 7. 고배당, 배당 관련 상품 (개별 주식이 아닌 테마 상품)
-    if '고배당' in name or ('배당' in name and any(word in name for word in ['TOP', 'Plus', '성장', '킹'])):
-        return False
-    
-    # 8. SPAC (특수목적인수회사) 관련 패턴
-    spac_patterns = [
-        '스팩', 'SPAC', '목적', '인수회사', '특수목적'
-    ]
-    
-    for pattern in spac_patterns:
-        if pattern in name:
-            return False
-    
-    # SPAC 명명 패턴: "회사명스팩숫자호" (예: 엔에이치스팩29호)
-    if '스팩' in name and ('호' in name or any(char.isdigit() for char in name)):
-        return False
-    
-    # 9. 기타 투자회사 패턴
-    if '투자회사' in name or '자산운용' in name:
-        return False
-    
-    return True
 
 class GoogleSheetsUploader:
     def __init__(self, credentials_file='credentials.json'):
@@ -126,12 +35,11 @@ class GoogleSheetsUploader:
                 'https://www.googleapis.com/auth/drive'
             ]
             
-            if not os.path.exists(self.credentials_file):
+            if not sheets_client.credentials_available(self.credentials_file):
                 print(f"❌ {self.credentials_file} 파일이 없습니다.")
                 return False
             
-            creds = Credentials.from_service_account_file(self.credentials_file, scopes=scope)
-            self.gc = gspread.authorize(creds)
+            self.gc = sheets_client.authorize(self.credentials_file, scope)
             print("✅ 구글 시트 연결 성공!")
             return True
             
@@ -176,43 +84,67 @@ class GoogleSheetsUploader:
         
         return df_clean
     
-    def upload_dataframe(self, df, spreadsheet_name, sheet_name):
-        """데이터프레임을 구글 시트에 업로드 (NaN 값 처리 포함)"""
+    def dataframe_rows(self, df):
+        """헤더 + 값 행 목록 (clean_dataframe로 NaN 처리, 빈 DataFrame이면 빈 목록)"""
+        if len(df) == 0:
+            return []
+        df_clean = self.clean_dataframe(df)
+        return [df_clean.columns.tolist()] + df_clean.values.tolist()
+
+    def upload_dataframe(self, df, spreadsheet_name, sheet_name, format_header=False, wait=True):
+        """
+        데이터프레임을 구글 시트에 업로드 (NaN 값 처리 포함).
+        업로드 대기열(sheets_outbox)로 보내고, wait이면 전송을 기다림 (실패·시간 초과면 False, 작업은 남아 다시 시도).
+        """
         try:
-            spreadsheet = self.create_or_get_spreadsheet(spreadsheet_name)
-            if not spreadsheet:
+            key = sheets_outbox.enqueue_rows(spreadsheet_name, sheet_name, self.dataframe_rows(df),
+                                             self.credentials_file, format_header=format_header)
+            if not wait:
+                sheets_outbox.start()
+                print(f"📤 '{sheet_name}' 시트 업로드 예약 ({len(df)}개 행)")
+                return True
+            if not sheets_outbox.deliver([key]):
                 return False
-            
-            # 시트가 있는지 확인하고 없으면 생성
-            try:
-                worksheet = spreadsheet.worksheet(sheet_name)
-                # 기존 데이터 삭제
-                worksheet.clear()
-            except gspread.WorksheetNotFound:
-                # 새 시트 생성
-                worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=2000, cols=30)
-            
-            # 데이터 업로드
+
             if len(df) > 0:
-                # DataFrame 정리 (NaN 값 처리)
-                df_clean = self.clean_dataframe(df)
-                
-                # 헤더와 데이터를 함께 업로드
-                data = [df_clean.columns.tolist()] + df_clean.values.tolist()
-                
-                # 수정된 update 방식
-                worksheet.update(values=data, range_name='A1')
-                
                 print(f"✅ '{sheet_name}' 시트에 {len(df)}개 행 업로드 완료!")
-                return True
             else:
                 print(f"⚠️ '{sheet_name}' 시트: 업로드할 데이터가 없습니다.")
-                return True
-                
+            return True
+
         except Exception as e:
             print(f"❌ 시트 업로드 실패 ({sheet_name}): {str(e)}")
             return False
-    
+
+    def write_rows(self, spreadsheet_name, sheet_name, rows, format_header=False):
+        """upload_dataframe의 전송 부분 (sheets_outbox 전송 스레드에서 호출). 오류는 예외로 올림."""
+        if not self.gc:
+            raise RuntimeError(f"구글 시트 연결 없음 ({self.credentials_file})")
+        try:
+            spreadsheet = self.gc.open(spreadsheet_name)
+        except gspread.SpreadsheetNotFound:
+            spreadsheet = self.gc.create(spreadsheet_name)
+            print(f"📝 새 스프레드시트 생성: {spreadsheet_name}")
+
+        # 시트가 있으면 기존 데이터 삭제 (종목 수가 늘었으면 행·열도 늘림), 없으면 생성
+        width = max((len(row) for row in rows), default=0)
+        try:
+            worksheet = spreadsheet.worksheet(sheet_name)
+            worksheet.clear()
+            if len(rows) > worksheet.row_count or width > worksheet.col_count:
+                worksheet.resize(rows=max(len(rows), worksheet.row_count), cols=max(width, worksheet.col_count))
+        except gspread.WorksheetNotFound:
+            worksheet = spreadsheet.add_worksheet(title=sheet_name, rows=max(2000, len(rows)), cols=max(30, width))
+
+        if rows:
+            worksheet.update(values=rows, range_name='A1')
+            if format_header:
+                # 헤더 행 굵게 만들기
+                worksheet.format('A1:Z1', {
+                    'textFormat': {'bold': True},
+                    'backgroundColor': {'red': 0.9, 'green': 0.9, 'blue': 0.9}
+                })
+
     def get_spreadsheet_url(self, spreadsheet_name):
         """스프레드시트 URL 가져오기"""
         try:
@@ -257,96 +189,257 @@ def calculate_volume_change_rate(current_volume, prev_volume):
     except:
         return ''
 
-def get_individual_stock_data(code, name):
-    """개별 종목 페이지에서 상세 재무 데이터 수집 (실제 페이지 구조 반영)"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
+MARKET_SUM_URL = 'https://finance.naver.com/sise/sise_market_sum.naver?sosok={market_type}&page={page}'
+MAIN_URL = 'https://finance.naver.com/item/main.naver?code={code}'
+INVESTOR_URL = 'https://finance.naver.com/item/frgn.naver?code={code}'
+FINANCE_URL = 'https://finance.naver.com/item/coinfo.naver?code={code}&target=finsum_more'
+DAILY_URL = 'https://finance.naver.com/item/sise_day.naver?code={code}'
+MARKET_NAMES = {0: '코스피', 1: '코스닥'}
+
+
+def fetch_soup(url):
+    """공용 세션(http_client)으로 페이지를 받아 BeautifulSoup으로 파싱 (백엔드: html_parser)"""
+    return make_soup(http_client.fetch_text(url))
+
+
+# 개별 종목 상세 값 순서 (parse_individual_stock_pages 반환 튜플, build_stock_row의 details)
+DETAIL_FIELDS = (
+    'PER', 'PBR', 'ROE', '시가총액',
+    '매출액', '영업이익', '당기순이익', '부채비율', '유보율',
+    '배당수익률', '배당금', '52주최고', '52주최저', '거래대금',
+    '외국인비율', '기관비율', '베타', '업종',
+)
+
+
+def parse_individual_stock_pages(main_soup, investor_soup, finance_soup):
+    """
+    메인·투자자·재무정보 페이지 soup에서 상세 재무 데이터 추출 (18개 값 튜플).
+    메인 페이지가 종목 페이지가 아니면 (오류·차단 안내 등) ValueError.
+    """
+    if main_soup.select_one('div.wrap_company') is None:
+        raise ValueError("종목 메인 페이지가 아님 (오류·차단 페이지)")
+
+    # 초기화 (확장된 데이터 필드)
+    data = {
+        'PER': '', 'PBR': '', 'ROE': '', '시가총액': '',
+        '매출액': '', '영업이익': '', '당기순이익': '', 
+        '부채비율': '', '유보율': '', '배당수익률': '', '배당금': '',
+        '52주최고': '', '52주최저': '', '거래대금': '',
+        '외국인비율': '', '기관비율': '', '베타': '', '업종': '',
+        '영업이익률': '', '순이익률': ''  # 추가 지표
+    }
+    
+    # 메인 페이지는 한 번만 순회해 두 추출 단계가 함께 사용
+    main_page = MainPageView(main_soup)
+    
+    # 1. 메인 페이지에서 기본 데이터 추출 (PER, PBR, ROE 최신 데이터 포함)
+    extract_main_page_data(main_page, data)
+    
+    # 3. 투자자 페이지에서 투자자 비율 추출
+    extract_investor_data(investor_soup, data)
+    
+    # 4. 재무정보 페이지에서 재무 데이터 추출
+    extract_financial_data(finance_soup, data)
     
+    # 5. 메인 페이지에서 추가 재무 정보 추출 (백업)
+    extract_additional_finance_data(main_page, data)
+    
+    # 정확한 순서로 데이터 반환 (메인 수집 로직과 정확히 일치)
+    return tuple(data[key] for key in DETAIL_FIELDS)
+
+def fetch_individual_stock_data(code):
+    """개별 종목 페이지에서 상세 재무 데이터 수집. 요청·파싱 실패는 예외로 올림."""
+    # 메인 페이지에서 기본 정보 수집 (가장 많은 데이터가 있음)
+    main_soup = fetch_soup(MAIN_URL.format(code=code))
+    
+    # 투자자별 매매동향 페이지에서 투자자 비율 수집
+    investor_soup = fetch_soup(INVESTOR_URL.format(code=code))
+    
+    # 재무정보 페이지에서 상세 재무 데이터 수집
+    finance_soup = fetch_soup(FINANCE_URL.format(code=code))
+    
+    return parse_individual_stock_pages(main_soup, investor_soup, finance_soup)
+
+def get_individual_stock_data(code, name):
+    """개별 종목 페이지에서 상세 재무 데이터 수집 (실패하면 빈 값 18개)"""
     try:
-        # 메인 페이지에서 기본 정보 수집 (가장 많은 데이터가 있음)
-        main_url = f'https://finance.naver.com/item/main.naver?code={code}'
-        main_response = requests.get(main_url, headers=headers)
-        main_soup = BeautifulSoup(main_response.text, 'html.parser')
-        
-        # 투자자별 매매동향 페이지에서 투자자 비율 수집
-        investor_url = f'https://finance.naver.com/item/frgn.naver?code={code}'
-        investor_response = requests.get(investor_url, headers=headers)
-        investor_soup = BeautifulSoup(investor_response.text, 'html.parser')
-        
-        # 재무정보 페이지에서 상세 재무 데이터 수집
-        finance_url = f'https://finance.naver.com/item/coinfo.naver?code={code}&target=finsum_more'
-        finance_response = requests.get(finance_url, headers=headers)
-        finance_soup = BeautifulSoup(finance_response.text, 'html.parser')
-        
-        # 초기화 (확장된 데이터 필드)
-        data = {
-            'PER': '', 'PBR': '', 'ROE': '', '시가총액': '',
-            '매출액': '', '영업이익': '', '당기순이익': '', 
-            '부채비율': '', '유보율': '', '배당수익률': '', '배당금': '',
-            '52주최고': '', '52주최저': '', '거래대금': '',
-            '외국인비율': '', '기관비율': '', '베타': '', '업종': '',
-            '영업이익률': '', '순이익률': ''  # 추가 지표
-        }
-        
-        # 1. 메인 페이지에서 기본 데이터 추출 (PER, PBR, ROE 최신 데이터 포함)
-        extract_main_page_data(main_soup, data)
-        
-        # 3. 투자자 페이지에서 투자자 비율 추출
-        extract_investor_data(investor_soup, data)
-        
-        # 4. 재무정보 페이지에서 재무 데이터 추출
-        extract_financial_data(finance_soup, data)
-        
-        # 5. 메인 페이지에서 추가 재무 정보 추출 (백업)
-        extract_additional_finance_data(main_soup, data)
-        
-        # 정확한 순서로 데이터 반환 (메인 수집 로직과 정확히 일치)
-        return (
-            data['PER'],        # 0: PER
-            data['PBR'],        # 1: PBR  
-            data['ROE'],        # 2: ROE
-            data['시가총액'],    # 3: 시가총액
-            data['매출액'],      # 4: 매출액
-            data['영업이익'],    # 5: 영업이익
-            data['당기순이익'],  # 6: 당기순이익
-            data['부채비율'],    # 7: 부채비율
-            data['유보율'],      # 8: 유보율
-            data['배당수익률'],  # 9: 배당수익률
-            data['배당금'],      # 10: 배당금
-            data['52주최고'],    # 11: 52주최고
-            data['52주최저'],    # 12: 52주최저
-            data['거래대금'],    # 13: 거래대금
-            data['외국인비율'],  # 14: 외국인비율
-            data['기관비율'],    # 15: 기관비율
-            data['베타'],        # 16: 베타
-            data['업종']         # 17: 업종
-        )
-        
+        return fetch_individual_stock_data(code)
     except Exception as e:
         print(f"{name} 데이터 수집 오류: {str(e)}")
         return ('',) * 18  # 18개 빈 값 반환
 
+
+# 메인 페이지 추출용 정규식 (종목마다 다시 컴파일하지 않도록 모듈 로드 시 한 번)
+_RE_MULTIPLE = re.compile(r'([+-]?\d+\.?\d*)배')
+_RE_PERCENT = re.compile(r'([+-]?\d+\.?\d*)%')
+_RE_LEADING_AMOUNT = re.compile(r'^([0-9,]+)')
+_RE_SECTOR = re.compile(r'업종[^\w]*([가-힣\w\s]+?)(?:\s|업종|분류)')
+_RE_STARTS_WITH_DIGIT = re.compile(r'^\d')
+_RE_52W_PATTERNS = [
+    # 패턴 1: "52주최고l최저: 88,800l49,900" 형태
+    re.compile(r'52주최고[^\d]*?최저[^\d]*?([,\d]+)[^\d]*?([,\d]+)'),
+    # 패턴 2: "52주 최고 88,800 최저 49,900" 형태
+    re.compile(r'52주\s*최고[^\d]*?([,\d]+)[^\d]*?최저[^\d]*?([,\d]+)'),
+    # 패턴 3: "최고 88,800 최저 49,900" 형태
+    re.compile(r'최고[^\d]*?([,\d]+)[^\d]*?최저[^\d]*?([,\d]+)'),
+    # 패턴 4: "88,800l49,900" 간단한 형태 (52주 관련 텍스트 근처에서만)
+    re.compile(r'([,\d]{5,})l([,\d]{5,})'),
+    # 패턴 5: 세로 막대 구분자
+    re.compile(r'([,\d]{5,})\|([,\d]{5,})'),
+]
+_RE_MARKET_CAP_JO = re.compile(r'시가총액[\s:]*([0-9,]+)조\s*([0-9,]+)?억원')
+_RE_MARKET_CAP_OK = re.compile(r'시가총액[^\d]*?([,\d]+)억원')
+_RE_TRADING_VALUE = re.compile(r'거래대금[^\d]*?([,\d]+)백만원')
+_RE_OK_WON = re.compile(r'([0-9,]+)억원')
+_RE_MILLION_WON = re.compile(r'([0-9,]+)백만원')
+_RE_DIVIDEND_YIELD = re.compile(r'배당수익률[:\s]*([0-9.]+)%')
+_RE_ROE_PATTERNS = [
+    re.compile(r'ROE[^\d]*?([+-]?\d+\.?\d*)%?'),
+    re.compile(r'자기자본이익률[^\d]*?([+-]?\d+\.?\d*)%?'),
+]
+_RE_SIGNED_NUMBER = re.compile(r'([+-]?\d+\.?\d*)')
+
+# 투자정보 박스의 값 요소 (한 번의 select로 함께 찾음)
+_MAIN_PAGE_IDS = 'em#_per, em#_pbr, em#_dvr, em#_market_sum'
+
+
+class _TableView:
+    """테이블 하나의 텍스트·행별 셀을 한 번만 계산"""
+
+    def __init__(self, table):
+        self.table = table
+        self.text = table.get_text()
+        self.cells = [row.find_all(['td', 'th']) for row in table.find_all('tr')]
+        self._texts = None
+
+    @property
+    def row_texts(self):
+        """행별 셀 텍스트 (get_text(strip=True))"""
+        if self._texts is None:
+            self._texts = [[cell.get_text(strip=True) for cell in cells] for cells in self.cells]
+        return self._texts
+
+
+class MainPageView:
+    """
+    종목 메인 페이지를 한 번 순회한 결과.
+    추출 함수들이 같은 페이지의 테이블 목록·셀 텍스트·전체 텍스트를 다시 계산하지 않도록 공유합니다.
+    전체 텍스트(page_text)는 정규식 대체 경로가 필요할 때만 계산합니다.
+    """
+
+    def __init__(self, soup):
+        self.soup = soup
+        self.tables = [_TableView(table) for table in soup.find_all('table')]
+        self.ids = {em.get('id'): em.get_text(strip=True) for em in soup.select(_MAIN_PAGE_IDS)}
+        self._page_text = None
+
+    @property
+    def page_text(self):
+        if self._page_text is None:
+            self._page_text = self.soup.get_text()
+        return self._page_text
+
+
+def as_main_page(page):
+    """BeautifulSoup 또는 MainPageView → MainPageView"""
+    return page if isinstance(page, MainPageView) else MainPageView(page)
+
+
+def _fill_investment_ids(page, data):
+    """투자정보 박스의 id 요소(_per, _pbr, _dvr)에서 바로 추출. 테이블 행에서 읽는 값과 같은 규칙 적용"""
+    if not data['PER'] and page.ids.get('_per'):
+        per_match = _RE_MULTIPLE.search(page.ids['_per'] + '배')
+        if per_match and 0 < float(per_match.group(1)) < 1000:
+            data['PER'] = per_match.group(1)
+            print(f"✅ 올바른 PER 추출: {data['PER']}배")
+
+    if not data['PBR'] and page.ids.get('_pbr'):
+        pbr_match = _RE_MULTIPLE.search(page.ids['_pbr'] + '배')
+        if pbr_match and 0 < float(pbr_match.group(1)) < 100:
+            data['PBR'] = pbr_match.group(1)
+            print(f"✅ 올바른 PBR 추출: {data['PBR']}배")
+
+    if not data['배당수익률'] and page.ids.get('_dvr'):
+        dividend_match = _RE_PERCENT.search(page.ids['_dvr'] + '%')
+        if dividend_match:
+            data['배당수익률'] = dividend_match.group(1)
+            print(f"✅ 배당수익률 추출: {data['배당수익률']}%")
+
+
+def _fill_52week_from_row(page, data):
+    """'52주최고l최저' 행의 값 셀에서 바로 추출 (전체 텍스트 패턴 1과 같은 규칙)"""
+    for table in page.tables:
+        if '52주최고' not in table.text:
+            continue
+        for texts in table.row_texts:
+            if len(texts) >= 2 and '52주최고' in texts[0]:
+                match = _RE_52W_PATTERNS[0].search(texts[0] + texts[1])
+                if match and _set_52week(data, match, '행'):
+                    return
+
+
+def _set_52week(data, match, source):
+    """정규식 매치의 (최고, 최저)가 합리적이면 data에 기록하고 True"""
+    high = match.group(1).replace(',', '')
+    low = match.group(2).replace(',', '')
+    try:
+        high_val = int(high)
+        low_val = int(low)
+    except ValueError:
+        return False
+
+    # 조건: 4자리 이상, high > low, 현실적인 주가 범위
+    if (len(high) >= 4 and len(low) >= 4 and
+        high_val > low_val and
+        100 <= low_val <= 1000000 and
+        100 <= high_val <= 1000000):
+        data['52주최고'] = high
+        data['52주최저'] = low
+        print(f"✅ 52주 최고/최저 추출 ({source}): {data['52주최고']}/{data['52주최저']}")
+        return True
+    return False
+
+
+def _fill_market_cap_from_text(text, data):
+    """'시가총액 ...조 ...억원' / '...억원' 문구에서 억 단위 시가총액 추출"""
+    # 1. '조'와 '억'이 모두 있는 경우
+    jo_ok_match = _RE_MARKET_CAP_JO.search(text)
+    if jo_ok_match:
+        jo = int(jo_ok_match.group(1).replace(',', ''))
+        ok = int(jo_ok_match.group(2).replace(',', '')) if jo_ok_match.group(2) else 0
+        data['시가총액'] = str(jo * 10000 + ok)
+        print(f"✅ 시가총액 추출(조+억): {jo}조 {ok}억 → {data['시가총액']}억")
+        return
+    # 2. '억원'만 있는 경우
+    market_cap_match = _RE_MARKET_CAP_OK.search(text)
+    if market_cap_match:
+        data['시가총액'] = market_cap_match.group(1).replace(',', '')
+        print(f"✅ 시가총액 추출: {data['시가총액']}억원")
+
+
 def extract_investment_indicators(soup, data):
     """종목정보 페이지의 투자지표 테이블에서 최신 데이터 추출 (올바른 위치에서)"""
     try:
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            table_text = table.get_text()
+        page = as_main_page(soup)
+        _fill_investment_ids(page, data)
+
+        for table in page.tables:
+            table_text = table.text
             
             # PER/PBR 전용 테이블 찾기 (테이블 10번 - PER/EPS 박스)
             if 'PERlEPS' in table_text and 'PBRlBPS' in table_text:
-                rows = table.find_all('tr')
+                if data['PER'] and data['PBR'] and data['배당수익률']:
+                    continue
                 
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
+                for cells in table.row_texts:
                     if len(cells) >= 2:
-                        first_cell_text = cells[0].get_text(strip=True)
-                        second_cell_text = cells[1].get_text(strip=True)
+                        first_cell_text = cells[0]
+                        second_cell_text = cells[1]
                         
                         # PER 추출 (PERlEPS 행에서)
                         if 'PERlEPS' in first_cell_text and '추정' not in first_cell_text and not data['PER']:
                             # "11.53배l5,162원" 형태에서 PER 값 추출
-                            per_match = re.search(r'([+-]?\d+\.?\d*)배', second_cell_text)
+                            per_match = _RE_MULTIPLE.search(second_cell_text)
                             if per_match:
                                 per_value = float(per_match.group(1))
                                 if 0 < per_value < 1000:  # 합리적인 PER 범위
@@ -356,7 +449,7 @@ def extract_investment_indicators(soup, data):
                         # PBR 추출 (PBRlBPS 행에서)
                         elif 'PBRlBPS' in first_cell_text and not data['PBR']:
                             # "1.01배l59,059원" 형태에서 PBR 값 추출
-                            pbr_match = re.search(r'([+-]?\d+\.?\d*)배', second_cell_text)
+                            pbr_match = _RE_MULTIPLE.search(second_cell_text)
                             if pbr_match:
                                 pbr_value = float(pbr_match.group(1))
                                 if 0 < pbr_value < 100:  # 합리적인 PBR 범위
@@ -366,28 +459,28 @@ def extract_investment_indicators(soup, data):
                         # 배당수익률 추출
                         elif '배당수익률' in first_cell_text and not data['배당수익률']:
                             # "2.43%" 형태
-                            dividend_match = re.search(r'([+-]?\d+\.?\d*)%', second_cell_text)
+                            dividend_match = _RE_PERCENT.search(second_cell_text)
                             if dividend_match:
                                 data['배당수익률'] = dividend_match.group(1)
                                 print(f"✅ 배당수익률 추출: {data['배당수익률']}%")
             
             # 동종업종비교 테이블에서 시가총액 추출 (정확한 위치)
             elif '동종업종비교' in table_text and '삼성전자' in table_text:
-                rows = table.find_all('tr')
+                if data['시가총액']:
+                    continue
                 
                 # 삼성전자가 첫 번째 컬럼에 있는 테이블에서 시가총액 추출
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
+                for cells in table.row_texts:
                     if len(cells) >= 2:
-                        first_cell_text = cells[0].get_text(strip=True)
+                        first_cell_text = cells[0]
                         
                         # 시가총액(억) 행 찾기
                         if '시가총액' in first_cell_text and '억' in first_cell_text:
                             # 삼성전자는 두 번째 컬럼 (인덱스 1)
                             if len(cells) > 1 and not data['시가총액']:
-                                samsung_cap = cells[1].get_text(strip=True).replace(',', '')
+                                samsung_cap = cells[1].replace(',', '')
                                 # 숫자만 추출
-                                cap_match = re.search(r'^([0-9,]+)', samsung_cap)
+                                cap_match = _RE_LEADING_AMOUNT.search(samsung_cap)
                                 if cap_match:
                                     data['시가총액'] = cap_match.group(1).replace(',', '')
                                     print(f"✅ 올바른 시가총액 추출: {data['시가총액']}억원")
@@ -398,31 +491,31 @@ def extract_investment_indicators(soup, data):
 def extract_latest_financial_ratios(soup, data):
     """투자정보 테이블에서 최신 PER, PBR, ROE 추출 (2025.03 기준)"""
     try:
-        tables = soup.find_all('table')
+        page = as_main_page(soup)
         
-        for table in tables:
-            table_text = table.get_text()
+        for table in page.tables:
+            table_text = table.text
             
             # 2025.03이 포함된 투자정보 테이블 찾기
             if 'PER' in table_text and 'PBR' in table_text and '2025.03' in table_text:
-                rows = table.find_all('tr')
+                rows = table.row_texts
                 
                 # 헤더에서 최신 컬럼 위치 찾기 (2025.06 우선, 없으면 2025.03)
                 latest_col_index = -1
                 if len(rows) >= 2:
-                    header_cells = rows[1].find_all(['td', 'th'])  # 2번째 행이 년도 행
+                    header_cells = rows[1]  # 2번째 행이 년도 행
                     
                     # 1순위: 2025.06 찾기
-                    for i, cell in enumerate(header_cells):
-                        if '2025.06' in cell.get_text(strip=True):
+                    for i, cell_text in enumerate(header_cells):
+                        if '2025.06' in cell_text:
                             latest_col_index = i
                             print(f"✅ 2025.06 컬럼 발견 (컬럼 {i})")
                             break
                     
                     # 2순위: 2025.06이 없으면 2025.03 찾기  
                     if latest_col_index == -1:
-                        for i, cell in enumerate(header_cells):
-                            if '2025.03' in cell.get_text(strip=True):
+                        for i, cell_text in enumerate(header_cells):
+                            if '2025.03' in cell_text:
                                 latest_col_index = i
                                 print(f"✅ 2025.03 컬럼 발견 (컬럼 {i})")
                                 break
@@ -431,11 +524,10 @@ def extract_latest_financial_ratios(soup, data):
                     continue
                 
                 # 각 행에서 PER, PBR, ROE, 부채비율, 유보율 추출
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
+                for cells in rows:
                     if len(cells) > latest_col_index:
-                        first_cell_text = cells[0].get_text(strip=True)
-                        latest_value = cells[latest_col_index].get_text(strip=True)
+                        first_cell_text = cells[0]
+                        latest_value = cells[latest_col_index]
                         
                         # PER 추출 (PER(배) 행)
                         if 'PER' in first_cell_text and '배' in first_cell_text and not data['PER']:
@@ -537,87 +629,55 @@ def extract_latest_financial_ratios(soup, data):
         print(f"재무비율 추출 오류: {str(e)}")
 
 def extract_main_page_data(soup, data):
-    """메인 페이지에서 모든 주요 정보 추출 (PER, PBR, ROE, 시가총액, 52주 최고/최저, 배당수익률)"""
+    """
+    메인 페이지에서 모든 주요 정보 추출 (PER, PBR, ROE, 시가총액, 52주 최고/최저, 배당수익률).
+    soup 대신 MainPageView를 넘기면 테이블·셀 텍스트를 다시 계산하지 않습니다.
+    투자정보 박스의 id 요소와 52주 행에서 먼저 채우고, 비어 있는 값만 기존 정규식·테이블 탐색으로 찾습니다.
+    """
     try:
+        page = as_main_page(soup)
+
         # 업종 정보 추출 (여러 위치에서 시도)
         if not data['업종']:
             # 시도 1: h2 태그 내 em 태그
-            sector_elements = soup.select('div.wrap_company h2 em')
+            sector_elements = page.soup.select('div.wrap_company h2 em')
             if sector_elements:
                 data['업종'] = sector_elements[0].get_text(strip=True)
                 print(f"✅ 업종 추출: {data['업종']}")
             
             # 시도 2: 업종 테이블에서 찾기
             if not data['업종']:
-                page_text = soup.get_text()
-                sector_match = re.search(r'업종[^\w]*([가-힣\w\s]+?)(?:\s|업종|분류)', page_text)
+                sector_match = _RE_SECTOR.search(page.page_text)
                 if sector_match:
                     sector = sector_match.group(1).strip()
-                    if sector and not re.match(r'^\d', sector):  # 숫자로 시작하지 않는 경우만
+                    if sector and not _RE_STARTS_WITH_DIGIT.match(sector):  # 숫자로 시작하지 않는 경우만
                         data['업종'] = sector
                         print(f"✅ 업종 추출 (텍스트): {data['업종']}")
         
         # 1. 우측 투자정보 박스에서 최신 투자지표 추출 (우선순위 높음)
-        extract_investment_indicators(soup, data)
+        extract_investment_indicators(page, data)
         
         # 2. 재무정보 테이블에서 최신 PER, PBR, ROE 추출 (백업)
-        extract_latest_financial_ratios(soup, data)
-        
-        # 3. 전체 페이지 텍스트에서 52주 최고/최저, 시가총액, 거래대금 추출
-        page_text = soup.get_text()
+        extract_latest_financial_ratios(page, data)
         
-        # 52주 최고/최저 추출 (강화된 패턴) ⭐ 개선
+        # 3. 52주 최고/최저: '52주최고l최저' 행에서 먼저, 없으면 전체 페이지 텍스트 패턴으로
         if not data['52주최고'] or not data['52주최저']:
-            patterns = [
-                # 패턴 1: "52주최고l최저: 88,800l49,900" 형태
-                r'52주최고[^\d]*?최저[^\d]*?([,\d]+)[^\d]*?([,\d]+)',
-                # 패턴 2: "52주 최고 88,800 최저 49,900" 형태  
-                r'52주\s*최고[^\d]*?([,\d]+)[^\d]*?최저[^\d]*?([,\d]+)',
-                # 패턴 3: "최고 88,800 최저 49,900" 형태
-                r'최고[^\d]*?([,\d]+)[^\d]*?최저[^\d]*?([,\d]+)',
-                # 패턴 4: "88,800l49,900" 간단한 형태 (52주 관련 텍스트 근처에서만)
-                r'([,\d]{5,})l([,\d]{5,})',
-                # 패턴 5: 세로 막대 구분자
-                r'([,\d]{5,})\|([,\d]{5,})',
-            ]
-            
-            for i, pattern in enumerate(patterns):
+            _fill_52week_from_row(page, data)
+
+        if not data['52주최고'] or not data['52주최저']:
+            for i, pattern in enumerate(_RE_52W_PATTERNS):
                 if data['52주최고'] and data['52주최저']:
                     break
                     
-                matches = re.finditer(pattern, page_text)
-                for match in matches:
-                    high = match.group(1).replace(',', '')
-                    low = match.group(2).replace(',', '')
-                    
-                    # 합리적인 값인지 확인
-                    try:
-                        high_val = int(high)
-                        low_val = int(low)
-                        
-                        # 조건: 4자리 이상, high > low, 현실적인 주가 범위
-                        if (len(high) >= 4 and len(low) >= 4 and 
-                            high_val > low_val and 
-                            100 <= low_val <= 1000000 and 
-                            100 <= high_val <= 1000000):
-                            
-                            data['52주최고'] = high
-                            data['52주최저'] = low
-                            print(f"✅ 52주 최고/최저 추출 (패턴{i+1}): {data['52주최고']}/{data['52주최저']}")
-                            break
-                    except:
-                        continue
+                for match in pattern.finditer(page.page_text):
+                    if _set_52week(data, match, f'패턴{i+1}'):
+                        break
         
         # 테이블에서 52주 최고/최저 직접 찾기 (백업) ⭐ 추가
         if not data['52주최고'] or not data['52주최저']:
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    for cell in cells:
-                        cell_text = cell.get_text(strip=True)
-                        
+            for table in page.tables:
+                for cells in table.row_texts:
+                    for cell_text in cells:
                         # "88,800l49,900" 같은 패턴 찾기
                         if 'l' in cell_text and len(cell_text) < 20:  # 너무 긴 텍스트는 제외
                             parts = cell_text.split('l')
@@ -639,60 +699,47 @@ def extract_main_page_data(soup, data):
                 if data['52주최고'] and data['52주최저']:
                     break
         
-        # 시가총액 추출
+        # 시가총액 추출: 투자정보 박스(em#_market_sum) → 전체 페이지 텍스트
+        if not data['시가총액'] and page.ids.get('_market_sum'):
+            _fill_market_cap_from_text(f"시가총액 {page.ids['_market_sum']}억원", data)
         if not data['시가총액']:
-            # 1. '조'와 '억'이 모두 있는 경우
-            jo_ok_match = re.search(r'시가총액[\s:]*([0-9,]+)조\s*([0-9,]+)?억원', soup.get_text())
-            if jo_ok_match:
-                jo = int(jo_ok_match.group(1).replace(',', ''))
-                ok = int(jo_ok_match.group(2).replace(',', '')) if jo_ok_match.group(2) else 0
-                data['시가총액'] = str(jo * 10000 + ok)
-                print(f"✅ 시가총액 추출(조+억): {jo}조 {ok}억 → {data['시가총액']}억")
-            else:
-                # 2. '억원'만 있는 경우
-                market_cap_match = re.search(r'시가총액[^\d]*?([,\d]+)억원', soup.get_text())
-                if market_cap_match:
-                    data['시가총액'] = market_cap_match.group(1).replace(',', '')
-                    print(f"✅ 시가총액 추출: {data['시가총액']}억원")
+            _fill_market_cap_from_text(page.page_text, data)
         
         # 거래대금 추출
         if not data['거래대금']:
             # "1,057,637백만원" 패턴
-            trading_match = re.search(r'거래대금[^\d]*?([,\d]+)백만원', page_text)
+            trading_match = _RE_TRADING_VALUE.search(page.page_text)
             if trading_match:
                 data['거래대금'] = trading_match.group(1).replace(',', '')
                 print(f"✅ 거래대금 추출: {data['거래대금']}백만원")
         
-        # 4. 테이블에서 추가 정보 추출
-        tables = soup.find_all('table')
-        
-        for table in tables:
-            table_text = table.get_text()
+        # 4. 테이블에서 추가 정보 추출 (시가총액/거래대금 백업)
+        for table in page.tables:
+            if data['시가총액'] and data['거래대금']:
+                break
             
             # 시가총액/거래대금 테이블 찾기 (백업)
-            if '시가총액' in table_text:
-                rows = table.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
+            if '시가총액' in table.text:
+                for cells in table.row_texts:
                     if len(cells) >= 2:
-                        first_cell = cells[0].get_text(strip=True)
-                        second_cell = cells[1].get_text(strip=True)
+                        first_cell = cells[0]
+                        second_cell = cells[1]
                         
                         if '시가총액' in first_cell and not data['시가총액']:
                             # "3,522,184억원" → "3522184"
-                            cap_match = re.search(r'([0-9,]+)억원', second_cell)
+                            cap_match = _RE_OK_WON.search(second_cell)
                             if cap_match:
                                 data['시가총액'] = cap_match.group(1).replace(',', '')
                         
                         elif '거래대금' in first_cell and not data['거래대금']:
                             # "1,057,637백만원" → "1057637"
-                            amount_match = re.search(r'([0-9,]+)백만원', second_cell)
+                            amount_match = _RE_MILLION_WON.search(second_cell)
                             if amount_match:
                                 data['거래대금'] = amount_match.group(1).replace(',', '')
         
         # 5. 메인 페이지에서 배당수익률 추출 (백업)
         if not data['배당수익률']:
-            dividend_pattern = re.search(r'배당수익률[:\s]*([0-9.]+)%', soup.get_text())
+            dividend_pattern = _RE_DIVIDEND_YIELD.search(page.page_text)
             if dividend_pattern:
                 data['배당수익률'] = dividend_pattern.group(1)
                 print(f"✅ 메인페이지 배당수익률 추출: {data['배당수익률']}%")
@@ -872,18 +919,14 @@ def extract_price_data(soup, data):
         print(f"시세 데이터 추출 오류: {str(e)}")
 
 def extract_additional_finance_data(soup, data):
-    """메인 페이지에서 추가 재무 정보 추출 (백업용)"""
+    """메인 페이지에서 추가 재무 정보 추출 (백업용). soup 또는 MainPageView"""
     try:
-        page_text = soup.get_text()
+        page = as_main_page(soup)
         
         # ROE 패턴 찾기
         if not data['ROE']:
-            roe_patterns = [
-                r'ROE[^\d]*?([+-]?\d+\.?\d*)%?',
-                r'자기자본이익률[^\d]*?([+-]?\d+\.?\d*)%?'
-            ]
-            for pattern in roe_patterns:
-                roe_match = re.search(pattern, page_text)
+            for pattern in _RE_ROE_PATTERNS:
+                roe_match = pattern.search(page.page_text)
                 if roe_match:
                     value = float(roe_match.group(1))
                     if -100 <= value <= 100:  # 합리적인 ROE 범위
@@ -893,16 +936,13 @@ def extract_additional_finance_data(soup, data):
         # 베타 정보 재시도
         if not data['베타']:
             # 테이블에서 베타 찾기
-            tables = soup.find_all('table')
-            for table in tables:
-                if '베타' in table.get_text():
-                    rows = table.find_all('tr')
-                    for row in rows:
-                        cells = row.find_all(['td', 'th'])
+            for table in page.tables:
+                if '베타' in table.text:
+                    for cells in table.cells:
                         for i, cell in enumerate(cells[:-1]):
                             if '베타' in cell.get_text() and i+1 < len(cells):
                                 beta_text = cells[i+1].get_text(strip=True)
-                                beta_match = re.search(r'([+-]?\d+\.?\d*)', beta_text)
+                                beta_match = _RE_SIGNED_NUMBER.search(beta_text)
                                 if beta_match:
                                     data['베타'] = beta_match.group(1)
                                     break
@@ -917,232 +957,333 @@ def extract_additional_finance_data(soup, data):
     except Exception as e:
         print(f"추가 재무 데이터 추출 오류: {str(e)}")
 
-def get_stock_data():
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'}
+def parse_max_page(soup):
+    """시가총액 목록 첫 페이지에서 마지막 페이지 번호 추출"""
+    page_nav = soup.select('td.pgRR > a')
+    if page_nav:
+        return int(page_nav[0]['href'].split('=')[-1])
+    return 1
+
+def market_sum_table_rows(soup):
+    """시가총액 목록 표의 행 (머리글 제외, 종목 필터 전). 비어 있으면 마지막 페이지를 넘어선 것."""
+    return soup.select('table.type_2 tr')[1:]
+
+def parse_market_sum_rows(soup):
+    """시가총액 목록 페이지에서 일반 주식 (종목명, 종목코드, 현재가, 거래량) 목록 추출"""
+    listings = []
+    for row in market_sum_table_rows(soup):
+        cols = row.select('td')
+        if len(cols) <= 1:
+            continue
+        
+        try:
+            name_element = cols[1].select_one('a')
+            if not name_element:
+                continue
+            
+            name = name_element.text.strip()
+            code = name_element['href'].split('=')[-1]
+            # 이전 실행에서 판별한 종목(코드·이름 동일)은 저장된 판정 사용
+            if not classify(code, name):
+                continue
+            
+            current_price = cols[2].text.strip().replace(',', '')
+            current_volume = cols[9].text.strip().replace(',', '') if len(cols) > 9 else ''
+            listings.append((name, code, current_price, current_volume))
+        except Exception as e:
+            print(f"목록 행 파싱 오류: {str(e)}")
+            continue
+    return listings
+
+def parse_prev_day(daily_soup):
+    """일별 시세 페이지에서 (전일종가, 전일거래량) 추출"""
+    daily_rows = daily_soup.select('table.type2 tr')
+    valid_rows = [r for r in daily_rows if r.select('td.num')]
+    
+    prev_close = ''
+    prev_volume = ''
+    if len(valid_rows) >= 2:
+        yesterday_row = valid_rows[1]
+        yesterday_cols = yesterday_row.select('td.num')
+        if len(yesterday_cols) >= 6:
+            prev_close = yesterday_cols[0].text.strip().replace(',', '')
+            prev_volume = yesterday_cols[5].text.strip().replace(',', '')
+    return prev_close, prev_volume
+
+def build_stock_row(name, code, market_name, current_price, current_volume, details, prev_close, prev_volume):
+    """수집 값으로 STOCK_DATA_COLUMN_ORDER 스키마의 종목 행(dict) 생성"""
+    (per, pbr, roe, market_cap, sales, operating_profit, net_income, 
+     debt_ratio, retention_ratio, dividend_yield, dividend,
+     high_52w, low_52w, trading_value, foreign_ratio, 
+     institutional_ratio, beta, sector) = details
+    
+    # 거래량 증감율 계산
+    volume_change_rate = calculate_volume_change_rate(current_volume, prev_volume)
+    
+    row = {
+        '종목명': name,
+        '종목코드': code,
+        '시장구분': market_name,
+        '업종': sector,
+        '현재가': current_price,
+        '전일종가': prev_close,
+        '거래량': current_volume,
+        '전일거래량': prev_volume,
+        '거래량증감율': volume_change_rate,
+        '거래대금': trading_value,
+        '전일거래대금': '',
+        '거래대금증감율': '',
+        'PER': per,
+        'PBR': pbr,
+        'ROE': roe,
+        '시가총액': market_cap,
+        '매출액': sales,
+        '영업이익': operating_profit,
+        '당기순이익': net_income,
+        '부채비율': debt_ratio,
+        '유보율': retention_ratio,
+        '배당수익률': dividend_yield,
+        '배당금': dividend,
+        '52주최고': high_52w,
+        '52주최저': low_52w,
+        '외국인비율': foreign_ratio,
+        '기관비율': institutional_ratio,
+        '베타': beta,
+        '수집일자': datetime.now().strftime('%Y-%m-%d')
+    }
+    return fill_trading_amounts_record(row)
+
+def get_stock_data(journal=None):
+    """
+    전체 종목 순차 수집 (동시 수집은 async_stock_collector.collect_stock_data)
+    journal: CrawlJournal. 저널에 있는 종목은 요청 없이 기록된 행을 쓰고, 새로 끝난 종목은 기록.
+    """
     stock_data = []
     
     for market_type in [0, 1]:
-        market_name = "코스피" if market_type == 0 else "코스닥"
+        market_name = MARKET_NAMES[market_type]
         print(f"\n{market_name} 데이터 수집 시작...")
         
         # 전체 페이지 수 확인
-        url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok={market_type}&page=1'
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        max_page = 1
-        page_nav = soup.select('td.pgRR > a')
-        if page_nav:
-            max_page = int(page_nav[0]['href'].split('=')[-1])
+        soup = fetch_soup(MARKET_SUM_URL.format(market_type=market_type, page=1))
         
+        max_page = parse_max_page(soup)
         print(f"{market_name} 전체 페이지 수: {max_page}")
         
         # 전체 페이지 수집
         for page in range(1, max_page + 1):
             print(f"페이지 {page}/{max_page} 수집 중...")
-            url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok={market_type}&page={page}'
-            response = requests.get(url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = fetch_soup(MARKET_SUM_URL.format(market_type=market_type, page=page))
             
-            rows = soup.select('table.type_2 tr')[1:]
-            if not rows:
+            # ETF·ETN만 있는 페이지도 있으므로 종목 필터 전 표 행으로 끝 판단
+            if not market_sum_table_rows(soup):
                 break
+            listings = parse_market_sum_rows(soup)
             
             collected = 0
-            for row in rows:
-                cols = row.select('td')
-                if len(cols) <= 1:
+            for name, code, current_price, current_volume in listings:
+                if journal is not None and code in journal:
+                    row = journal.row(code)
+                    if row:
+                        stock_data.append(row)
+                        collected += 1
                     continue
                 
                 try:
-                    name_element = cols[1].select_one('a')
-                    if not name_element:
-                        continue
+                    # 개별 종목 페이지에서 상세 데이터 수집 (요청 간격은 rate_limiter가 조절)
+                    # 요청·파싱 실패는 아래 except로: 저널에 남기지 않아 --resume 때 다시 수집
+                    details = fetch_individual_stock_data(code)
+                    per, pbr, roe = details[:3]
                     
-                    name = name_element.text.strip()
-                    if not is_regular_stock(name):
-                        continue
-                    
-                    code = name_element['href'].split('=')[-1]
-                    current_price = cols[2].text.strip().replace(',', '')
-                    current_volume = cols[9].text.strip().replace(',', '') if len(cols) > 9 else ''
-                    
-                    # 개별 종목 페이지에서 상세 데이터 수집
-                    time.sleep(0.3)  # 서버 부하 방지
-                    (per, pbr, roe, market_cap, sales, operating_profit, net_income, 
-                     debt_ratio, retention_ratio, dividend_yield, dividend,
-                     high_52w, low_52w, trading_value, foreign_ratio, 
-                     institutional_ratio, beta, sector) = get_individual_stock_data(code, name)
-                    
-                    # ETF/펀드 추가 필터링: PER, PBR, ROE가 모두 비어있으면 제외
+                    # ETF/펀드 추가 필터링: 받은 종목 페이지에 PER, PBR, ROE가 모두 없으면 제외
                     if not per and not pbr and not roe:
                         print(f"  - {name}: PER/PBR/ROE 데이터 없음 (ETF/펀드로 추정) - 제외")
+                        if journal is not None:
+                            journal.mark_skipped(code)
                         continue
                     
                     # 일별 시세 페이지에서 전일 데이터 가져오기
-                    time.sleep(0.1)
-                    daily_url = f'https://finance.naver.com/item/sise_day.naver?code={code}'
-                    daily_response = requests.get(daily_url, headers=headers)
-                    daily_soup = BeautifulSoup(daily_response.text, 'html.parser')
-                    
-                    daily_rows = daily_soup.select('table.type2 tr')
-                    valid_rows = [r for r in daily_rows if r.select('td.num')]
-                    
-                    prev_close = ''
-                    prev_volume = ''
-                    if len(valid_rows) >= 2:
-                        yesterday_row = valid_rows[1]
-                        yesterday_cols = yesterday_row.select('td.num')
-                        if len(yesterday_cols) >= 6:
-                            prev_close = yesterday_cols[0].text.strip().replace(',', '')
-                            prev_volume = yesterday_cols[5].text.strip().replace(',', '')
-                    
-                    # 거래량 증감율 계산
-                    volume_change_rate = calculate_volume_change_rate(current_volume, prev_volume)
+                    daily_soup = fetch_soup(DAILY_URL.format(code=code))
+                    prev_close, prev_volume = parse_prev_day(daily_soup)
                     
                     if all([name, code, current_price]):
-                        row = {
-                            '종목명': name,
-                            '종목코드': code,
-                            '시장구분': market_name,
-                            '업종': sector,
-                            '현재가': current_price,
-                            '전일종가': prev_close,
-                            '거래량': current_volume,
-                            '전일거래량': prev_volume,
-                            '거래량증감율': volume_change_rate,
-                            '거래대금': trading_value,
-                            '전일거래대금': '',
-                            '거래대금증감율': '',
-                            'PER': per,
-                            'PBR': pbr,
-                            'ROE': roe,
-                            '시가총액': market_cap,
-                            '매출액': sales,
-                            '영업이익': operating_profit,
-                            '당기순이익': net_income,
-                            '부채비율': debt_ratio,
-                            '유보율': retention_ratio,
-                            '배당수익률': dividend_yield,
-                            '배당금': dividend,
-                            '52주최고': high_52w,
-                            '52주최저': low_52w,
-                            '외국인비율': foreign_ratio,
-                            '기관비율': institutional_ratio,
-                            '베타': beta,
-                            '수집일자': datetime.now().strftime('%Y-%m-%d')
-                        }
-                        fill_trading_amounts_record(row)
+                        row = build_stock_row(
+                            name, code, market_name, current_price, current_volume,
+                            details, prev_close, prev_volume,
+                        )
                         stock_data.append(row)
                         collected += 1
+                        if journal is not None:
+                            journal.append(row)
                         
                         # 진행상황 출력
                         if collected % 10 == 0:
-                            print(f"  - {collected}개 종목 수집 완료 (최근: {name} - 업종: {sector})")
+                            print(f"  - {collected}개 종목 수집 완료 (최근: {name} - 업종: {row['업종']})")
                 
                 except Exception as e:
-                    print(f"오류 발생 - 종목: {name if 'name' in locals() else '알 수 없음'}, 오류: {str(e)}")
+                    print(f"오류 발생 - 종목: {name}, 오류: {str(e)}")
                     continue
             
             print(f"페이지 {page}에서 {collected}개 종목 수집 완료")
-            
-            # 중간 저장 (5페이지마다, 로컬에만)
-            if page % 5 == 0:
-                temp_df = pd.DataFrame(stock_data)
-                temp_filename = f'temp_stock_data_{datetime.now().strftime("%Y%m%d_%H%M")}_{page}.xlsx'
-                temp_df.to_excel(temp_filename, index=False)
-                print(f"중간 저장 (로컬): {temp_filename}")
     
     return stock_data
 
-def main():
+def collect_snapshot(concurrency=None, sequential=False, resume=False, excel=False,
+                     source='listing', details=True):
+    """
+    전체 종목 수집 후 스냅샷 저장 → (DataFrame, 파일 이름). 수집된 종목이 없으면 (None, None).
+    숫자 열은 이미 float64 (coerce_stock_frame)이므로 다음 단계에 그대로 넘길 수 있음.
+    source: 'listing' 시가총액 목록 항목 선택으로 일괄 수집 (market_sum_collector, details=False면 목록만)
+            'pages'   종목마다 main·frgn·coinfo·sise_day 동시 수집 (async_stock_collector)
+    """
+    from async_stock_collector import DEFAULT_CONCURRENCY, collect_stock_data
+    from crawl_journal import CrawlJournal
+    import market_sum_collector
+
     print("=== 전체 종목 상세 데이터 수집 시작 ===")
     print("수집 데이터: 26개 필드 (재무지표, 투자자정보, 배당정보, 거래량증감율 등)")
-    print("예상 소요시간: 3-4시간 (전체 종목 약 2000-3000개)")
-    print("주의: 수집 중 중단하지 마세요. 5페이지마다 로컬에 중간 저장됩니다.\n")
+    if sequential:
+        print("예상 소요시간: 3-4시간 (전체 종목 약 2000-3000개)")
+    elif source == 'listing' and not details:
+        print(f"목록만 수집: {', '.join(market_sum_collector.DETAIL_ONLY_COLUMNS)}은 비워 둡니다.")
+    
+    journal = CrawlJournal()
+    resumed = journal.open(resume=resume)
+    print(f"수집 저널: {journal.path}")
+    if resumed:
+        print(f"이어서 수집: 저널에 기록된 {resumed}개 종목은 건너뜁니다.")
+    print("중단되면 --resume 으로 다시 실행하세요.\n")
     
     start_time = datetime.now()
-    stock_data = get_stock_data()
+    with journal:
+        if sequential:
+            stock_data = get_stock_data(journal=journal)
+        elif source == 'pages':
+            stock_data = collect_stock_data(max_concurrency=concurrency or DEFAULT_CONCURRENCY, journal=journal)
+        else:
+            stock_data = market_sum_collector.collect_stock_data(
+                details=details, concurrency=concurrency or DEFAULT_CONCURRENCY, journal=journal,
+            )
     end_time = datetime.now()
     
-    if stock_data:
-        df = fill_trading_amounts_df(pd.DataFrame(stock_data))
-        filename = f'full_stock_data_detailed_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx'
-        df.to_excel(filename, index=False)
-        
-        print(f"\n🎉 수집 완료!")
-        print(f"총 {len(stock_data)}개 종목의 상세 데이터가 {filename}에 저장되었습니다.")
-        print(f"소요시간: {end_time - start_time}")
-        
-        # 데이터 품질 확인
-        print(f"\n📊 데이터 품질:")
-        print(f"PER 데이터 있는 종목: {df['PER'].notna().sum()}/{len(df)}")
-        print(f"PBR 데이터 있는 종목: {df['PBR'].notna().sum()}/{len(df)}")
-        print(f"ROE 데이터 있는 종목: {df['ROE'].notna().sum()}/{len(df)}")
-        print(f"시가총액 데이터 있는 종목: {df['시가총액'].notna().sum()}/{len(df)}")
-        print(f"업종 데이터 있는 종목: {df['업종'].notna().sum()}/{len(df)}")
-        print(f"매출액 데이터 있는 종목: {df['매출액'].notna().sum()}/{len(df)}")
-        print(f"배당수익률 데이터 있는 종목: {df['배당수익률'].notna().sum()}/{len(df)}")
-        print(f"거래량증감율 데이터 있는 종목: {df['거래량증감율'].notna().sum()}/{len(df)}")
-        if '거래대금' in df.columns:
-            print(f"거래대금 데이터 있는 종목: {pd.to_numeric(df['거래대금'], errors='coerce').notna().sum()}/{len(df)}")
-        if '전일거래대금' in df.columns:
-            print(f"전일거래대금 데이터 있는 종목: {pd.to_numeric(df['전일거래대금'], errors='coerce').notna().sum()}/{len(df)}")
-        
-        # 시가총액별 분포 확인
-        df['시가총액'] = pd.to_numeric(df['시가총액'], errors='coerce')
-        print(f"\n📈 시가총액 분포:")
-        print(f"10조 이상 대형주: {(df['시가총액'] >= 100000).sum()}개")
-        print(f"1조~10조 중형주: {((df['시가총액'] >= 10000) & (df['시가총액'] < 100000)).sum()}개")
-        print(f"1조 미만 소형주: {(df['시가총액'] < 10000).sum()}개")
-        
-        # 거래량 증감율 통계
-        df['거래량증감율_num'] = pd.to_numeric(df['거래량증감율'], errors='coerce')
-        volume_stats = df['거래량증감율_num'].describe()
-        print(f"\n📊 거래량 증감율 통계:")
-        print(f"평균: {volume_stats['mean']:.2f}%")
-        print(f"중앙값: {volume_stats['50%']:.2f}%")
-        print(f"최대: {volume_stats['max']:.2f}%")
-        print(f"최소: {volume_stats['min']:.2f}%")
-        
-        # 업종별 분포 확인
-        print(f"\n🏢 업종별 분포 (상위 10개):")
-        sector_counts = df['업종'].value_counts().head(10)
-        for sector, count in sector_counts.items():
-            print(f"{sector}: {count}개")
-        
-        # 구글 시트 업로드
-        print(f"\n📤 구글 시트 업로드 시작...")
-        uploader = GoogleSheetsUploader()
-        
-        if uploader.gc:  # 구글 시트 연결이 성공한 경우
-            # 기존 Stock Analyzer와 동일한 스프레드시트 사용
-            today = datetime.now().strftime('%Y-%m-%d')
-            spreadsheet_name = f"주식분석결과_{today}"
-            sheet_name = f"💾_전체종목데이터_{datetime.now().strftime('%H%M')}"
-            
-            success = uploader.upload_dataframe(df, spreadsheet_name, sheet_name)
-            
-            if success:
-                # 헤더 포맷 적용
-                uploader.format_sheet_headers(spreadsheet_name, sheet_name)
-                
-                # 스프레드시트 URL 출력
-                url = uploader.get_spreadsheet_url(spreadsheet_name)
-                if url:
-                    print(f"📊 구글 시트 링크: {url}")
-                    
-                print(f"✅ 구글 시트 업로드 완료!")
-                print(f"📋 시트명: {sheet_name}")
-                print(f"📝 기존 역발상 투자 데이터와 동일한 스프레드시트에 새 시트로 추가되었습니다.")
-            else:
-                print(f"❌ 구글 시트 업로드 실패")
-        else:
-            print(f"⚠️ 구글 시트 연결 실패로 인해 업로드를 건너뜁니다.")
-            print(f"💾 엑셀 파일로만 저장됨: {filename}")
+    if not stock_data:
+        print("\n수집된 데이터가 없습니다.")
+        return None, None
+
+    # 문자열로 모은 값을 한 번만 숫자 dtype으로 변환 (이후 단계는 변환 없이 계산)
+    df = coerce_stock_frame(fill_trading_amounts_df(pd.DataFrame(stock_data)))
+    filename = save_snapshot(df, excel=excel)
+    
+    print(f"\n🎉 수집 완료!")
+    print(f"총 {len(stock_data)}개 종목의 상세 데이터가 {filename}에 저장되었습니다.")
+    print(f"소요시간: {end_time - start_time}")
+    return df, filename
+
+
+def print_data_quality(df):
+    """수집 결과 품질·분포 출력"""
+    print(f"\n📊 데이터 품질:")
+    print(f"PER 데이터 있는 종목: {df['PER'].notna().sum()}/{len(df)}")
+    print(f"PBR 데이터 있는 종목: {df['PBR'].notna().sum()}/{len(df)}")
+    print(f"ROE 데이터 있는 종목: {df['ROE'].notna().sum()}/{len(df)}")
+    print(f"시가총액 데이터 있는 종목: {df['시가총액'].notna().sum()}/{len(df)}")
+    print(f"업종 데이터 있는 종목: {df['업종'].notna().sum()}/{len(df)}")
+    print(f"매출액 데이터 있는 종목: {df['매출액'].notna().sum()}/{len(df)}")
+    print(f"배당수익률 데이터 있는 종목: {df['배당수익률'].notna().sum()}/{len(df)}")
+    print(f"거래량증감율 데이터 있는 종목: {df['거래량증감율'].notna().sum()}/{len(df)}")
+    if '거래대금' in df.columns:
+        print(f"거래대금 데이터 있는 종목: {pd.to_numeric(df['거래대금'], errors='coerce').notna().sum()}/{len(df)}")
+    if '전일거래대금' in df.columns:
+        print(f"전일거래대금 데이터 있는 종목: {pd.to_numeric(df['전일거래대금'], errors='coerce').notna().sum()}/{len(df)}")
+    
+    # 시가총액별 분포 확인
+    market_cap = pd.to_numeric(df['시가총액'], errors='coerce')
+    print(f"\n📈 시가총액 분포:")
+    print(f"10조 이상 대형주: {(market_cap >= 100000).sum()}개")
+    print(f"1조~10조 중형주: {((market_cap >= 10000) & (market_cap < 100000)).sum()}개")
+    print(f"1조 미만 소형주: {(market_cap < 10000).sum()}개")
+    
+    # 거래량 증감율 통계
+    volume_stats = pd.to_numeric(df['거래량증감율'], errors='coerce').describe()
+    print(f"\n📊 거래량 증감율 통계:")
+    print(f"평균: {volume_stats['mean']:.2f}%")
+    print(f"중앙값: {volume_stats['50%']:.2f}%")
+    print(f"최대: {volume_stats['max']:.2f}%")
+    print(f"최소: {volume_stats['min']:.2f}%")
+    
+    # 업종별 분포 확인
+    print(f"\n🏢 업종별 분포 (상위 10개):")
+    sector_counts = df['업종'].value_counts().head(10)
+    for sector, count in sector_counts.items():
+        print(f"{sector}: {count}개")
+
+
+def upload_full_stock_data(df, filename, wait=True):
+    """
+    전체 종목 데이터를 오늘 스프레드시트(주식분석결과_YYYY-MM-DD)에 새 시트로 업로드.
+    wait=False면 업로드 대기열(sheets_outbox)에 넣기만 하고 바로 돌아옴 (daily_auto).
+    """
+    print(f"\n📤 구글 시트 업로드 시작...")
+    uploader = GoogleSheetsUploader()
+    
+    if not uploader.gc:
+        print(f"⚠️ 구글 시트 연결 실패로 인해 업로드를 건너뜁니다.")
+        print(f"💾 로컬 스냅샷으로만 저장됨: {filename}")
+        return False
+
+    # 기존 Stock Analyzer와 동일한 스프레드시트 사용
+    today = datetime.now().strftime('%Y-%m-%d')
+    spreadsheet_name = f"주식분석결과_{today}"
+    sheet_name = f"💾_전체종목데이터_{datetime.now().strftime('%H%M')}"
+    
+    success = uploader.upload_dataframe(df, spreadsheet_name, sheet_name, format_header=True, wait=wait)
+    if not wait:
+        return success
+
+    if success:
+        # 스프레드시트 URL 출력
+        url = uploader.get_spreadsheet_url(spreadsheet_name)
+        if url:
+            print(f"📊 구글 시트 링크: {url}")
             
+        print(f"✅ 구글 시트 업로드 완료!")
+        print(f"📋 시트명: {sheet_name}")
+        print(f"📝 기존 역발상 투자 데이터와 동일한 스프레드시트에 새 시트로 추가되었습니다.")
     else:
-        print("\n수집된 데이터가 없습니다.")
+        print(f"❌ 구글 시트 업로드 실패")
+    return success
+
+
+def main():
+    from async_stock_collector import DEFAULT_CONCURRENCY
+
+    parser = argparse.ArgumentParser(description="전체 종목 상세 데이터 수집")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='동시 요청 수 (기본: %(default)s)')
+    parser.add_argument('--rps', type=float, default=None,
+                        help='초당 최대 요청 수 (기본: .env NAVER_RPS, 없으면 10)')
+    parser.add_argument('--source', choices=('listing', 'pages'), default='listing',
+                        help='listing: 시가총액 목록 항목 선택으로 일괄 수집 (기본) / pages: 종목 페이지별 수집')
+    parser.add_argument('--no-details', action='store_true',
+                        help='listing 수집에서 종목 페이지 보충 생략 (업종·52주·기관비율·베타·부채비율 없음)')
+    parser.add_argument('--sequential', action='store_true',
+                        help='기존 순차 수집 사용 (3-4시간 소요)')
+    parser.add_argument('--resume', action='store_true',
+                        help='같은 거래일 수집 저널에 있는 종목은 건너뛰고 이어서 수집')
+    parser.add_argument('--excel', action='store_true',
+                        help='스냅샷(Parquet)과 함께 같은 이름의 엑셀 파일도 저장')
+    args = parser.parse_args()
+    if args.rps is not None:
+        set_limit('finance.naver.com', args.rps)
+
+    df, filename = collect_snapshot(
+        concurrency=args.concurrency, sequential=args.sequential,
+        resume=args.resume, excel=args.excel,
+        source=args.source, details=not args.no_details,
+    )
+    if df is not None:
+        print_data_quality(df)
+        upload_full_stock_data(df, filename)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,4 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
@@ -22,11 +22,10 @@ def is_regular_stock(name):
 
 def get_individual_stock_data(code, name):
     """개별 종목 페이지에서 PER, PBR, ROE 데이터 수집"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
     
     try:
         url = f'https://finance.naver.com/item/main.naver?code={code}'
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         per = ''
@@ -85,7 +84,6 @@ def get_individual_stock_data(code, name):
         return '', '', ''
 
 def get_stock_data():
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
     stock_data = []
     
     # 테스트를 위해 일단 첫 2페이지만 수집
@@ -96,7 +94,7 @@ def get_stock_data():
         for page in range(1, 3):  # 첫 2페이지만
             print(f"페이지 {page} 수집 중...")
             url = f'https://finance.naver.com/sise/sise_market_sum.naver?sosok={market_type}&page={page}'
-            response = requests.get(url, headers=headers)
+            response = http_client.get(url)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             rows = soup.select('table.type_2 tr')[1:]
@@ -129,7 +127,7 @@ def get_stock_data():
                     # 일별 시세 페이지에서 전일 데이터 가져오기
                     time.sleep(0.1)
                     daily_url = f'https://finance.naver.com/item/sise_day.naver?code={code}'
-                    daily_response = requests.get(daily_url, headers=headers)
+                    daily_response = http_client.get(daily_url)
                     daily_soup = BeautifulSoup(daily_response.text, 'html.parser')
                     
                     daily_rows = daily_soup.select('table.type2 tr')
@@ -0,0 +1,132 @@
+"""
+호스트별 토큰 버킷 요청 한도 (프로세스 간 공유).
+
+모든 크롤러는 요청 직전에 acquire(url)을 호출합니다. 버킷 상태(남은 토큰·갱신 시각)는
+호스트마다 .ratelimit/<host>.bucket 파일에 두고 OS 파일 잠금으로 갱신하므로,
+daily_auto_stock_analysis의 동시 단계(스레드)나 따로 띄운 스크립트가 함께 돌아도 합산 요청 속도가
+한도를 넘지 않습니다.
+
+한도 설정 (.env 또는 환경 변수):
+    NAVER_RPS=10      finance.naver.com 초당 요청 수 (0 이하이면 제한 없음)
+    NAVER_BURST=10    순간 최대 연속 요청 수
+    NAVER_FCHART_RPS / NAVER_FCHART_BURST   fchart.stock.naver.com (차트 데이터) 한도
+    RATE_LIMIT_DIR    버킷 파일 위치 (기본: 프로젝트/.ratelimit)
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+load_dotenv(PROJECT_ROOT / ".env")
+
+DEFAULT_RPS = 10.0
+DEFAULT_BURST = 10.0
+
+# 호스트 → (환경 변수 접두, 기본 초당 요청 수, 기본 버스트)
+HOST_DEFAULTS = {
+    "finance.naver.com": ("NAVER", DEFAULT_RPS, DEFAULT_BURST),
+    "fchart.stock.naver.com": ("NAVER_FCHART", DEFAULT_RPS, DEFAULT_BURST),
+}
+
+_overrides = {}
+_thread_lock = threading.Lock()
+
+
+def _state_dir() -> Path:
+    path = Path(os.getenv("RATE_LIMIT_DIR", "") or PROJECT_ROOT / ".ratelimit")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def host_of(url: str) -> str:
+    """URL(또는 호스트 이름)에서 버킷 키로 쓸 호스트 추출."""
+    if "://" not in url:
+        return url.lower()
+    return (urlsplit(url).hostname or "").lower()
+
+
+def get_limit(host: str) -> tuple[float, float]:
+    """호스트의 (초당 요청 수, 버스트). set_limit > 환경 변수 > 기본값 순."""
+    if host in _overrides:
+        return _overrides[host]
+    prefix, rps, burst = HOST_DEFAULTS.get(host, ("RATE_LIMIT", DEFAULT_RPS, DEFAULT_BURST))
+    rps = float(os.getenv(f"{prefix}_RPS", rps))
+    burst = float(os.getenv(f"{prefix}_BURST", burst))
+    return rps, max(1.0, burst)
+
+
+def set_limit(host: str, rps: float, burst: float | None = None) -> None:
+    """이 프로세스에서 사용할 호스트 한도 지정 (CLI --rps 등)."""
+    host = host_of(host)
+    _, default_burst = get_limit(host)
+    _overrides[host] = (float(rps), max(1.0, float(burst if burst is not None else default_burst)))
+
+
+@contextmanager
+def _locked(path: Path):
+    """버킷 파일을 열고 프로세스 간 배타 잠금."""
+    with _thread_lock, open(path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield fh
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield fh
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def reserve(url: str) -> float:
+    """
+    토큰 1개를 예약하고 요청 전에 기다려야 할 시간(초)을 반환.
+    토큰이 모자라면 음수로 빌려 쓰므로, 대기열 순서대로 1/rps 간격이 보장됨.
+    """
+    host = host_of(url)
+    rps, burst = get_limit(host)
+    if rps <= 0:
+        return 0.0
+
+    with _locked(_state_dir() / f"{host}.bucket") as fh:
+        fh.seek(0)
+        raw = fh.read().decode("ascii", errors="ignore").split()
+        now = time.time()
+        try:
+            tokens, updated = float(raw[0]), float(raw[1])
+        except (IndexError, ValueError):
+            tokens, updated = burst, now
+
+        tokens = min(burst, tokens + max(0.0, now - updated) * rps) - 1.0
+        fh.seek(0)
+        fh.truncate()
+        fh.write(f"{tokens:.6f} {now:.6f}".encode("ascii"))
+        fh.flush()
+
+    return -tokens / rps if tokens < 0 else 0.0
+
+
+def acquire(url: str) -> None:
+    """요청 한도 안에 들어올 때까지 대기 (동기 크롤러용)."""
+    delay = reserve(url)
+    if delay > 0:
+        time.sleep(delay)
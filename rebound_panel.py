@@ -0,0 +1,335 @@
+"""
+리바운드 전략 패널 계산 (전 종목 일봉을 한 번에).
+
+ReboundAnalyzer.analyze_volume_drop / analyze_ma45 / analyze_ma360은 종목마다 DataFrame을 만들고
+iloc 루프로 신호를 찾습니다. 여기서는 전 종목의 시가·고가·종가·거래량을 (종목 × 봉) 배열로 맞춰 놓고
+세 전략을 배열 연산으로 한 번에 계산합니다. 결과 dict는 종목별 분석과 같습니다.
+
+    build_panel(bars, states=None)          종목코드 열이 있는 일봉 표(ohlcv_store.load_frame) → ReboundPanel
+    evaluate(panel, stocks, strategies)     {'volume_drop': [...], 'ma45': [...], 'ma360': [...]}
+
+- 종목마다 마지막 봉을 배열 오른쪽 끝에 맞춥니다 (이력이 짧은 종목은 왼쪽이 NaN).
+  거래정지 등으로 날짜가 빠진 종목도 종목별 분석의 tail(n)과 같은 봉을 봅니다.
+- 이동평균은 종목별로 이어 붙인 봉에 pandas rolling을 한 번(종목 경계에서 창이 새로 시작),
+  구간 평균은 종목 행(연속 메모리)마다 합을 구해 종목별 rolling·mean과 같은 순서로 더하므로
+  소수점 끝자리까지 같은 값이 나옵니다.
+- 이동평균 상태(ma_state.refresh)를 주면 이동평균과 봉 수를 상태에서 가져오므로 최근 WINDOW개 봉만 읽으면 됩니다.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume']
+STRATEGIES = ('volume_drop', 'ma45', 'ma360')
+
+# 종목별 분석과 같은 최소 봉 수
+MIN_BARS = {'volume_drop': 3, 'ma45': 60, 'ma360': 380}
+# 전략이 보는 최근 봉 수 (45일선·360일선 전략의 tail(60))
+WINDOW = 60
+
+
+def _code_key(code) -> str:
+    return str(code).replace('.0', '').zfill(6)
+
+
+class ReboundPanel:
+    """
+    종목 × 봉 배열 묶음. 각 행은 한 종목, 마지막 열이 그 종목의 가장 최근 봉.
+    history는 종목별 전체 봉 수 (최소 봉 수 조건용, 이동평균 상태가 없으면 읽은 봉 수와 같음).
+    """
+
+    def __init__(self, codes, dates, bars: dict, lengths, history=None):
+        self.codes = list(codes)
+        self.rows = {code: i for i, code in enumerate(self.codes)}
+        self.dates = dates
+        self.lengths = lengths
+        self.history = lengths if history is None else history
+        self.open = bars['open']
+        self.high = bars['high']
+        self.low = bars['low']
+        self.close = bars['close']
+        self.volume = bars['volume']
+        # get_historical_data와 같은 파생 지표
+        self.ma45 = bars['ma45']
+        self.ma360 = bars['ma360']
+        # 마지막 봉의 5일선 (상태가 없으면 volume_drop_signals에서 최근 5봉 평균)
+        self.ma5 = bars.get('ma5')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.price_change = ((self.close - self.open) / self.open) * 100
+
+    def __len__(self):
+        return len(self.codes)
+
+    def date(self, row: int, col: int) -> str:
+        return pd.Timestamp(self.dates[row, col]).strftime('%Y-%m-%d')
+
+
+def build_panel(bars: pd.DataFrame, states: dict | None = None) -> ReboundPanel:
+    """
+    code·date·open·high·low·close·volume 표(ohlcv_store.load_frame) → 패널.
+    종목 순서는 표에 처음 나온 순서, 각 종목의 봉은 날짜순으로 오른쪽 끝에 맞춤.
+    states({종목코드: ma_state.MovingAverageState})를 주면 이동평균을 rolling 대신 상태에서 가져옴
+    (표는 종목별 최근 ma_state.KEEP개 이하 봉, 상태의 마지막 날짜가 다른 종목은 이동평균 없음).
+    """
+    row_of, names = pd.factorize(bars['code'].to_numpy(), sort=False)
+    dates = bars['date'].to_numpy(dtype='datetime64[ns]')
+    order = slice(None)
+    # 종목별로 모여 있고 날짜 오름차순이면(load_frame) 정렬 생략
+    first_bar = np.r_[True, row_of[1:] != row_of[:-1]]
+    if first_bar.sum() != len(names) or not (np.r_[True, dates[1:] > dates[:-1]] | first_bar).all():
+        order = np.lexsort((dates, row_of))
+        row_of, dates = row_of[order], dates[order]
+    lengths = np.bincount(row_of, minlength=len(names)).astype('int64')
+    width = int(lengths.max()) if len(names) else 0
+
+    # 종목 안에서의 순서 → 열 (마지막 봉이 width-1)
+    offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+    columns = width - lengths[row_of] + (np.arange(len(row_of)) - offsets[row_of])
+
+    flat = {field: bars[field].to_numpy(dtype='float64', na_value=np.nan)[order] for field in FIELDS}
+    if states is None:
+        flat['ma45'] = _rolling_mean(flat['close'], offsets[row_of], 45)
+        flat['ma360'] = _rolling_mean(flat['close'], offsets[row_of], 360)
+
+    values = {}
+    for field, column_values in flat.items():
+        values[field] = np.full((len(names), width), np.nan)
+        values[field][row_of, columns] = column_values
+    panel_dates = np.full((len(names), width), np.datetime64('NaT'), dtype='datetime64[ns]')
+    panel_dates[row_of, columns] = dates
+    codes = [_code_key(code) for code in names]
+    if states is None:
+        return ReboundPanel(codes, panel_dates, values, lengths)
+
+    history = lengths.copy()
+    values['ma5'] = np.full(len(codes), np.nan)
+    values['ma45'] = np.full((len(codes), width), np.nan)
+    values['ma360'] = np.full((len(codes), width), np.nan)
+    last_dates = pd.DatetimeIndex(panel_dates[:, -1]).strftime('%Y-%m-%d') if width else []
+    for row, code in enumerate(codes):
+        state = states.get(code)
+        if state is None or state.last_date != last_dates[row]:
+            continue
+        history[row] = state.bars
+        values['ma5'][row] = state.average(5)
+        values['ma45'][row] = state.series(45, width)
+        values['ma360'][row] = state.series(360, width)
+    return ReboundPanel(codes, panel_dates, values, lengths, history)
+
+
+class _PerStockWindow(BaseIndexer):
+    """종목별로 이어 붙인 봉에서 창이 앞 종목으로 넘어가지 않는 고정 길이 창."""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype='int64')
+        start = np.maximum(self.group_start, end - self.window_size)
+        return start, end
+
+
+def _rolling_mean(values: np.ndarray, group_start: np.ndarray, window: int) -> np.ndarray:
+    """
+    종목별 close.rolling(window).mean()과 같은 값 (종목별로 이어 붙인 1차원 배열 기준).
+    종목 경계에서 창이 새로 시작하므로 pandas가 종목마다 계산한 것과 같은 순서로 더함.
+    """
+    indexer = _PerStockWindow(window_size=window, group_start=group_start)
+    return pd.Series(values).rolling(indexer, min_periods=window).mean().to_numpy()
+
+
+def _mean(window: np.ndarray) -> np.ndarray:
+    """행별 평균 (NaN 제외, 전부 NaN이면 NaN) — Series.mean()과 같은 순서로 합산."""
+    missing = np.isnan(window)
+    total = np.where(missing, 0.0, window).sum(axis=1)
+    count = window.shape[1] - missing.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return total / count
+
+
+def _distance(close: np.ndarray, ma: np.ndarray) -> np.ndarray:
+    """이동평균 대비 이격도(%)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ((close - ma) / ma) * 100
+
+
+def volume_drop_signals(panel: ReboundPanel) -> dict:
+    """거래량 급감 전략 (analyze_volume_drop) → {행: (신호 강도, 값 dict)}"""
+    if not len(panel):
+        return {}
+    volume = panel.volume
+    with np.errstate(divide='ignore', invalid='ignore'):
+        surge_ratio = volume[:, -2] / volume[:, -3]
+        drop_ratio = volume[:, -1] / volume[:, -2]
+        if panel.ma5 is not None:
+            ma5 = panel.ma5
+        elif panel.close.shape[1] >= 5:
+            ma5 = _mean(panel.close[:, -5:])
+        else:
+            ma5 = np.full(len(panel), np.nan)
+        gap_from_ma5 = np.abs((panel.close[:, -1] - ma5) / ma5) * 100
+    close_to_ma5 = np.where(panel.history >= 5, gap_from_ma5 <= 10, True)
+
+    volume_surge = surge_ratio >= 5.0
+    red_candle = panel.price_change[:, -1] <= -1.0
+    basic = volume_surge & (drop_ratio <= 0.20) & red_candle
+    strong = volume_surge & (drop_ratio <= 0.12) & red_candle & close_to_ma5
+
+    signals = {}
+    for row in np.flatnonzero((panel.history >= MIN_BARS['volume_drop']) & basic).tolist():
+        signals[row] = ("강함" if strong[row] else "보통", {
+            'current_price': panel.close[row, -1],
+            'volume_surge_ratio': surge_ratio[row],
+            'volume_drop_ratio': drop_ratio[row],
+            'price_change': panel.price_change[row, -1],
+            'buy_point': panel.high[row, -1],  # 음봉 고점 돌파 시 매수
+            'analysis_date': panel.date(row, -1),
+        })
+    return signals
+
+
+def ma45_signals(panel: ReboundPanel, window: int = WINDOW) -> dict:
+    """45일선 전략 (analyze_ma45) → {행: 값 dict}"""
+    if panel.close.shape[1] < window:
+        return {}
+    close = panel.close[:, -window:]
+    high = panel.high[:, -window:]
+    volume = panel.volume[:, -window:]
+    ma45 = panel.ma45[:, -window:]
+    rows = np.arange(len(panel))
+    positions = np.arange(window)
+
+    # 조건 1: 최근 window일 중 20% 이상 급등한 가장 최근 날
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_change = ((close[:, 1:] - close[:, :-1]) / close[:, :-1]) * 100
+    surged = daily_change >= 20
+    last_surge = window - 1 - np.argmax(surged[:, ::-1], axis=1)
+    # 조건 2 이후의 창(post_surge_data)이 5봉 이상
+    eligible = (panel.history >= MIN_BARS['ma45']) & surged.any(axis=1) & (window - last_surge >= 5)
+    last_surge = np.where(eligible, last_surge, 0)
+    after_surge = positions >= last_surge[:, None]
+
+    # 조건 2: 급등 이후 최고가 대비 5% 이상 하락
+    peak = np.where(after_surge & ~np.isnan(high), high, -np.inf).max(axis=1)
+    peak[np.isneginf(peak)] = np.nan
+    current = close[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        decline_from_peak = ((current - peak) / peak) * 100
+    downtrend = decline_from_peak <= -5
+
+    # 조건 3: 급등 직후 5일 평균 대비 최근 5일 평균 거래량 30% 이상 감소
+    recent_avg_volume = _mean(volume[:, -5:])
+    surge_window = np.take_along_axis(volume, last_surge[:, None] + np.arange(5), axis=1)
+    surge_avg_volume = _mean(surge_window)
+    volume_decreased = recent_avg_volume < surge_avg_volume * 0.7
+
+    # 조건 4: 급등 이후 처음으로 45일선 ±2% 도달 (마지막 봉 이전에 닿은 적 없음)
+    distance = _distance(close, ma45)
+    touching = ~np.isnan(ma45) & (-2 <= distance) & (distance <= 2)
+    touched_before = (touching & after_surge & (positions < window - 1)).any(axis=1)
+    first_touch = touching[:, -1] & ~touched_before
+
+    hits = eligible & downtrend & volume_decreased & first_touch
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = recent_avg_volume / surge_avg_volume
+
+    signals = {}
+    for row in rows[hits].tolist():
+        surge_at = last_surge[row]
+        signals[row] = {
+            'current_price': current[row],
+            'ma45_price': ma45[row, -1],
+            'surge_date': panel.date(row, panel.close.shape[1] - window + surge_at),
+            'surge_price': close[row, surge_at],
+            'decline_from_peak': decline_from_peak[row],
+            'volume_decrease_ratio': volume_ratio[row],
+            'ma45_distance': distance[row, -1],
+            'analysis_date': panel.date(row, -1),
+        }
+    return signals
+
+
+def ma360_signals(panel: ReboundPanel, window: int = WINDOW, slope_days: int = 20) -> dict:
+    """360일선 전략 (analyze_ma360) → {행: (신호 강도, 값 dict)}"""
+    if panel.close.shape[1] < window or not (panel.history >= MIN_BARS['ma360']).any():
+        return {}
+    width = panel.close.shape[1]
+    current = panel.close[:, -1]
+    current_ma = panel.ma360[:, -1]
+
+    # 조건 1: 최근 slope_days일 360일선 기울기 (값이 있는 첫·마지막 봉 기준)
+    recent_ma = panel.ma360[:, -slope_days:]
+    present = ~np.isnan(recent_ma)
+    count = present.sum(axis=1)
+    rows = np.arange(len(panel))
+    first_ma = recent_ma[rows, np.argmax(present, axis=1)]
+    last_ma = recent_ma[rows, slope_days - 1 - np.argmax(present[:, ::-1], axis=1)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ma360_slope = (last_ma - first_ma) / count
+    upward_trend = ma360_slope > 0
+
+    # 조건 2: 최근 window일(마지막 10봉 제외) 중 첫 -10% 이탈, 그 이후 -3% 이내 회복
+    close = panel.close[:, -window:]
+    ma = panel.ma360[:, -window:]
+    distance = _distance(close, ma)
+    with_ma = ~np.isnan(ma)
+    broke = with_ma & (distance <= -10)
+    broke[:, window - 10:] = False
+    breakthrough_found = broke.any(axis=1)
+    broke_at = np.argmax(broke, axis=1)
+    positions = np.arange(window)
+    recovered = with_ma & (distance >= -3) & (positions > broke_at[:, None])
+    recovery_started = recovered.any(axis=1)
+
+    # 조건 3: 현재 360일선 -5% ~ +3%
+    current_distance = _distance(current, current_ma)
+    near_support = (-5 <= current_distance) & (current_distance <= 3)
+
+    # 조건 4: 최근 5일 평균 거래량이 그 전 15일 평균보다 20% 이상 많으면 강한 신호
+    recent_volume = _mean(panel.volume[:, -5:])
+    past_volume = _mean(panel.volume[:, -slope_days:-5])
+    volume_support = recent_volume > past_volume * 1.2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = recent_volume / past_volume
+
+    hits = ((panel.history >= MIN_BARS['ma360']) & ~np.isnan(current_ma) & (count >= 10)
+            & upward_trend & breakthrough_found & recovery_started & near_support)
+
+    signals = {}
+    for row in rows[hits].tolist():
+        signals[row] = ("강함" if volume_support[row] else "보통", {
+            'current_price': current[row],
+            'ma360_price': current_ma[row],
+            'ma360_slope': ma360_slope[row],
+            'breakthrough_date': panel.date(row, width - window + broke_at[row]),
+            'current_distance': current_distance[row],
+            'volume_support_ratio': volume_ratio[row],
+            'analysis_date': panel.date(row, -1),
+        })
+    return signals
+
+
+def evaluate(panel: ReboundPanel, stocks, strategies=None) -> dict:
+    """
+    stocks(종목코드·종목명 dict 목록) 순서대로 전략별 결과 목록.
+    패널에 없는(일봉이 없는) 종목은 건너뜀 — 종목마다 analyze_stock을 부른 것과 같은 결과.
+    """
+    run = set(strategies or STRATEGIES)
+    results = {key: [] for key in STRATEGIES}
+    volume_drop = volume_drop_signals(panel) if 'volume_drop' in run else {}
+    ma45 = ma45_signals(panel) if 'ma45' in run else {}
+    ma360 = ma360_signals(panel) if 'ma360' in run else {}
+
+    for stock in stocks:
+        row = panel.rows.get(_code_key(stock.get('종목코드', '')))
+        if row is None:
+            continue
+        head = {'code': stock.get('종목코드', ''), 'name': stock.get('종목명', '')}
+        if row in volume_drop:
+            strength, values = volume_drop[row]
+            results['volume_drop'].append(
+                {**head, 'strategy': '거래량급감', 'signal_strength': strength, **values})
+        if row in ma45:
+            results['ma45'].append({**head, 'strategy': '45일선', **ma45[row]})
+        if row in ma360:
+            strength, values = ma360[row]
+            results['ma360'].append(
+                {**head, 'strategy': '360일선', 'signal_strength': strength, **values})
+    return results
@@ -1,15 +1,12 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
-import time
+
+import ma_state
+import ohlcv_store
+import rebound_panel
 
 class ReboundAnalyzer:
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
         self.results = {
             'volume_drop': [],  # 거래량 급감 전략
             'ma45': [],         # 45일선 전략
@@ -17,71 +14,28 @@ class ReboundAnalyzer:
         }
     
     def get_historical_data(self, code, days=400):
-        """종목의 과거 데이터를 가져오는 함수"""
-        url = f"https://finance.naver.com/item/sise_day.naver?code={code}&page=1"
-        
+        """종목의 과거 데이터를 가져오는 함수 (일봉 저장소 증분 갱신 후 최근 days개)"""
         try:
-            # 첫 페이지로 총 페이지 수 계산
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 페이지 네비게이션에서 마지막 페이지 찾기
-            last_page_elem = soup.select_one('table.Nnavi td.pgRR a')
-            if last_page_elem:
-                last_page = int(last_page_elem['href'].split('page=')[1])
-            else:
-                last_page = 10  # 기본값
-            
-            # 필요한 페이지 수 계산 (1페이지당 10일치 데이터)
-            required_pages = min((days // 10) + 1, last_page)
-            
-            data = []
-            for page in range(1, required_pages + 1):
-                page_url = f"https://finance.naver.com/item/sise_day.naver?code={code}&page={page}"
-                response = requests.get(page_url, headers=self.headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                rows = soup.select('table.type2 tr[onmouseover]')
-                for row in rows:
-                    cols = row.select('td span')
-                    if len(cols) >= 7:
-                        try:
-                            date = cols[0].text.strip()
-                            close = float(cols[1].text.strip().replace(',', ''))
-                            open_price = float(cols[2].text.strip().replace(',', ''))
-                            high = float(cols[3].text.strip().replace(',', ''))
-                            low = float(cols[4].text.strip().replace(',', ''))
-                            volume = int(cols[5].text.strip().replace(',', ''))
-                            
-                            data.append({
-                                'date': datetime.strptime(date, '%Y.%m.%d'),
-                                'open': open_price,
-                                'high': high,
-                                'low': low,
-                                'close': close,
-                                'volume': volume
-                            })
-                        except:
-                            continue
-                
-                time.sleep(0.1)  # 서버 부하 방지
-            
-            df = pd.DataFrame(data)
-            if not df.empty:
-                df = df.sort_values('date').reset_index(drop=True)
-                # 이동평균선 계산
-                df['MA45'] = df['close'].rolling(window=45).mean()
-                df['MA360'] = df['close'].rolling(window=360).mean()
-                # 일일 변화율 계산
-                df['price_change'] = ((df['close'] - df['open']) / df['open']) * 100
-                df['volume_change'] = df['volume'].pct_change() * 100
-            
-            return df
+            df = ohlcv_store.get_history(code, lookback=days)
+            return self.add_indicators(df)
             
         except Exception as e:
             print(f"과거 데이터 수집 중 오류 발생 ({code}): {str(e)}")
             return None
 
+    @staticmethod
+    def add_indicators(df):
+        """일봉에 이동평균선·일일 변화율 추가 (날짜 오름차순 정렬)"""
+        if not df.empty:
+            df = df.sort_values('date').reset_index(drop=True)
+            # 이동평균선 계산
+            df['MA45'] = df['close'].rolling(window=45).mean()
+            df['MA360'] = df['close'].rolling(window=360).mean()
+            # 일일 변화율 계산
+            df['price_change'] = ((df['close'] - df['open']) / df['open']) * 100
+            df['volume_change'] = df['volume'].pct_change() * 100
+        return df
+
     def analyze_volume_drop(self, stock_data, historical_data):
         """거래량 급감 전략 분석
         핵심 조건:
@@ -365,6 +319,40 @@ class ReboundAnalyzer:
         except Exception as e:
             print(f"종목 분석 중 오류 발생 ({stock_data.get('종목명', 'Unknown')}): {str(e)}")
 
+    def update_bars(self, codes, days=400, progress_every=50):
+        """일봉 저장소를 종목별로 갱신 (처음 보는 종목만 days일치 일괄 조회) → 갱신에 성공한 종목코드 목록"""
+        updated = []
+        total = len(codes)
+        for i, code in enumerate(codes, start=1):
+            if progress_every and i % progress_every == 0:
+                print(f"   ... 일봉 갱신 {i}/{total}")
+            try:
+                ohlcv_store.update(code, lookback=days)
+                updated.append(code)
+            except Exception as e:
+                print(f"과거 데이터 수집 중 오류 발생 ({code}): {str(e)}")
+        return updated
+
+    def analyze_universe(self, stock_list, strategies=None, bars=None, states=None):
+        """
+        전 종목 리바운드 분석 (패널 모드, rebound_panel).
+        일봉 저장소를 갱신하고 이동평균 상태(ma_state)에 새 봉을 반영한 뒤,
+        최근 60봉만 (종목 × 봉) 배열로 맞춰 전략별 신호를 배열 연산으로 계산.
+        결과는 종목마다 analyze_stock을 부른 것과 같음.
+        bars(ohlcv_store.load_frame과 같은 일봉 표)를 주면 일봉 갱신·조회를 생략
+        (states를 함께 주지 않으면 이동평균은 bars에서 rolling으로 계산).
+        """
+        stocks = [s for s in stock_list if s.get('종목코드', '')]
+        if bars is None:
+            updated = self.update_bars([s['종목코드'] for s in stocks], days=400)
+            states = ma_state.refresh(updated)
+            bars = ohlcv_store.load_frame(updated, lookback=rebound_panel.WINDOW)
+        panel = rebound_panel.build_panel(bars, states=states)
+        found = rebound_panel.evaluate(panel, stocks, strategies=strategies)
+        for key, rows in found.items():
+            self.results[key].extend(rows)
+        return found
+
     def get_results(self):
         """분석 결과 반환"""
         return self.results 
\ No newline at end of file
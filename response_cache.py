@@ -0,0 +1,205 @@
+"""
+네이버 금융 HTML 응답 디스크 캐시.
+
+같은 페이지(예: sise_day page=1)를 quick_stock_check·ma20_breakout_screener·
+rebound_strategies_analyzer가 한 실행 안에서 여러 번 받으므로, 정규화한 URL을 키로
+응답 본문을 저장해 두고 유효 기간 안이면 네트워크 없이 돌려줍니다.
+
+저장 구조 (HTTP_CACHE_DIR, 기본: 프로젝트/.http_cache):
+    index.sqlite       URL 키 → 본문 해시·페이지 종류·받은 시각·만료 시각
+    blobs/ab/abcd...   본문(UTF-8) zlib 압축, 파일 이름은 본문 sha256 (같은 본문은 한 번만 저장)
+
+페이지 종류별 유효 기간:
+    sise_day page=1, main, frgn, sise_market_sum, fchart 일봉
+        장중: HTTP_CACHE_INTRADAY_TTL초 (기본 600)
+        장 마감 정리 후: 다음 정규장 시작까지 (주말·휴장일 포함)
+    sise_day page>=2
+        다음 정규장 시작까지. 최신 순 페이지라 새 거래일이 열리면 행이 한 칸씩 밀림
+    coinfo (재무 요약)
+        HTTP_CACHE_FINANCE_DAYS일 (기본 90, 분기 실적 주기)
+    그 밖의 URL은 캐시하지 않음
+
+HTTP_CACHE=0 이면 캐시를 쓰지 않습니다.
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+load_dotenv(PROJECT_ROOT / ".env")
+
+INTRADAY_TTL_SEC = int(os.getenv("HTTP_CACHE_INTRADAY_TTL", "600"))
+FINANCE_TTL_DAYS = int(os.getenv("HTTP_CACHE_FINANCE_DAYS", "90"))
+# 정규장 마감 후 네이버 시세가 확정될 때까지 장중으로 취급하는 시간
+SETTLE_MINUTES = 30
+
+_local = threading.local()
+
+
+def enabled() -> bool:
+    return os.getenv("HTTP_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+def cache_dir() -> Path:
+    return Path(os.getenv("HTTP_CACHE_DIR", "") or PROJECT_ROOT / ".http_cache")
+
+
+def normalize_url(url: str) -> str:
+    """스킴·호스트 소문자, 쿼리 파라미터 정렬, fragment 제거."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def page_type(url: str) -> str | None:
+    """캐시 정책을 고를 페이지 종류. 캐시 대상이 아니면 None."""
+    parts = urlsplit(url)
+    name = parts.path.rsplit("/", 1)[-1].split(".")[0]
+    if parts.hostname == "fchart.stock.naver.com":
+        return "fchart" if name == "sise" else None
+    if name == "sise_day":
+        page = dict(parse_qsl(parts.query)).get("page", "1")
+        return "sise_day" if page in ("", "1") else "sise_day_old"
+    if name in ("main", "frgn", "sise_market_sum", "coinfo"):
+        return name
+    return None
+
+
+def expires_at(kind: str, fetched: datetime) -> datetime:
+    """받은 시각(UTC) 기준 만료 시각(UTC)."""
+    if kind == "coinfo":
+        return fetched + timedelta(days=FINANCE_TTL_DAYS)
+
+    from market_calendar import is_krx_market_open, next_krx_session_open
+
+    # 장중이거나 마감 뒤 SETTLE_MINUTES 안이면 짧게 (개장 직후는 앞의 조건으로)
+    intraday = is_krx_market_open(fetched) or is_krx_market_open(fetched - timedelta(minutes=SETTLE_MINUTES))
+    if kind != "sise_day_old" and intraday:
+        return fetched + timedelta(seconds=INTRADAY_TTL_SEC)
+    return next_krx_session_open(fetched)
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    root = cache_dir()
+    if conn is None or getattr(_local, "root", None) != root:
+        (root / "blobs").mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(root / "index.sqlite", timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, url TEXT NOT NULL, kind TEXT NOT NULL,"
+            " digest TEXT NOT NULL, size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        _local.conn, _local.root = conn, root
+    return conn
+
+
+def _blob_path(digest: str) -> Path:
+    return cache_dir() / "blobs" / digest[:2] / digest
+
+
+def get(url: str, now: datetime | None = None) -> str | None:
+    """유효한 캐시 본문이 있으면 반환, 없거나 만료되었으면 None."""
+    if not enabled() or page_type(url) is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    row = _connect().execute(
+        "SELECT digest, expires_at FROM responses WHERE key = ?", (url_key(url),)
+    ).fetchone()
+    if row is None or row[1] <= now.timestamp():
+        return None
+    try:
+        return zlib.decompress(_blob_path(row[0]).read_bytes()).decode("utf-8")
+    except (OSError, zlib.error):
+        return None
+
+
+def put(url: str, text: str, now: datetime | None = None) -> None:
+    """본문 저장 (캐시 대상 페이지만)."""
+    kind = page_type(url)
+    if not enabled() or kind is None:
+        return
+    now = now or datetime.now(timezone.utc)
+    body = text.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+
+    path = _blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(zlib.compress(body, 6))
+        os.replace(tmp, path)
+
+    conn = _connect()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url_key(url), normalize_url(url), kind, digest, len(body),
+             now.timestamp(), expires_at(kind, now).timestamp()),
+        )
+
+
+def purge(now: datetime | None = None) -> tuple[int, int]:
+    """만료 항목과 참조 없는 본문 파일 삭제. (삭제한 항목 수, 파일 수) 반환."""
+    now = now or datetime.now(timezone.utc)
+    conn = _connect()
+    with conn:
+        removed = conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ?", (now.timestamp(),)
+        ).rowcount
+    live = {row[0] for row in conn.execute("SELECT DISTINCT digest FROM responses")}
+    files = 0
+    for path in (cache_dir() / "blobs").glob("*/*"):
+        if path.name not in live:
+            path.unlink(missing_ok=True)
+            files += 1
+    return removed, files
+
+
+def stats() -> dict:
+    conn = _connect()
+    now = datetime.now(timezone.utc).timestamp()
+    by_kind = conn.execute(
+        "SELECT kind, COUNT(*), SUM(expires_at > ?) FROM responses GROUP BY kind", (now,)
+    ).fetchall()
+    disk = sum(p.stat().st_size for p in (cache_dir() / "blobs").glob("*/*"))
+    return {
+        "kinds": {kind: (total, valid or 0) for kind, total, valid in by_kind},
+        "disk_bytes": disk,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네이버 금융 응답 캐시 관리")
+    parser.add_argument("command", choices=["stats", "purge"])
+    args = parser.parse_args()
+
+    if args.command == "purge":
+        removed, files = purge()
+        print(f"[OK] 만료 항목 {removed}개, 본문 파일 {files}개 삭제")
+        return
+
+    info = stats()
+    print(f"캐시 위치: {cache_dir()}")
+    for kind, (total, valid) in sorted(info["kinds"].items()):
+        print(f"  - {kind}: {total}개 (유효 {valid}개)")
+    print(f"  - 디스크: {info['disk_bytes'] / 1024 / 1024:.1f} MB (압축)")
+
+
+if __name__ == "__main__":
+    main()
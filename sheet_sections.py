@@ -0,0 +1,93 @@
+"""
+구글 시트 날짜 탭의 섹션 위치 색인 (섹션 단위 부분 갱신).
+
+날짜 탭은 '--- 제목 ---' 행으로 시작하는 섹션이 이어진 형태입니다. 섹션 하나를 바꿀 때 탭 전체
+(최대 8000×40칸)를 읽고 다시 쓰는 대신, 섹션마다 시작 행·행 수·열 수를 로컬에 기록해 두고
+바뀐 섹션의 범위만 다시 씁니다 (GoogleSheetsUploader.append_sections_to_tab).
+
+    index = SectionIndex()                          SHEET_SECTION_INDEX (기본: 프로젝트/.sheet_sections/index.json)
+    index.get(spreadsheet_id, tab, sheet_id)        저장된 섹션 목록 (없거나 탭이 다시 만들어졌으면 None)
+    index.put(spreadsheet_id, tab, sheet_id, sections)
+    layout(blocks, start=1)                         [(제목, 행 목록)] → 이어 붙였을 때의 섹션 목록
+    sections_from_column(values)                    A열 값으로 섹션 목록 복원 (색인이 없거나 맞지 않을 때)
+
+섹션: {'title': 제목, 'start': 시작 행(1부터), 'rows': 행 수(뒤 빈 행 포함), 'cols': 열 수(모르면 None)}
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# _section_rows가 섹션 뒤에 붙이는 빈 행 수
+TRAILING_BLANK_ROWS = 2
+
+
+def index_path() -> Path:
+    return Path(os.getenv('SHEET_SECTION_INDEX', '') or PROJECT_ROOT / '.sheet_sections' / 'index.json')
+
+
+def is_section_title(value) -> bool:
+    text = str(value or '')
+    return len(text) > 6 and text.startswith('---') and text.endswith('---')
+
+
+def layout(blocks, start: int = 1) -> list[dict]:
+    """[(제목, 행 목록)]을 start 행부터 이어 붙였을 때 섹션 목록"""
+    sections = []
+    for title, rows in blocks:
+        sections.append({
+            'title': title,
+            'start': start,
+            'rows': len(rows),
+            'cols': max((len(row) for row in rows), default=0),
+        })
+        start += len(rows)
+    return sections
+
+
+def sections_from_column(values) -> list[dict]:
+    """A열 값(1행부터)에서 섹션 제목 행을 찾아 섹션 목록 복원. 열 수는 알 수 없으므로 None."""
+    starts = [i + 1 for i, value in enumerate(values) if is_section_title(value)]
+    sections = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(values) + 1 + TRAILING_BLANK_ROWS
+        sections.append({'title': values[start - 1], 'start': start, 'rows': end - start, 'cols': None})
+    return sections
+
+
+def end_row(sections) -> int:
+    """섹션이 차지하는 마지막 행 (없으면 0)"""
+    return max((s['start'] + s['rows'] - 1 for s in sections), default=0)
+
+
+class SectionIndex:
+    """스프레드시트·탭별 섹션 목록 (JSON 파일 하나, 프로세스 안에서는 잠금으로 공유)"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else index_path()
+
+    def _read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get(self, spreadsheet_id: str, tab: str, sheet_id) -> list[dict] | None:
+        with self._lock:
+            entry = self._read().get(spreadsheet_id or '', {}).get(tab)
+        if not entry or entry.get('sheet_id') != sheet_id:
+            return None
+        return [dict(section) for section in entry['sections']]
+
+    def put(self, spreadsheet_id: str, tab: str, sheet_id, sections) -> None:
+        with self._lock:
+            data = self._read()
+            data.setdefault(spreadsheet_id or '', {})[tab] = {'sheet_id': sheet_id, 'sections': list(sections)}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+            os.replace(tmp, self.path)
@@ -0,0 +1,154 @@
+"""
+여러 탭 업로드를 한 번에 (구글 시트 API 왕복 최소화).
+
+탭마다 시트 생성(batchUpdate)·값 쓰기(values.update)를 따로 보내던 것을 모아서
+    1. spreadsheets.batchUpdate  한 번: 없는 탭 추가(addSheet), 작은 탭 행·열 늘리기, 다시 쓸 탭 값 지우기
+    2. values.batchUpdate        한 번: 모든 탭의 값
+로 보냅니다. 탭 목록은 스프레드시트 메타데이터를 한 번 읽어 알아 두고, 같은 batch로 다시 flush하면 다시 읽지 않습니다.
+
+    batch = SheetsBatch(uploader)
+    batch.put_tab('2026-05-22', rows, sections=layout(...))     탭 전체를 rows로 (sections: 섹션 색인 기록)
+    batch.put_tab('2026-05-22_전체', rows, raw=True)            문자열을 입력 해석 없이 (종목코드 앞 0 유지)
+    batch.flush() → True/False
+    batch.send() → 쓴 칸 수 (실패하면 예외, sheets_outbox 전송 스레드가 재시도)
+
+값은 한 번의 values.batchUpdate로 보내기 위해 모두 USER_ENTERED로 쓰고, raw=True 탭의 문자열은
+앞에 '를 붙여 RAW와 같이 글자 그대로 저장되게 합니다.
+"""
+import numpy as np
+
+from sheet_sections import SectionIndex
+
+
+def _raw_cell(value):
+    """USER_ENTERED에서도 RAW처럼 저장되는 값 (문자열은 '로 시작해 숫자·날짜·수식으로 해석하지 않음)"""
+    if isinstance(value, str):
+        return "'" + value if value else value
+    if isinstance(value, float) and not np.isfinite(value):
+        return ''
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _quote(title: str) -> str:
+    return "'" + title.replace("'", "''") + "'"
+
+
+class SheetsBatch:
+    """탭 생성·값 쓰기를 모아 두었다가 flush 한 번에 보냄"""
+
+    def __init__(self, uploader, min_rows: int = 1000, min_cols: int = 26):
+        self.uploader = uploader
+        self.min_rows = min_rows
+        self.min_cols = min_cols
+        self.tabs = {}
+        self._sheets = None
+        self.round_trips = 0
+
+    def __len__(self):
+        return len(self.tabs)
+
+    def put_tab(self, title: str, rows, raw: bool = False, sections=None) -> None:
+        """탭 전체를 rows로 다시 씀 (같은 탭을 다시 넣으면 나중 값)"""
+        rows = [list(row) for row in rows]
+        if raw:
+            rows = [[_raw_cell(value) for value in row] for row in rows]
+        self.tabs[title] = {'rows': rows, 'sections': sections}
+
+    def _sheet_properties(self) -> dict:
+        """탭 제목 → {'sheetId', 'rows', 'cols'} (batch마다 한 번 읽음)"""
+        if self._sheets is None:
+            meta = self.uploader.service.spreadsheets().get(
+                spreadsheetId=self.uploader.SPREADSHEET_ID,
+                fields='sheets.properties(sheetId,title,gridProperties(rowCount,columnCount))',
+            ).execute()
+            self.round_trips += 1
+            self._sheets = {}
+            for sheet in meta.get('sheets', []):
+                props = sheet['properties']
+                grid = props.get('gridProperties', {})
+                self._sheets[props['title']] = {
+                    'sheetId': props['sheetId'],
+                    'rows': grid.get('rowCount', 0),
+                    'cols': grid.get('columnCount', 0),
+                }
+        return self._sheets
+
+    def _structure_requests(self) -> list:
+        sheets = self._sheet_properties()
+        next_id = max([s['sheetId'] for s in sheets.values()] + [0]) + 1
+        requests = []
+        for title, tab in self.tabs.items():
+            rows = max(len(tab['rows']), 1)
+            cols = max([len(row) for row in tab['rows']] + [1])
+            sheet = sheets.get(title)
+            if sheet is None:
+                # sheetId를 직접 정해 두면 응답을 기다리지 않고 섹션 색인에 기록 가능
+                sheet = sheets[title] = {
+                    'sheetId': next_id, 'rows': max(rows, self.min_rows), 'cols': max(cols, self.min_cols),
+                }
+                next_id += 1
+                requests.append({'addSheet': {'properties': {
+                    'sheetId': sheet['sheetId'], 'title': title,
+                    'gridProperties': {'rowCount': sheet['rows'], 'columnCount': sheet['cols']},
+                }}})
+                continue
+            if rows > sheet['rows'] or cols > sheet['cols']:
+                sheet['rows'], sheet['cols'] = max(rows, sheet['rows']), max(cols, sheet['cols'])
+                requests.append({'updateSheetProperties': {
+                    'properties': {'sheetId': sheet['sheetId'],
+                                   'gridProperties': {'rowCount': sheet['rows'], 'columnCount': sheet['cols']}},
+                    'fields': 'gridProperties(rowCount,columnCount)',
+                }})
+            # 기존 값만 지움 (서식 유지, worksheet.clear와 같음)
+            requests.append({'updateCells': {'range': {'sheetId': sheet['sheetId']}, 'fields': 'userEnteredValue'}})
+        return requests
+
+    def send(self) -> int:
+        """모은 탭을 보내고 비움 → 쓴 칸 수. 실패하면 예외를 그대로 올림 (모은 탭은 그대로, sheets_outbox가 재시도)."""
+        if not self.tabs:
+            return 0
+        service = self.uploader.service
+        spreadsheet_id = self.uploader.SPREADSHEET_ID
+        try:
+            requests = self._structure_requests()
+            if requests:
+                service.spreadsheets().batchUpdate(
+                    spreadsheetId=spreadsheet_id, body={'requests': requests},
+                ).execute()
+                self.round_trips += 1
+            data = [
+                {'range': f"{_quote(title)}!A1", 'values': tab['rows']}
+                for title, tab in self.tabs.items() if tab['rows']
+            ]
+            if data:
+                service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'valueInputOption': 'USER_ENTERED', 'data': data},
+                ).execute()
+                self.round_trips += 1
+        except Exception:
+            # 탭 목록이 바뀌었을 수 있으므로 다음 전송에서 다시 읽음
+            self._sheets = None
+            raise
+
+        index = SectionIndex()
+        for title, tab in self.tabs.items():
+            if tab['sections'] is not None:
+                index.put(spreadsheet_id, title, self._sheets[title]['sheetId'], tab['sections'])
+        cells = sum(len(row) for tab in self.tabs.values() for row in tab['rows'])
+        self.tabs = {}
+        return cells
+
+    def flush(self) -> bool:
+        """send와 같되 실패하면 False (모은 탭은 그대로 두어 다시 flush 가능)."""
+        count = len(self.tabs)
+        try:
+            cells = self.send()
+        except Exception as e:
+            print(f"[오류] 구글 시트 일괄 업로드 실패 ({', '.join(self.tabs)}): {str(e)}")
+            return False
+        if count:
+            print(f"[OK] 구글 시트 일괄 업로드: 탭 {count}개, {cells:,}칸 (API 요청 {self.round_trips}회)")
+        return True
@@ -0,0 +1,65 @@
+"""
+구글 시트 API 클라이언트 생성 (googleapiclient Sheets v4 service·gspread Client).
+
+SHEETS_API_BASE(예: http://127.0.0.1:8900)가 있으면 실제 구글 API 대신 그 주소로 보내고,
+인증 파일 없이 익명 인증을 씁니다 (sheets_emulator.py 로컬 서버로 오프라인 벤치마크·회귀 확인).
+
+    emulator_base()                              SHEETS_API_BASE (없으면 None)
+    credentials_available(credentials_file)      인증 파일이 있거나 에뮬레이터를 쓰는지
+    build_service(credentials_file, scopes)      Sheets v4 service
+    authorize(credentials_file, scopes)          gspread Client
+"""
+import os
+from urllib.parse import urlsplit
+
+import gspread
+import requests
+from google.auth.credentials import AnonymousCredentials
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+
+# gspread가 부르는 호스트 (Sheets v4·Drive v3)
+GOOGLE_API_HOSTS = ('sheets.googleapis.com', 'www.googleapis.com')
+
+
+def emulator_base() -> str | None:
+    return os.getenv('SHEETS_API_BASE', '').strip().rstrip('/') or None
+
+
+def credentials_available(credentials_file) -> bool:
+    return emulator_base() is not None or os.path.exists(credentials_file)
+
+
+class _RedirectAdapter(requests.adapters.HTTPAdapter):
+    """구글 API 호스트로 가는 요청을 base로 (경로·쿼리는 그대로)"""
+
+    def __init__(self, base: str):
+        super().__init__()
+        self.base = base
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        if parts.hostname in GOOGLE_API_HOSTS:
+            request.url = self.base + request.url[len(f"{parts.scheme}://{parts.netloc}"):]
+        return super().send(request, **kwargs)
+
+
+def build_service(credentials_file, scopes):
+    """Sheets v4 service (googleapiclient)"""
+    base = emulator_base()
+    if base:
+        return build('sheets', 'v4', credentials=AnonymousCredentials(),
+                     client_options={'api_endpoint': base}, cache_discovery=False)
+    credentials = service_account.Credentials.from_service_account_file(credentials_file, scopes=scopes)
+    return build('sheets', 'v4', credentials=credentials)
+
+
+def authorize(credentials_file, scopes) -> gspread.Client:
+    """gspread Client (스프레드시트 이름으로 열기·만들기는 Drive API도 같은 base로)"""
+    base = emulator_base()
+    if base:
+        session = requests.Session()
+        session.mount('https://', _RedirectAdapter(base))
+        return gspread.authorize(AnonymousCredentials(), session=session)
+    credentials = service_account.Credentials.from_service_account_file(credentials_file, scopes=scopes)
+    return gspread.authorize(credentials)
@@ -0,0 +1,864 @@
+"""
+구글 시트 API 로컬 에뮬레이터 (인증 없이 업로드 경로 벤치마크·회귀 확인).
+
+google_sheets_uploader·sheets_batch·sheets_outbox·quick_stock_check·weekly_stock_analyzer·us_stock_crawler·
+test_google_sheets가 쓰는 Sheets v4·Drive v3 요청을 메모리 스프레드시트로 처리합니다.
+지연·오류(HTTP 503)·분당 요청 한도(HTTP 429)를 주입할 수 있고, API별 호출 수와 요청·응답 바이트를 셉니다.
+클라이언트는 sheets_client가 SHEETS_API_BASE를 보고 이 서버로 보냅니다 (인증 파일 불필요).
+
+    serve   로컬 서버 실행
+    bench   서버를 띄워 당일 탭 일괄 업로드·섹션 교체·탭별 개별 업로드(이전 방식)를 재고 시트 내용을 대조
+
+    python sheets_emulator.py serve --port 8900 --latency-ms 120 --write-quota 60
+    SHEETS_API_BASE=http://127.0.0.1:8900 SPREADSHEET_ID=local python daily_auto_stock_analysis.py
+    python sheets_emulator.py bench --rows 3000 --latency-ms 120
+
+지원 요청:
+    spreadsheets  create·get·batchUpdate (addSheet·deleteSheet·updateSheetProperties·updateCells(값 지우기)·
+                  insertDimension·deleteDimension·appendDimension, 서식 요청은 받기만 함)
+    values        get·batchGet·update·append·batchUpdate·clear·batchClear
+    drive files   list(이름 검색)·create·get·delete
+값은 RAW면 그대로, USER_ENTERED면 '로 시작하는 글자는 글자 그대로, 숫자 모양은 숫자로 저장합니다.
+실제 API처럼 시트 크기(행·열)를 넘는 값 쓰기는 400이고 (append만 행을 늘림), batchUpdate는 하나라도
+실패하면 아무것도 바꾸지 않습니다. 처음 보는 스프레드시트 ID는 빈 스프레드시트('Sheet1')로 만듭니다.
+
+    server.stats        {'calls': {API: 횟수}, 'requests': {batchUpdate 요청 종류: 개수},
+                         'request_bytes', 'response_bytes', 'cells_written', 'errors', 'quota'}
+    GET /_emulator/stats, POST /_emulator/reset    (serve 중 다른 프로세스에서 확인·초기화)
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import collections
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+A1_PART = re.compile(r'^([A-Za-z]*)(\d*)$')
+NUMBER = re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+DRIVE_NAME = re.compile(r'name\s*=\s*"((?:[^"\\]|\\.)*)"')
+
+DEFAULT_ROWS, DEFAULT_COLS = 1000, 26
+# 값은 건드리지 않는 batchUpdate 요청 (서식·필터 등)
+FORMAT_REQUESTS = frozenset({
+    'repeatCell', 'updateBorders', 'autoResizeDimensions', 'updateDimensionProperties',
+    'mergeCells', 'unmergeCells', 'setBasicFilter', 'clearBasicFilter', 'addConditionalFormatRule',
+    'setDataValidation', 'addBanding', 'updateSpreadsheetProperties',
+})
+
+
+class ApiError(Exception):
+    """구글 API 오류 응답 ({'error': {'code', 'message', 'status'}})"""
+
+    STATUS = {400: 'INVALID_ARGUMENT', 404: 'NOT_FOUND', 429: 'RESOURCE_EXHAUSTED', 503: 'UNAVAILABLE'}
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def body(self) -> dict:
+        return {'error': {'code': self.code, 'message': self.message, 'status': self.STATUS.get(self.code, 'UNKNOWN')}}
+
+
+def column_index(letters: str) -> int:
+    """'A' → 0, 'AA' → 26"""
+    index = 0
+    for ch in letters.upper():
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def column_letters(index: int) -> str:
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def quote_title(title: str) -> str:
+    return "'" + title.replace("'", "''") + "'"
+
+
+def entered_value(value, input_option: str):
+    """값 입력 방식대로 저장할 값 (USER_ENTERED: '글자 → 글자, 숫자 모양 → 숫자)"""
+    if input_option == 'RAW' or not isinstance(value, str):
+        return value
+    if value.startswith("'"):
+        return value[1:]
+    text = value.strip().replace(',', '')
+    if text and NUMBER.match(text):
+        number = float(text)
+        return int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+    return value
+
+
+def formatted_value(value) -> str:
+    """FORMATTED_VALUE로 읽을 때의 글자 (서식 없는 기본 표시)"""
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class Sheet:
+    """탭 하나. 값은 행 번호 → {열 번호: 값} (0부터, 빈 칸은 없음)"""
+
+    def __init__(self, sheet_id: int, title: str, index: int, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS):
+        self.sheet_id = sheet_id
+        self.title = title
+        self.index = index
+        self.rows = rows
+        self.cols = cols
+        self.cells = {}
+
+    def properties(self) -> dict:
+        return {
+            'sheetId': self.sheet_id, 'title': self.title, 'index': self.index, 'sheetType': 'GRID',
+            'gridProperties': {'rowCount': self.rows, 'columnCount': self.cols},
+        }
+
+    def copy(self) -> 'Sheet':
+        sheet = Sheet(self.sheet_id, self.title, self.index, self.rows, self.cols)
+        sheet.cells = {r: dict(row) for r, row in self.cells.items()}
+        return sheet
+
+    def a1(self, r0, c0, r1, c1) -> str:
+        return f"{quote_title(self.title)}!{column_letters(c0)}{r0 + 1}:{column_letters(c1 - 1)}{r1}"
+
+    def check_grid(self, r1: int, c1: int) -> None:
+        if r1 > self.rows or c1 > self.cols:
+            raise ApiError(400, f"Range ({quote_title(self.title)}!{column_letters(c1 - 1)}{r1}) exceeds grid limits. "
+                                f"Max rows: {self.rows}, max columns: {self.cols}")
+
+    def write(self, r0: int, c0: int, values, input_option: str) -> int:
+        """값 쓰기 (None은 건너뜀, ''는 지움) → 쓴 칸 수"""
+        written = 0
+        for i, row in enumerate(values):
+            for j, value in enumerate(row):
+                if value is None:
+                    continue
+                value = entered_value(value, input_option)
+                cells = self.cells.setdefault(r0 + i, {})
+                if value == '':
+                    cells.pop(c0 + j, None)
+                else:
+                    cells[c0 + j] = value
+                written += 1
+            if not self.cells.get(r0 + i):
+                self.cells.pop(r0 + i, None)
+        return written
+
+    def clear(self, r0: int, c0: int, r1: int | None, c1: int | None) -> None:
+        for r in [r for r in self.cells if r >= r0 and (r1 is None or r < r1)]:
+            row = self.cells[r]
+            for c in [c for c in row if c >= c0 and (c1 is None or c < c1)]:
+                del row[c]
+            if not row:
+                del self.cells[r]
+
+    def read(self, r0: int, c0: int, r1: int | None, c1: int | None, render: str = 'FORMATTED_VALUE') -> list:
+        """범위 값 (뒤쪽 빈 행·빈 칸은 잘라냄)"""
+        r1 = min(self.rows, r1 if r1 is not None else self.rows)
+        c1 = min(self.cols, c1 if c1 is not None else self.cols)
+        rows = []
+        for r in range(r0, r1):
+            cells = self.cells.get(r)
+            if not cells:
+                rows.append([])
+                continue
+            used = [c for c in cells if c0 <= c < c1]
+            width = max(used) - c0 + 1 if used else 0
+            row = [cells.get(c0 + j, '') for j in range(width)]
+            if render == 'FORMATTED_VALUE':
+                row = [formatted_value(v) if v != '' else '' for v in row]
+            rows.append(row)
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def insert(self, dimension: str, start: int, count: int) -> None:
+        if dimension == 'ROWS':
+            self.cells = {(r + count if r >= start else r): row for r, row in self.cells.items()}
+            self.rows += count
+        else:
+            self.cells = {r: {(c + count if c >= start else c): v for c, v in row.items()} for r, row in self.cells.items()}
+            self.cols += count
+
+    def delete(self, dimension: str, start: int, end: int) -> None:
+        count = end - start
+        if dimension == 'ROWS':
+            self.cells = {(r - count if r >= end else r): row for r, row in self.cells.items() if not start <= r < end}
+            self.rows -= count
+        else:
+            self.cells = {r: {(c - count if c >= end else c): v for c, v in row.items() if not start <= c < end}
+                          for r, row in self.cells.items()}
+            self.cols -= count
+
+    def resize(self, rows: int, cols: int) -> None:
+        if rows < self.rows or cols < self.cols:
+            self.clear(rows, 0, None, None)
+            self.clear(0, cols, None, None)
+        self.rows, self.cols = rows, cols
+
+
+class Spreadsheet:
+    def __init__(self, spreadsheet_id: str, title: str):
+        self.id = spreadsheet_id
+        self.title = title
+        self.created = datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+        self.sheets = [Sheet(0, 'Sheet1', 0)]
+
+    def metadata(self) -> dict:
+        return {
+            'spreadsheetId': self.id,
+            'properties': {'title': self.title, 'locale': 'ko_KR', 'timeZone': 'Asia/Seoul'},
+            'sheets': [{'properties': sheet.properties()} for sheet in self.sheets],
+            'spreadsheetUrl': f"https://docs.google.com/spreadsheets/d/{self.id}/edit",
+        }
+
+    def drive_file(self) -> dict:
+        return {'kind': 'drive#file', 'id': self.id, 'name': self.title,
+                'mimeType': 'application/vnd.google-apps.spreadsheet',
+                'createdTime': self.created, 'modifiedTime': self.created}
+
+    def sheet(self, title: str | None = None, sheet_id: int | None = None) -> Sheet:
+        for sheet in self.sheets:
+            if (sheet_id is not None and sheet.sheet_id == sheet_id) or (sheet_id is None and sheet.title == title):
+                return sheet
+        raise ApiError(400, f"Unable to parse range: {title}" if sheet_id is None else f"No grid with id: {sheet_id}")
+
+    def resolve(self, a1: str, single_cell_open: bool = False):
+        """A1 범위 → (탭, 시작 행, 시작 열, 끝 행, 끝 열) 0부터, 끝은 미포함(None이면 끝까지).
+        single_cell_open: 'A1'처럼 칸 하나면 그 칸부터 끝까지 (값 쓰기 시작 위치)"""
+        if '!' in a1:
+            title, cells = a1.rsplit('!', 1)
+            if title.startswith("'") and title.endswith("'"):
+                title = title[1:-1].replace("''", "'")
+            sheet = self.sheet(title)
+        elif any(sheet.title == a1 for sheet in self.sheets) or (a1.startswith("'") and a1.endswith("'")):
+            return self.sheet(a1[1:-1].replace("''", "'") if a1.startswith("'") else a1), 0, 0, None, None
+        else:
+            sheet, cells = self.sheets[0], a1
+
+        parts = cells.split(':')
+        matches = [A1_PART.match(part) for part in parts]
+        if len(parts) > 2 or not all(matches) or not cells:
+            raise ApiError(400, f"Unable to parse range: {a1}")
+        (l0, d0) = matches[0].groups()
+        r0 = int(d0) - 1 if d0 else 0
+        c0 = column_index(l0) if l0 else 0
+        if len(parts) == 1:
+            if single_cell_open:
+                return sheet, r0, c0, None, None
+            return sheet, r0, c0, r0 + 1 if d0 else None, c0 + 1 if l0 else None
+        (l1, d1) = matches[1].groups()
+        return sheet, r0, c0, int(d1) if d1 else None, column_index(l1) + 1 if l1 else None
+
+
+class Workbook:
+    """메모리 스프레드시트 모음 (요청마다 잠금)"""
+
+    def __init__(self):
+        self.spreadsheets = {}
+        self.lock = threading.RLock()
+        self._serial = 0
+
+    def get(self, spreadsheet_id: str) -> Spreadsheet:
+        if spreadsheet_id not in self.spreadsheets:
+            self.spreadsheets[spreadsheet_id] = Spreadsheet(spreadsheet_id, spreadsheet_id)
+        return self.spreadsheets[spreadsheet_id]
+
+    def create(self, title: str) -> Spreadsheet:
+        self._serial += 1
+        spreadsheet = Spreadsheet(f"local-{self._serial:04d}", title or '제목 없는 스프레드시트')
+        self.spreadsheets[spreadsheet.id] = spreadsheet
+        return spreadsheet
+
+    def values(self, spreadsheet_id: str, title: str) -> list:
+        """탭 전체 값 (FORMATTED_VALUE, 대조용)"""
+        with self.lock:
+            return self.get(spreadsheet_id).sheet(title).read(0, 0, None, None)
+
+    # -- spreadsheets.batchUpdate ------------------------------------------------
+
+    def batch_update(self, spreadsheet: Spreadsheet, requests, stats) -> list:
+        """요청을 차례로 적용 (하나라도 실패하면 전부 되돌림) → replies"""
+        saved = [sheet.copy() for sheet in spreadsheet.sheets]
+        replies = []
+        try:
+            for i, request in enumerate(requests):
+                (kind, body), = request.items()
+                stats['requests'][kind] += 1
+                replies.append(self._apply(spreadsheet, kind, body, i))
+        except ApiError:
+            spreadsheet.sheets = saved
+            raise
+        return replies
+
+    def _apply(self, spreadsheet: Spreadsheet, kind: str, body: dict, i: int) -> dict:
+        if kind == 'addSheet':
+            props = body.get('properties', {})
+            title = props.get('title') or f"Sheet{len(spreadsheet.sheets) + 1}"
+            if any(sheet.title == title for sheet in spreadsheet.sheets):
+                raise ApiError(400, f'Invalid requests[{i}].addSheet: A sheet with the name "{title}" already exists. '
+                                    f'Please enter another name.')
+            sheet_id = props.get('sheetId')
+            if sheet_id is None:
+                sheet_id = max(sheet.sheet_id for sheet in spreadsheet.sheets) + 1 if spreadsheet.sheets else 0
+            elif any(sheet.sheet_id == sheet_id for sheet in spreadsheet.sheets):
+                raise ApiError(400, f"Invalid requests[{i}].addSheet: Sheet with id {sheet_id} already exists.")
+            grid = props.get('gridProperties', {})
+            index = min(props.get('index', len(spreadsheet.sheets)), len(spreadsheet.sheets))
+            sheet = Sheet(sheet_id, title, index, grid.get('rowCount', DEFAULT_ROWS), grid.get('columnCount', DEFAULT_COLS))
+            spreadsheet.sheets.insert(index, sheet)
+            for n, other in enumerate(spreadsheet.sheets):
+                other.index = n
+            return {'addSheet': {'properties': sheet.properties()}}
+
+        if kind == 'deleteSheet':
+            sheet = spreadsheet.sheet(sheet_id=body['sheetId'])
+            spreadsheet.sheets.remove(sheet)
+            for n, other in enumerate(spreadsheet.sheets):
+                other.index = n
+            return {}
+
+        if kind == 'updateSheetProperties':
+            props = body['properties']
+            sheet = spreadsheet.sheet(sheet_id=props.get('sheetId', 0))
+            grid = props.get('gridProperties', {})
+            sheet.resize(grid.get('rowCount', sheet.rows), grid.get('columnCount', sheet.cols))
+            if 'title' in props:
+                sheet.title = props['title']
+            return {}
+
+        if kind == 'updateCells':
+            grid = body.get('range') or {'sheetId': body['start']['sheetId']}
+            sheet = spreadsheet.sheet(sheet_id=grid.get('sheetId', 0))
+            r0, c0 = grid.get('startRowIndex', 0), grid.get('startColumnIndex', 0)
+            if 'rows' not in body:
+                if body.get('fields') in ('*', 'userEnteredValue') or 'userEnteredValue' in body.get('fields', ''):
+                    sheet.clear(r0, c0, grid.get('endRowIndex'), grid.get('endColumnIndex'))
+                return {}
+            values = [[_cell_data_value(cell) for cell in row.get('values', [])] for row in body['rows']]
+            sheet.check_grid(r0 + len(values), c0 + max((len(row) for row in values), default=0))
+            sheet.write(r0, c0, values, 'RAW')
+            return {}
+
+        if kind in ('insertDimension', 'deleteDimension'):
+            grid = body['range']
+            sheet = spreadsheet.sheet(sheet_id=grid['sheetId'])
+            start, end = grid['startIndex'], grid['endIndex']
+            limit = sheet.rows if grid['dimension'] == 'ROWS' else sheet.cols
+            if start < 0 or end <= start or (start > limit if kind == 'insertDimension' else end > limit):
+                raise ApiError(400, f"Invalid requests[{i}].{kind}: range out of bounds ({start}:{end}, {limit})")
+            if kind == 'insertDimension':
+                sheet.insert(grid['dimension'], start, end - start)
+            else:
+                sheet.delete(grid['dimension'], start, end)
+            return {}
+
+        if kind == 'appendDimension':
+            sheet = spreadsheet.sheet(sheet_id=body['sheetId'])
+            if body['dimension'] == 'ROWS':
+                sheet.rows += body['length']
+            else:
+                sheet.cols += body['length']
+            return {}
+
+        if kind in FORMAT_REQUESTS:
+            return {}
+        raise ApiError(400, f"Invalid requests[{i}]: {kind} is not supported by the emulator")
+
+
+def _cell_data_value(cell: dict):
+    value = cell.get('userEnteredValue')
+    if not value:
+        return None
+    (_, v), = value.items()
+    return v
+
+
+class Api:
+    """경로 → 처리 (method, 경로, 쿼리, 본문) → (상태, 응답 dict, API 이름)"""
+
+    def __init__(self, workbook: Workbook, stats: dict):
+        self.workbook = workbook
+        self.stats = stats
+
+    def handle(self, method: str, path: str, query: dict, body: dict):
+        path = unquote(path)
+        if path.startswith('/drive/v3/files'):
+            return self._drive(method, path[len('/drive/v3/files'):].strip('/'), query, body)
+        if not path.startswith('/v4/spreadsheets'):
+            raise ApiError(404, f"Not found: {path}")
+        rest = path[len('/v4/spreadsheets'):].lstrip('/')
+        if not rest:
+            if method != 'POST':
+                raise ApiError(404, 'Not found')
+            spreadsheet = self.workbook.create(body.get('properties', {}).get('title', ''))
+            for n, sheet in enumerate(body.get('sheets', [])):
+                props = sheet.get('properties', {})
+                if n == 0:
+                    spreadsheet.sheets[0].title = props.get('title', 'Sheet1')
+            return spreadsheet.metadata(), 'spreadsheets.create'
+
+        spreadsheet_id, _, rest = rest.partition('/')
+        if spreadsheet_id.endswith(':batchUpdate'):
+            spreadsheet = self.workbook.get(spreadsheet_id[:-len(':batchUpdate')])
+            replies = self.workbook.batch_update(spreadsheet, body.get('requests', []), self.stats)
+            return {'spreadsheetId': spreadsheet.id, 'replies': replies}, 'spreadsheets.batchUpdate'
+        spreadsheet = self.workbook.get(spreadsheet_id)
+        if not rest:
+            return spreadsheet.metadata(), 'spreadsheets.get'
+        if not rest.startswith('values'):
+            raise ApiError(404, f"Not found: {path}")
+        return self._values(spreadsheet, method, rest[len('values'):], query, body)
+
+    def _values(self, spreadsheet, method, rest, query, body):
+        option = (query.get('valueInputOption') or [body.get('valueInputOption', 'RAW')])[0]
+        render = (query.get('valueRenderOption') or ['FORMATTED_VALUE'])[0]
+        major = (query.get('majorDimension') or ['ROWS'])[0]
+
+        if rest == ':batchGet':
+            ranges = [self._read(spreadsheet, a1, render, major) for a1 in query.get('ranges', [])]
+            return {'spreadsheetId': spreadsheet.id, 'valueRanges': ranges}, 'values.batchGet'
+        if rest == ':batchUpdate':
+            option = body.get('valueInputOption', 'RAW')
+            data = body.get('data', [])
+            # 하나라도 범위를 벗어나면 아무것도 쓰지 않음
+            targets = [self._write_target(spreadsheet, item['range'], item.get('values', []),
+                                          item.get('majorDimension', 'ROWS')) for item in data]
+            responses = [self._write(target, option) for target in targets]
+            return {
+                'spreadsheetId': spreadsheet.id,
+                'totalUpdatedCells': sum(r['updatedCells'] for r in responses),
+                'responses': responses,
+            }, 'values.batchUpdate'
+        if rest == ':batchClear':
+            for a1 in body.get('ranges', []):
+                sheet, r0, c0, r1, c1 = spreadsheet.resolve(a1)
+                sheet.clear(r0, c0, r1, c1)
+            return {'spreadsheetId': spreadsheet.id, 'clearedRanges': body.get('ranges', [])}, 'values.batchClear'
+
+        a1 = rest.lstrip('/')
+        if a1.endswith(':clear'):
+            sheet, r0, c0, r1, c1 = spreadsheet.resolve(a1[:-len(':clear')])
+            sheet.clear(r0, c0, r1, c1)
+            return {'spreadsheetId': spreadsheet.id, 'clearedRange': a1[:-len(':clear')]}, 'values.clear'
+        if a1.endswith(':append'):
+            return self._append(spreadsheet, a1[:-len(':append')], body, option), 'values.append'
+        if method == 'GET':
+            return self._read(spreadsheet, a1, render, major), 'values.get'
+        if method == 'PUT':
+            target = self._write_target(spreadsheet, a1, body.get('values', []), body.get('majorDimension', 'ROWS'))
+            return self._write(target, option), 'values.update'
+        raise ApiError(404, f"Not found: values{rest}")
+
+    def _read(self, spreadsheet, a1, render, major) -> dict:
+        sheet, r0, c0, r1, c1 = spreadsheet.resolve(a1)
+        rows = sheet.read(r0, c0, r1, c1, render)
+        if major == 'COLUMNS':
+            width = max((len(row) for row in rows), default=0)
+            rows = [[row[j] if j < len(row) else '' for row in rows] for j in range(width)]
+            for col in rows:
+                while col and col[-1] == '':
+                    col.pop()
+        result = {'range': a1, 'majorDimension': major}
+        if rows:
+            result['values'] = rows
+        return result
+
+    def _write_target(self, spreadsheet, a1, values, major):
+        if major == 'COLUMNS':
+            height = max((len(col) for col in values), default=0)
+            values = [[col[i] if i < len(col) else None for col in values] for i in range(height)]
+        sheet, r0, c0, r1, c1 = spreadsheet.resolve(a1, single_cell_open=True)
+        width = max((len(row) for row in values), default=0)
+        if (r1 is not None and r0 + len(values) > r1) or (c1 is not None and c0 + width > c1):
+            raise ApiError(400, f"Requested writing within range [{a1}], but tried writing "
+                                f"{len(values)} rows × {width} columns")
+        if values:
+            sheet.check_grid(r0 + len(values), c0 + width)
+        return sheet, r0, c0, values
+
+    def _write(self, target, option) -> dict:
+        sheet, r0, c0, values = target
+        written = sheet.write(r0, c0, values, option)
+        self.stats['cells_written'] += written
+        width = max((len(row) for row in values), default=0)
+        return {
+            'updatedRange': sheet.a1(r0, c0, r0 + len(values), c0 + max(width, 1)),
+            'updatedRows': len(values), 'updatedColumns': width, 'updatedCells': written,
+        }
+
+    def _append(self, spreadsheet, a1, body, option) -> dict:
+        """표 끝(값이 있는 마지막 행 다음)에 추가, 모자라는 행은 늘림"""
+        sheet, r0, c0, _, _ = spreadsheet.resolve(a1)
+        values = body.get('values', [])
+        start = max([r + 1 for r in sheet.cells if r >= r0] + [r0])
+        sheet.rows = max(sheet.rows, start + len(values))
+        width = max((len(row) for row in values), default=0)
+        sheet.check_grid(start + len(values), c0 + width)
+        return {'spreadsheetId': spreadsheet.id, 'updates': self._write((sheet, start, c0, values), option)}
+
+    def _drive(self, method, file_id, query, body):
+        if not file_id and method == 'GET':
+            match = DRIVE_NAME.search((query.get('q') or [''])[0])
+            name = match.group(1).replace('\\"', '"') if match else None
+            files = [s.drive_file() for s in self.workbook.spreadsheets.values() if name is None or s.title == name]
+            return {'kind': 'drive#fileList', 'files': files}, 'drive.files.list'
+        if not file_id and method == 'POST':
+            return self.workbook.create(body.get('name', '')).drive_file(), 'drive.files.create'
+        if file_id not in self.workbook.spreadsheets:
+            raise ApiError(404, f"File not found: {file_id}.")
+        if method == 'DELETE':
+            del self.workbook.spreadsheets[file_id]
+            return {}, 'drive.files.delete'
+        return self.workbook.spreadsheets[file_id].drive_file(), 'drive.files.get'
+
+
+def new_stats() -> dict:
+    return {
+        'calls': collections.Counter(), 'requests': collections.Counter(),
+        'request_bytes': 0, 'response_bytes': 0, 'cells_written': 0, 'errors': 0, 'quota': 0,
+    }
+
+
+def make_server(workbook: Workbook | None = None, host='127.0.0.1', port=8900, latency_ms=0.0, jitter_ms=0.0,
+                error_rate=0.0, read_quota=0, write_quota=0, seed=None) -> ThreadingHTTPServer:
+    """
+    지연(latency_ms ± jitter_ms)·오류(HTTP 503, error_rate 확률)·분당 요청 한도(HTTP 429, 0이면 없음)를
+    주입하는 에뮬레이터 서버. 한도는 실제 API처럼 Sheets 요청만 읽기(GET)·쓰기로 나눠 최근 60초를 셈.
+    """
+    workbook = workbook or Workbook()
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    stats = new_stats()
+    windows = {'read': collections.deque(), 'write': collections.deque()}
+
+    def over_quota(kind: str, limit: int) -> bool:
+        if not limit:
+            return False
+        now = time.monotonic()
+        window = windows[kind]
+        while window and now - window[0] >= 60:
+            window.popleft()
+        if len(window) >= limit:
+            return True
+        window.append(now)
+        return False
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _handle(self, method):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            parts = urlsplit(self.path)
+            if parts.path.startswith('/_emulator/'):
+                self._control(parts.path)
+                return
+
+            with rng_lock:
+                delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+                fail = rng.random() < error_rate
+            if delay:
+                time.sleep(delay)
+
+            with workbook.lock:
+                stats['request_bytes'] += len(raw) + len(self.path)
+                try:
+                    if fail:
+                        stats['errors'] += 1
+                        raise ApiError(503, 'The service is currently unavailable.')
+                    if parts.path.startswith('/v4/'):
+                        kind = 'read' if method == 'GET' else 'write'
+                        if over_quota(kind, read_quota if kind == 'read' else write_quota):
+                            stats['quota'] += 1
+                            raise ApiError(429, f"Quota exceeded for quota metric '{kind.title()} requests' and limit "
+                                                f"'{kind.title()} requests per minute per user' of service "
+                                                f"'sheets.googleapis.com'.")
+                    body = json.loads(raw) if raw else {}
+                    result, name = Api(workbook, stats).handle(
+                        method, parts.path, parse_qs(parts.query, keep_blank_values=True), body)
+                    stats['calls'][name] += 1
+                    status = 200
+                except ApiError as e:
+                    result, status = e.body(), e.code
+                except (KeyError, TypeError, ValueError) as e:
+                    result, status = ApiError(400, f"Invalid request: {type(e).__name__}: {e}").body(), 400
+                payload = json.dumps(result, ensure_ascii=False).encode('utf-8')
+                stats['response_bytes'] += len(payload)
+            self._send(status, payload)
+
+        def _control(self, path):
+            if path == '/_emulator/reset':
+                fresh = new_stats()
+                with workbook.lock:
+                    stats.clear()
+                    stats.update(fresh)
+            with workbook.lock:
+                payload = json.dumps(stats, ensure_ascii=False).encode('utf-8')
+            self._send(200, payload)
+
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def do_PUT(self):
+            self._handle('PUT')
+
+        def do_PATCH(self):
+            self._handle('PATCH')
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    server.workbook = workbook
+    return server
+
+
+def start_in_background(server: ThreadingHTTPServer) -> str:
+    """서버를 데몬 스레드로 시작하고 기준 URL(SHEETS_API_BASE)을 반환."""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def reset_stats(server: ThreadingHTTPServer) -> None:
+    with server.workbook.lock:
+        server.stats.update(new_stats())
+
+
+def print_stats(stats: dict, indent: str = '    ') -> None:
+    calls = sum(stats['calls'].values())
+    detail = ', '.join(f"{name} {count}" for name, count in sorted(stats['calls'].items()))
+    print(f"{indent}API 호출 {calls}회 ({detail})")
+    if stats['requests']:
+        kinds = ', '.join(f"{name} {count}" for name, count in sorted(stats['requests'].items()))
+        print(f"{indent}batchUpdate 요청: {kinds}")
+    print(f"{indent}요청 {stats['request_bytes'] / 1024:,.1f}KB / 응답 {stats['response_bytes'] / 1024:,.1f}KB, "
+          f"쓴 칸 {stats['cells_written']:,}개, 주입 오류 {stats['errors']}회, 한도 초과 {stats['quota']}회")
+
+
+# ---------------------------------------------------------------------------
+# bench
+# ---------------------------------------------------------------------------
+
+def synthetic_stock_frame(rows: int, seed: int = 0):
+    """전체 종목 스냅샷과 같은 열의 임의 데이터 (stock_schema 스키마 적용)"""
+    import numpy as np
+    import pandas as pd
+
+    from stock_schema import NUMERIC_COLUMNS, coerce_stock_frame
+
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        '종목명': [f"종목{i:05d}" for i in range(rows)],
+        '종목코드': [f"{i:06d}" for i in range(rows)],
+        '시장구분': rng.choice(['코스피', '코스닥'], rows),
+        '업종': rng.choice(['반도체', '화학', '은행', '제약', ''], rows),
+        '수집일자': datetime.now().strftime('%Y-%m-%d'),
+    })
+    for col in NUMERIC_COLUMNS:
+        values = rng.normal(1000, 400, rows).round(2)
+        values[rng.random(rows) < 0.05] = np.nan
+        df[col] = values
+    return coerce_stock_frame(df)
+
+
+def _expected(rows) -> list:
+    """USER_ENTERED로 쓴 행이 FORMATTED_VALUE로 읽힐 모습 (뒤쪽 빈 칸·빈 행 잘라냄)"""
+    out = []
+    for row in rows:
+        cells = ['' if v is None or v == '' else formatted_value(entered_value(v, 'USER_ENTERED')) for v in row]
+        while cells and cells[-1] == '':
+            cells.pop()
+        out.append(cells)
+    while out and not out[-1]:
+        out.pop()
+    return out
+
+
+def _mismatches(actual, expected) -> int:
+    count = abs(len(actual) - len(expected))
+    for a, e in zip(actual, expected):
+        if a != e:
+            count += 1
+    return count
+
+
+def bench(server: ThreadingHTTPServer, base_url: str, rows: int = 3000) -> bool:
+    """당일 탭 일괄 업로드 → 20일선 섹션 교체 → 탭별 개별 업로드(이전 방식). 시트 내용이 맞으면 True."""
+
+    workdir = tempfile.mkdtemp(prefix='sheets_emulator_')
+    os.environ['SHEETS_API_BASE'] = base_url
+    os.environ['SPREADSHEET_ID'] = 'emulator-bench'
+    os.environ['SHEETS_OUTBOX_PATH'] = os.path.join(workdir, 'outbox.sqlite')
+    os.environ['SHEET_SECTION_INDEX'] = os.path.join(workdir, 'sections.json')
+
+    import sheets_outbox
+    from daily_auto_stock_analysis import upload_to_google_sheets
+    from google_sheets_uploader import GoogleSheetsUploader
+    from ma20_breakout_screener import ma20_sections
+    from sheet_sections import SectionIndex
+    from sheets_batch import SheetsBatch
+
+    # 주입한 5xx는 곧바로 재시도 (한도 초과 429는 실제와 같이 QUOTA_DELAY부터 기다림)
+    sheets_outbox.BASE_DELAY = 0.05
+    workbook = server.workbook
+    spreadsheet_id = os.environ['SPREADSHEET_ID']
+    tab = datetime.now().strftime('%Y-%m-%d')
+    stock_df = synthetic_stock_frame(rows)
+    signals = stock_df[['종목코드', '종목명', '현재가', '거래량']].head(300).to_dict('records')
+    results = {'volume_drop': signals[:120], 'ma45': signals[100:220], 'ma360': signals[200:]}
+    ma20_df = stock_df.head(40).rename(columns={'현재가': '종가'})
+    uploader = GoogleSheetsUploader()
+    ok = True
+
+    def scenario(label, run, checks, required=True):
+        nonlocal ok
+        reset_stats(server)
+        started = time.perf_counter()
+        try:
+            run()
+        except Exception as e:
+            ok = ok and not required
+            print(f"  ▶ {label}: 실패 ({type(e).__name__}: {e})")
+            print_stats(server.stats)
+            return
+        elapsed = time.perf_counter() - started
+        bad = {title: _mismatches(workbook.values(spreadsheet_id, title), expected) for title, expected in checks().items()}
+        ok = ok and not any(bad.values())
+        verdict = '일치' if not any(bad.values()) else '불일치 ' + ', '.join(f"{t} {n}행" for t, n in bad.items() if n)
+        print(f"  ▶ {label}: {elapsed:.2f}초, 시트 내용 {verdict}")
+        print_stats(server.stats)
+
+    # 1. daily_auto publish와 같은 경로: 당일 탭 + 리바운드 탭을 SheetsBatch로 모아 대기열 전송
+    sent = {}
+
+    def publish():
+        batch = SheetsBatch(uploader)
+        upload_to_google_sheets(stock_df, {}, tab, stock_data_file='bench.parquet',
+                                extra_sections=ma20_sections(ma20_df), batch=batch)
+        uploader.upload_rebound_signals(results, date_str=tab, batch=batch)
+        sent.update({title: entry['rows'] for title, entry in batch.tabs.items()})
+        if not sheets_outbox.deliver(sheets_outbox.enqueue_tabs(batch)):
+            raise RuntimeError('대기열 전송 실패')
+
+    scenario(f"당일 탭·리바운드 탭 일괄 업로드 ({rows:,}종목)", publish,
+             lambda: {title: _expected(rows_) for title, rows_ in sent.items()})
+
+    # 2. 20일선 섹션만 교체 (행 수가 바뀜): 섹션 색인으로 그 범위만 다시 씀
+    # 분석 일시가 들어가므로 한 번 만들어 업로드·대조에 같이 씀
+    replaced = ma20_sections(stock_df.iloc[40:100].rename(columns={'현재가': '종가'}))
+    titles = {title for title, _ in replaced}
+
+    def replace_ma20():
+        if not uploader.append_sections_to_tab(tab, replaced, replace_section_titles=titles):
+            raise RuntimeError('섹션 교체 실패')
+
+    def replaced_expected():
+        index = SectionIndex().get(spreadsheet_id, tab, workbook.get(spreadsheet_id).sheet(tab).sheet_id)
+        first = min(section['start'] for section in index if section['title'] in titles)
+        rows_after = [row for title, df in replaced for row in uploader._section_rows(title, df)]
+        return {tab: _expected(sent[tab][:first - 1] + rows_after)}
+
+    scenario("20일선 섹션 교체", replace_ma20, replaced_expected)
+
+    # 3. 비교: 탭마다 열기·지우기·값 쓰기를 따로 (sheets_batch 이전 방식, 재시도 없음 → 오류 주입 시 실패는 결과에 반영 안 함)
+    legacy = {f"{title}_개별": rows_ for title, rows_ in sent.items()}
+
+    def per_tab():
+        for title, rows_ in legacy.items():
+            worksheet = uploader.get_or_create_worksheet(title)
+            if rows_:
+                worksheet.update(values=rows_, range_name='A1', value_input_option='USER_ENTERED')
+
+    scenario("탭별 개별 업로드 (이전 방식)", per_tab,
+             lambda: {title: _expected(rows_) for title, rows_ in legacy.items()}, required=False)
+    print(f"  (대기열·섹션 색인: {workdir})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 시트 API 로컬 에뮬레이터")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_server_args(p):
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8900)
+        p.add_argument("--latency-ms", type=float, default=0.0, help="응답 지연 (밀리초)")
+        p.add_argument("--jitter-ms", type=float, default=0.0, help="지연 ± 범위 (밀리초)")
+        p.add_argument("--error-rate", type=float, default=0.0, help="HTTP 503 주입 확률 (0~1)")
+        p.add_argument("--read-quota", type=int, default=0, help="분당 읽기 요청 한도, 넘으면 HTTP 429 (0: 없음)")
+        p.add_argument("--write-quota", type=int, default=0, help="분당 쓰기 요청 한도, 넘으면 HTTP 429 (0: 없음)")
+        p.add_argument("--seed", type=int, default=None, help="지연·오류 난수 시드")
+
+    srv = sub.add_parser("serve", help="에뮬레이터 서버 실행")
+    add_server_args(srv)
+
+    bench_parser = sub.add_parser("bench", help="업로드 경로 벤치마크·시트 내용 대조")
+    add_server_args(bench_parser)
+    bench_parser.set_defaults(port=0)
+    bench_parser.add_argument("--rows", type=int, default=3000, help="임의 종목 수")
+
+    args = parser.parse_args()
+    server = make_server(host=args.host, port=args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                         error_rate=args.error_rate, read_quota=args.read_quota, write_quota=args.write_quota,
+                         seed=args.seed)
+
+    if args.command == "serve":
+        host, port = server.server_address[:2]
+        print(f"구글 시트 에뮬레이터: http://{host}:{port}")
+        print(f"  SHEETS_API_BASE=http://{host}:{port} 로 업로드 스크립트 실행 (인증 파일 불필요)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            print_stats(server.stats, indent='')
+        return 0
+
+    base_url = start_in_background(server)
+    print(f"📊 구글 시트 업로드 벤치마크 ({base_url}, 지연 {args.latency_ms:g}ms, 오류율 {args.error_rate:g}, "
+          f"쓰기 한도 {args.write_quota or '없음'})")
+    try:
+        ok = bench(server, base_url, rows=args.rows)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,414 @@
+"""
+구글 시트 업로드 대기열 (로컬에 저장한 뒤 백그라운드 스레드가 재시도하며 전송).
+
+분석 단계가 구글 API 응답을 기다리거나 첫 오류(429 할당량 초과, 5xx)에 결과를 버리지 않도록,
+보낼 내용을 SQLite 대기열에 먼저 저장하고 바로 다음 일을 합니다. 전송 스레드가 대기열을 비우며
+    - 429·5xx·연결 오류는 지수 백오프(429는 분당 할당량이 풀리도록 더 길게)로 다시 시도
+    - 그 밖의 오류(권한·요청 형식)나 MAX_ATTEMPTS회 실패는 '실패'로 남김 (--retry-failed로 다시 대기)
+    - 같은 탭에 대한 작업은 마지막 것만 남김 (탭 전체를 다시 쓰면 그 탭의 대기 중 섹션 작업도 버림)
+    - 같은 스프레드시트의 탭 작업은 SheetsBatch 한 번으로 묶어 보냄
+전송 전에 프로세스가 끝나도 작업은 남아 있다가 다음 실행(start) 때 이어서 보냅니다.
+
+    enqueue_tabs(batch)                          SheetsBatch에 넣은 탭들 → 탭별 'tab' 작업 (batch는 비움)
+    enqueue_sections(uploader, tab, sections, replace_section_titles)
+                                                 날짜 탭 섹션 추가·교체 → 'sections' 작업
+    enqueue_rows(spreadsheet_name, sheet_name, rows, credentials, format_header=False)
+                                                 이름으로 여는 스프레드시트의 시트 전체 → 'rows' 작업
+    start()                                      전송 스레드 시작 (프로세스에 하나)
+    deliver(keys, timeout)                       작업이 전송될 때까지 기다림 → 모두 보냈으면 True
+    pending()                                    전송을 기다리는 작업 key
+    process_due()                                지금 보낼 작업을 한 번 전송 (전송 스레드가 반복 호출)
+
+    python sheets_outbox.py                      대기·실패 작업 목록
+    python sheets_outbox.py --drain              대기 작업을 모두 보낼 때까지 (--timeout 초)
+    python sheets_outbox.py --retry-failed       실패 작업을 다시 대기로
+
+저장 위치: SHEETS_OUTBOX_PATH (기본: 프로젝트/.sheets_outbox/outbox.sqlite)
+"""
+from console_utf8 import enable as enable_utf8_console
+
+enable_utf8_console()
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from datetime import date, datetime
+from pathlib import Path
+
+import httplib2
+import numpy as np
+from google.auth.exceptions import TransportError
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+PENDING, FAILED = '대기', '실패'
+
+# 429·5xx·연결 오류 재시도: BASE_DELAY × 2^(시도-1) (429는 QUOTA_DELAY부터), 최대 MAX_DELAY, ±20% 흔들기
+RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+BASE_DELAY = 2.0
+QUOTA_DELAY = 30.0
+MAX_DELAY = 600.0
+MAX_ATTEMPTS = 8
+
+# 대기 작업이 없을 때도 다른 프로세스가 넣은 작업을 보도록 가끔 확인
+IDLE_WAIT = 60.0
+DELIVER_TIMEOUT = 600.0
+
+_local = threading.local()
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_worker = None
+_uploaders = {}
+
+
+def outbox_path() -> Path:
+    return Path(os.getenv('SHEETS_OUTBOX_PATH', '') or PROJECT_ROOT / '.sheets_outbox' / 'outbox.sqlite')
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    path = outbox_path()
+    if conn is None or getattr(_local, 'path', None) != path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # seq: 넣을 때마다 새로 매기는 순번 (전송 순서, 전송 중에 내용이 바뀌었는지 확인)
+        # target: 같은 탭을 가리키는 작업 묶음 (앞 작업이 끝나야 뒤 작업을 보냄)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' key TEXT PRIMARY KEY, seq INTEGER NOT NULL, kind TEXT NOT NULL, target TEXT NOT NULL,'
+            ' payload TEXT NOT NULL, status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,'
+            ' next_at REAL NOT NULL, last_error TEXT, queued_at TEXT NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, seq)')
+        _local.conn, _local.path = conn, path
+    return conn
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def enqueue(kind: str, target: str, payload: dict, key: str | None = None) -> str:
+    """
+    작업 추가 → key. 같은 key가 있으면 새 내용으로 바꾸고 시도 횟수를 처음부터 (대기열 맨 뒤로).
+    'tab' 작업은 탭 전체를 다시 쓰므로 같은 탭의 대기 중인 'sections' 작업은 버림.
+    """
+    key = key or f"{kind}:{target}"
+    body = json.dumps(payload, ensure_ascii=False, default=_json_default)
+    conn = _connect()
+    with conn:
+        if kind == 'tab':
+            conn.execute("DELETE FROM jobs WHERE target = ? AND kind = 'sections' AND status = ?", (target, PENDING))
+        conn.execute(
+            'INSERT INTO jobs (key, seq, kind, target, payload, status, attempts, next_at, last_error, queued_at)'
+            ' VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM jobs), ?, ?, ?, ?, 0, ?, NULL, ?)'
+            ' ON CONFLICT(key) DO UPDATE SET seq = excluded.seq, kind = excluded.kind, target = excluded.target,'
+            ' payload = excluded.payload, status = excluded.status, attempts = 0, next_at = excluded.next_at,'
+            ' last_error = NULL, queued_at = excluded.queued_at',
+            (key, kind, target, body, PENDING, time.time(), datetime.now().isoformat(timespec='seconds')),
+        )
+    _wakeup.set()
+    return key
+
+
+def _credentials(path) -> str | None:
+    return os.path.abspath(path) if path else None
+
+
+def enqueue_tabs(batch) -> list[str]:
+    """SheetsBatch에 모은 탭을 탭별 작업으로 넣고 batch를 비움 → 작업 key 목록"""
+    uploader = batch.uploader
+    spreadsheet_id = uploader.SPREADSHEET_ID
+    credentials = _credentials(getattr(uploader, 'CREDENTIALS_FILE', None))
+    keys = []
+    for title, tab in batch.tabs.items():
+        keys.append(enqueue('tab', f"{spreadsheet_id}/{title}", {
+            'spreadsheet_id': spreadsheet_id, 'credentials': credentials,
+            'title': title, 'rows': tab['rows'], 'sections': tab['sections'],
+        }))
+    batch.tabs = {}
+    return keys
+
+
+def enqueue_sections(uploader, tab_name: str, sections, replace_section_titles=None) -> str:
+    """날짜 탭 섹션 추가·교체 작업 (GoogleSheetsUploader.append_sections_to_tab과 같은 동작) → key"""
+    blocks = [(title, uploader._section_rows(title, df)) for title, df in sections]
+    target = f"{uploader.SPREADSHEET_ID}/{tab_name}"
+    titles = '|'.join(title for title, _ in blocks)
+    return enqueue('sections', target, {
+        'spreadsheet_id': uploader.SPREADSHEET_ID,
+        'credentials': _credentials(getattr(uploader, 'CREDENTIALS_FILE', None)),
+        'tab': tab_name, 'blocks': blocks, 'replace': sorted(replace_section_titles or []),
+    }, key=f"sections:{target}:{titles}")
+
+
+def enqueue_rows(spreadsheet_name: str, sheet_name: str, rows, credentials, format_header: bool = False) -> str:
+    """이름으로 여는(없으면 만드는) 스프레드시트의 시트 전체를 rows로 (quick_stock_check 업로더) → key"""
+    return enqueue('rows', f"{spreadsheet_name}/{sheet_name}", {
+        'spreadsheet_name': spreadsheet_name, 'sheet_name': sheet_name,
+        'credentials': _credentials(credentials), 'rows': rows, 'format_header': format_header,
+    })
+
+
+def status_code(exc) -> int | None:
+    """gspread APIError(response.status_code)·googleapiclient HttpError(resp.status)의 HTTP 상태"""
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'resp', None), 'status', None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc) -> bool:
+    status = status_code(exc)
+    if status is not None:
+        return status in RETRY_STATUS
+    return isinstance(exc, (OSError, TransportError, httplib2.ServerNotFoundError))
+
+
+def retry_delay(attempts: int, status: int | None = None) -> float:
+    """attempts번째 실패 뒤 기다릴 초"""
+    base = QUOTA_DELAY if status == 429 else BASE_DELAY
+    return min(MAX_DELAY, base * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+
+def _sheets_uploader(credentials, spreadsheet_id):
+    """google_sheets_uploader 업로더 (인증 정보·스프레드시트별로 한 번 만듦)"""
+    key = ('sheets', credentials, spreadsheet_id)
+    if key not in _uploaders:
+        from google_sheets_uploader import GoogleSheetsUploader
+
+        uploader = GoogleSheetsUploader(credentials_file=credentials)
+        if not getattr(uploader, 'service', None) or not getattr(uploader, 'gc', None):
+            raise RuntimeError(f"구글 시트 연결 실패 ({uploader.CREDENTIALS_FILE})")
+        uploader.SPREADSHEET_ID = spreadsheet_id
+        _uploaders[key] = uploader
+    return _uploaders[key]
+
+
+def _rows_uploader(credentials):
+    """quick_stock_check 업로더 (스프레드시트를 이름으로 열기)"""
+    key = ('rows', credentials)
+    if key not in _uploaders:
+        from quick_stock_check import GoogleSheetsUploader
+
+        uploader = GoogleSheetsUploader(credentials) if credentials else GoogleSheetsUploader()
+        if not uploader.gc:
+            raise RuntimeError(f"구글 시트 연결 실패 ({uploader.credentials_file})")
+        _uploaders[key] = uploader
+    return _uploaders[key]
+
+
+def _send_tabs(jobs) -> None:
+    from sheets_batch import SheetsBatch
+
+    payload = jobs[0]['payload']
+    batch = SheetsBatch(_sheets_uploader(payload['credentials'], payload['spreadsheet_id']))
+    for job in jobs:
+        batch.put_tab(job['payload']['title'], job['payload']['rows'], sections=job['payload']['sections'])
+    batch.send()
+
+
+def _send_sections(job) -> None:
+    payload = job['payload']
+    uploader = _sheets_uploader(payload['credentials'], payload['spreadsheet_id'])
+    uploader.write_sections(payload['tab'], payload['blocks'], set(payload['replace']))
+
+
+def _send_rows(job) -> None:
+    payload = job['payload']
+    uploader = _rows_uploader(payload['credentials'])
+    uploader.write_rows(payload['spreadsheet_name'], payload['sheet_name'], payload['rows'],
+                        format_header=payload['format_header'])
+
+
+SENDERS = {'sections': _send_sections, 'rows': _send_rows}
+
+
+def _finish(conn, jobs, error=None) -> None:
+    """전송 결과 기록. 보내는 동안 같은 key로 새 내용이 들어왔으면(seq가 바뀜) 그 작업은 그대로 둠."""
+    with conn:
+        for job in jobs:
+            where = (job['key'], job['seq'])
+            if error is None:
+                conn.execute('DELETE FROM jobs WHERE key = ? AND seq = ?', where)
+                continue
+            attempts = job['attempts'] + 1
+            message = f"{type(error).__name__}: {error}"[:500]
+            if is_retryable(error) and attempts < MAX_ATTEMPTS:
+                wait = retry_delay(attempts, status_code(error))
+                conn.execute('UPDATE jobs SET attempts = ?, next_at = ?, last_error = ? WHERE key = ? AND seq = ?',
+                             (attempts, time.time() + wait, message) + where)
+                print(f"[재시도] 구글 시트 {job['target']}: {message} → {wait:.0f}초 뒤 ({attempts}/{MAX_ATTEMPTS})")
+            else:
+                conn.execute('UPDATE jobs SET attempts = ?, status = ?, last_error = ? WHERE key = ? AND seq = ?',
+                             (attempts, FAILED, message) + where)
+                print(f"[오류] 구글 시트 업로드 포기 ({job['target']}): {message}")
+
+
+def process_due() -> float | None:
+    """
+    지금 보낼 수 있는 작업을 한 번 전송 → 다음 작업까지 기다릴 초 (대기 작업이 없으면 None).
+    같은 target의 앞 작업이 재시도를 기다리는 중이면 뒤 작업도 기다림 (순서 유지).
+    """
+    conn = _connect()
+    now = time.time()
+    rows = conn.execute(
+        'SELECT key, seq, kind, target, payload, attempts, next_at FROM jobs WHERE status = ? ORDER BY seq',
+        (PENDING,),
+    ).fetchall()
+    blocked, tabs, others = set(), {}, []
+    for key, seq, kind, target, payload, attempts, next_at in rows:
+        if next_at > now or target in blocked:
+            blocked.add(target)
+            continue
+        job = {'key': key, 'seq': seq, 'kind': kind, 'target': target,
+               'payload': json.loads(payload), 'attempts': attempts}
+        if kind == 'tab':
+            group = (job['payload']['credentials'], job['payload']['spreadsheet_id'])
+            tabs.setdefault(group, []).append(job)
+        else:
+            others.append(job)
+
+    # 탭 전체 작업을 먼저 (같은 탭의 섹션 작업은 항상 그 뒤에 들어온 것)
+    for jobs in tabs.values():
+        try:
+            _send_tabs(jobs)
+        except Exception as e:
+            _finish(conn, jobs, e)
+            blocked.update(job['target'] for job in jobs)
+        else:
+            _finish(conn, jobs)
+            print(f"[대기열] 구글 시트 탭 {len(jobs)}개 전송: {', '.join(j['payload']['title'] for j in jobs)}")
+    for job in others:
+        if job['target'] in blocked:
+            continue
+        try:
+            SENDERS[job['kind']](job)
+        except Exception as e:
+            _finish(conn, [job], e)
+            blocked.add(job['target'])
+        else:
+            _finish(conn, [job])
+            print(f"[대기열] 구글 시트 전송: {job['target']}")
+
+    next_at = conn.execute('SELECT MIN(next_at) FROM jobs WHERE status = ?', (PENDING,)).fetchone()[0]
+    return None if next_at is None else max(0.0, next_at - time.time())
+
+
+def _run() -> None:
+    while True:
+        _wakeup.clear()
+        try:
+            wait = process_due()
+        except Exception:
+            traceback.print_exc()
+            wait = BASE_DELAY
+        _wakeup.wait(IDLE_WAIT if wait is None else min(wait, IDLE_WAIT))
+
+
+def start() -> None:
+    """전송 스레드 시작 (이미 돌고 있으면 깨우기만). 이전 실행에서 남은 작업도 보냄."""
+    global _worker
+    with _lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='sheets-outbox', daemon=True)
+            _worker.start()
+    _wakeup.set()
+
+
+def jobs(keys=None) -> list[dict]:
+    """작업 목록 (keys를 주면 그 작업만, 전송이 끝난 작업은 없음)"""
+    sql = 'SELECT key, kind, target, status, attempts, next_at, last_error, queued_at FROM jobs'
+    rows = _connect().execute(sql + ' ORDER BY seq').fetchall()
+    wanted = set(keys) if keys is not None else None
+    return [
+        dict(zip(('key', 'kind', 'target', 'status', 'attempts', 'next_at', 'last_error', 'queued_at'), row))
+        for row in rows if wanted is None or row[0] in wanted
+    ]
+
+
+def pending() -> list[str]:
+    """전송을 기다리는 작업 key (실패 작업 제외)"""
+    return [job['key'] for job in jobs() if job['status'] == PENDING]
+
+
+def deliver(keys, timeout: float = DELIVER_TIMEOUT) -> bool:
+    """
+    keys 작업이 전송될 때까지 기다림 (전송 스레드). 모두 보냈으면 True.
+    실패했거나 timeout 안에 못 보낸 작업은 대기열에 남아 다음 실행에서 이어서 보냄.
+    """
+    keys = list(keys)
+    if not keys:
+        return True
+    start()
+    deadline = time.monotonic() + timeout
+    while True:
+        left = jobs(keys)
+        waiting = [job for job in left if job['status'] == PENDING]
+        if not waiting:
+            break
+        remaining = deadline - time.monotonic()
+        # 재시도 시각이 마감 뒤인 작업만 남았으면 더 기다리지 않음
+        if remaining <= 0 or min(job['next_at'] for job in waiting) - time.time() > remaining:
+            break
+        time.sleep(min(0.2, remaining))
+
+    failed = [job for job in left if job['status'] == FAILED]
+    if waiting:
+        print(f"[대기열] 구글 시트 작업 {len(waiting)}개 전송 대기 중 (다음 실행 또는 python sheets_outbox.py --drain)")
+    if failed:
+        print(f"[오류] 구글 시트 작업 {len(failed)}개 실패 (python sheets_outbox.py --retry-failed)")
+    return not left
+
+
+def retry_failed() -> int:
+    """실패 작업을 다시 대기로 → 작업 수"""
+    conn = _connect()
+    with conn:
+        count = conn.execute('UPDATE jobs SET status = ?, attempts = 0, next_at = ? WHERE status = ?',
+                             (PENDING, time.time(), FAILED)).rowcount
+    _wakeup.set()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 시트 업로드 대기열")
+    parser.add_argument('--drain', action='store_true', help='대기 작업을 모두 보낼 때까지 전송')
+    parser.add_argument('--timeout', type=float, default=DELIVER_TIMEOUT, help='--drain 최대 대기 초 (기본: %(default)s)')
+    parser.add_argument('--retry-failed', action='store_true', help='실패 작업을 다시 대기로')
+    args = parser.parse_args()
+
+    if args.retry_failed:
+        print(f"실패 작업 {retry_failed()}개를 다시 대기로 돌림")
+    if args.drain:
+        keys = pending()
+        print(f"📤 대기 작업 {len(keys)}개 전송")
+        if not deliver(keys, timeout=args.timeout):
+            return 1
+
+    current = jobs()
+    print(f"📊 대기열 ({outbox_path()}): {len(current)}개")
+    for job in current:
+        when = datetime.fromtimestamp(job['next_at']).strftime('%H:%M:%S')
+        print(f"  [{job['status']}] {job['kind']:8s} {job['target']}  시도 {job['attempts']}회, 다음 {when}")
+        if job['last_error']:
+            print(f"      {job['last_error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
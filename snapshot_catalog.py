@@ -0,0 +1,161 @@
+"""
+전체 종목 스냅샷 목록 (SQLite 색인).
+
+단계마다 폴더를 glob하고 파일 이름·수정 시각으로 "가장 최신 파일"을 따로 찾던 것을 대신합니다.
+save_snapshot이 저장할 때 등록하고, 모든 단계가 같은 조회 함수를 씁니다.
+
+    latest(trading_day=None)   해당 거래일(없으면 전체)의 가장 최근 스냅샷
+    as_of(day)                 day 이전(포함) 거래일 중 가장 최근 스냅샷
+    register(path, rows, ...)  스냅샷 등록 (save_snapshot이 호출)
+    sync()                     폴더에 있지만 등록되지 않은 파일(기존 엑셀 등) 등록
+
+조회 결과는 dict: run_id(YYYYMMDD_HHMM), trading_day, collected_at, path, format, rows, schema_version
+(거래일·수집 시각 색인 조회라 스냅샷 수와 관계없이 파일을 열거하지 않음)
+
+저장 위치: 스냅샷 폴더(STOCK_SNAPSHOT_DIR)/.snapshot_catalog.sqlite
+
+    python snapshot_catalog.py list      등록된 스냅샷
+    python snapshot_catalog.py sync      폴더의 기존 파일 등록
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+from stock_snapshot import SNAPSHOT_PATTERNS, collected_at, snapshot_dir
+
+COLUMNS = ['run_id', 'trading_day', 'collected_at', 'path', 'format', 'rows', 'schema_version']
+
+_local = threading.local()
+
+
+def catalog_path() -> Path:
+    return snapshot_dir() / '.snapshot_catalog.sqlite'
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, 'conn', None)
+    path = catalog_path()
+    if conn is None or getattr(_local, 'path', None) != path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS snapshots ('
+            ' run_id TEXT PRIMARY KEY, trading_day TEXT NOT NULL, collected_at TEXT NOT NULL,'
+            ' path TEXT NOT NULL, format TEXT NOT NULL, rows INTEGER, schema_version INTEGER)'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS snapshots_day ON snapshots (trading_day, collected_at)'
+        )
+        _local.conn, _local.path = conn, path
+        # 처음 만든 색인이면 폴더에 이미 있는 스냅샷(기존 엑셀 포함) 등록
+        if conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0] == 0:
+            sync()
+    return conn
+
+
+def _trading_day(moment: datetime) -> date:
+    from market_calendar import get_last_krx_trading_day
+
+    return get_last_krx_trading_day(moment.date())
+
+
+def register(path, rows: int | None, when: datetime | None = None,
+             trading_day: date | None = None, schema_version: int | None = None,
+             replace: bool = True) -> None:
+    """스냅샷 등록. 같은 run_id가 있으면 replace=True일 때만 교체."""
+    path = Path(path)
+    when = when or collected_at(str(path))
+    trading_day = trading_day or _trading_day(when)
+    verb = 'INSERT OR REPLACE' if replace else 'INSERT OR IGNORE'
+    conn = _connect()
+    with conn:
+        conn.execute(
+            f'{verb} INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (when.strftime('%Y%m%d_%H%M'), trading_day.isoformat(),
+             when.isoformat(timespec='minutes'), str(path.resolve()),
+             path.suffix.lstrip('.'), rows, schema_version),
+        )
+
+
+def sync() -> int:
+    """폴더에 있지만 색인에 없는 스냅샷 파일 등록 (Parquet 먼저, 같은 run_id의 엑셀은 건너뜀)."""
+    conn = _connect()
+    known = {row[0] for row in conn.execute('SELECT path FROM snapshots')}
+    added = 0
+    for pattern in SNAPSHOT_PATTERNS:
+        for path in sorted(glob.glob(str(snapshot_dir() / pattern))):
+            resolved = str(Path(path).resolve())
+            if resolved in known:
+                continue
+            before = conn.total_changes
+            register(path, rows=None, replace=False)
+            added += conn.total_changes - before
+            known.add(resolved)
+    return added
+
+
+def _query(where: str, params: tuple) -> dict | None:
+    """조건에 맞는 최신 스냅샷. 파일이 지워진 항목은 색인에서 빼고 다음 항목을 봄."""
+    conn = _connect()
+    while True:
+        row = conn.execute(
+            f'SELECT {", ".join(COLUMNS)} FROM snapshots {where}'
+            ' ORDER BY trading_day DESC, collected_at DESC LIMIT 1',
+            params,
+        ).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(COLUMNS, row))
+        if os.path.exists(entry['path']):
+            entry['path'] = Path(entry['path'])
+            return entry
+        with conn:
+            conn.execute('DELETE FROM snapshots WHERE run_id = ?', (entry['run_id'],))
+        # Parquet만 지워지고 같은 이름의 엑셀 내보내기가 남아 있으면 그것을 등록
+        export = Path(entry['path']).with_suffix('.xlsx')
+        if export.exists():
+            register(export, rows=entry['rows'], trading_day=date.fromisoformat(entry['trading_day']),
+                     when=datetime.fromisoformat(entry['collected_at']),
+                     schema_version=entry['schema_version'])
+
+
+def latest(trading_day: date | None = None) -> dict | None:
+    """trading_day의 가장 최근 스냅샷 (None이면 전체에서 가장 최근)."""
+    if trading_day is None:
+        return _query('', ())
+    return _query('WHERE trading_day = ?', (trading_day.isoformat(),))
+
+
+def as_of(day: date) -> dict | None:
+    """day 이전(포함) 거래일 중 가장 최근 스냅샷."""
+    return _query('WHERE trading_day <= ?', (day.isoformat(),))
+
+
+def entries() -> list[dict]:
+    rows = _connect().execute(
+        f'SELECT {", ".join(COLUMNS)} FROM snapshots ORDER BY trading_day, collected_at'
+    ).fetchall()
+    return [dict(zip(COLUMNS, row)) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전체 종목 스냅샷 목록")
+    parser.add_argument("command", choices=["list", "sync"])
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        print(f"[OK] 새로 등록한 스냅샷 {sync()}개")
+        return
+
+    print(f"색인 위치: {catalog_path()}")
+    for entry in entries():
+        rows = '-' if entry['rows'] is None else f"{entry['rows']:,}행"
+        print(f"  - {entry['trading_day']} {entry['run_id']} {entry['format']:7s} {rows:>9s}  {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,25 @@
 import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
 import glob
 
-def clean_numeric_data(value):
-    """문자열 숫자 데이터를 float로 변환"""
-    if pd.isna(value) or value == '' or value == 'N/A':
-        return np.nan
-    
-    # 문자열인 경우 처리
-    if isinstance(value, str):
-        # 콤마 제거
-        value = value.replace(',', '')
-        # 음수 처리
-        if value.startswith('-'):
-            try:
-                return -float(value[1:])
-            except:
-                return np.nan
-        # 양수 처리
-        try:
-            return float(value)
-        except:
-            return np.nan
-    
-    return float(value) if not pd.isna(value) else np.nan
+from stock_schema import change_rate, numeric
 
-def calculate_volume_change(current_volume, prev_volume):
-    """거래량 변화율 계산"""
-    try:
-        current = clean_numeric_data(current_volume)
-        prev = clean_numeric_data(prev_volume)
-        
-        if pd.isna(current) or pd.isna(prev) or prev == 0:
-            return np.nan
-        
-        change_rate = ((current - prev) / prev) * 100
-        return change_rate
-    except:
-        return np.nan
-
-def calculate_price_change(current_price, prev_price):
-    """주가 변화율 계산"""
-    try:
-        current = clean_numeric_data(current_price)
-        prev = clean_numeric_data(prev_price)
-        
-        if pd.isna(current) or pd.isna(prev) or prev == 0:
-            return np.nan
-        
-        change_rate = ((current - prev) / prev) * 100
-        return change_rate
-    except:
-        return np.nan
 
 def analyze_contrarian_stocks(df):
     """역발상 투자 전략 분석"""
     print("=== 역발상 투자 전략 분석 시작 ===\n")
     
     # 데이터 클리닝
-    df['PER_clean'] = df['PER'].apply(clean_numeric_data)
-    df['PBR_clean'] = df['PBR'].apply(clean_numeric_data)
-    df['ROE_clean'] = df['ROE'].apply(clean_numeric_data)
+    df['PER_clean'] = numeric(df['PER'])
+    df['PBR_clean'] = numeric(df['PBR'])
+    df['ROE_clean'] = numeric(df['ROE'])
     
     # 거래량 변화율 계산
-    df['volume_change'] = df.apply(lambda x: calculate_volume_change(x['거래량'], x['전일거래량']), axis=1)
+    df['volume_change'] = change_rate(df['거래량'], df['전일거래량'])
     
     # 주가 변화율 계산
-    df['price_change'] = df.apply(lambda x: calculate_price_change(x['현재가'], x['전일종가']), axis=1)
+    df['price_change'] = change_rate(df['현재가'], df['전일종가'])
     
     print("1. 전체 데이터 현황:")
     print(f"   - 총 종목 수: {len(df)}")
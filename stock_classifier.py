@@ -0,0 +1,167 @@
+"""
+일반 주식 판별 (ETF·ETN·펀드·채권·스팩 제외).
+
+is_regular_stock(name)
+    종목명만으로 판별. 키워드 목록을 종류별 정규식 하나로 묶어 미리 컴파일해 두므로
+    키워드 수와 관계없이 종목명마다 정규식 몇 번만 검사합니다.
+    (quick_stock_check·daily_rebound_analysis·stock_crawler가 같은 규칙을 씀)
+
+UniverseRegistry / classify(code, name)
+    종목코드 → (종목명, 판정)을 파일에 저장해 두고, 새로 상장했거나 이름이 바뀐 종목만
+    다시 판별합니다. 규칙(키워드 목록)이 바뀌면 저장된 판정은 모두 버립니다.
+    저장 위치: STOCK_UNIVERSE_PATH (기본: 프로젝트/.stock_universe/verdicts.json)
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# 명백한 ETF/펀드 브랜드명들 (종목명 시작)
+ETF_BRANDS = [
+    'KODEX', 'TIGER', 'KBSTAR', 'KOSEF', 'KINDEX', 'ARIRANG', 'HANARO',
+    'RISE', 'ACE', 'KIWOOM', 'PLUS', 'SOL', 'WON', '1Q', 'ITF', 'BNK',
+    'FOCUS', 'TREX', 'HK', '파워', '마이티', 'DAISHIN343', '아이엠에셋',
+    'KCGI', 'KB발해인프라', '맥쿼리인프라', '맵스리얼티', '한국ANKOR유전'
+]
+
+# 종목명 어디에든 있으면 제외하는 키워드
+EXCLUDE_KEYWORDS = [
+    # ETF/펀드 관련
+    'ETF', 'ETN', 'REIT', '리츠', '펀드',
+    '채권', '통안채', '물가채', '금융채', '국고채', '회사채',
+    '단기자금', '단기통안채', '단기금융채', '액티브',
+    # 투자 관련 (일반 주식에는 없는)
+    '인덱스', '합성', '선물', '옵션', '인버스', '레버리지',
+    '커버드콜', '위클리커버드콜', '데일리커버드콜', '고정커버드콜',
+    'TOP', 'Plus', 'TR', '포커스', '테마', '밸류', '성장', '소부장',
+    # 지수 관련
+    'S&P', 'MSCI', 'CSI', 'FTSE', 'Nikkei', 'DAX', 'NASDAQ', 'SOLACTIVE', 'KRX',
+    # SPAC (특수목적인수회사), 예: 엔에이치스팩29호
+    '스팩', 'SPAC', '목적', '인수회사', '특수목적',
+    # 고배당 테마 상품, 기타 투자회사
+    '고배당', '투자회사', '자산운용',
+]
+
+# 국가/지역 + 투자 테마 단어가 함께 있으면 해외투자 상품으로 보고 제외
+COUNTRY_KEYWORDS = ['미국', '중국', '일본', '독일', '인도', '글로벌', '아시아', '유로']
+COUNTRY_THEME_WORDS = ['배당', '성장', '테크', '반도체', '나스닥']
+
+# 증권사 운용 상품 (종목명에 증권·금융·은행이 있으면 실제 회사 주식으로 보고 유지)
+SECURITIES_PRODUCTS = [
+    'NH투자', 'SK증권', '메리츠', '미래에셋', '삼성선물', '신한투자',
+    '유안타', '유진투자', '키움', '하나금융', '한화투자',
+    'KB증권', 'IBK투자', '교보증권', '대신증권', '현대차증권'
+]
+SECURITIES_COMPANY_WORDS = ['증권', '금융', '은행']
+
+# '배당' + 테마 단어 (TOP·Plus·성장은 EXCLUDE_KEYWORDS에도 있음)
+DIVIDEND_THEME_WORDS = ['TOP', 'Plus', '성장', '킹']
+
+
+def _any_of(words) -> re.Pattern:
+    # 긴 키워드 먼저 (결과는 같지만 겹치는 접두어에서 되돌아가는 횟수가 줄어듦)
+    return re.compile('|'.join(re.escape(w) for w in sorted(set(words), key=len, reverse=True)))
+
+
+_BRAND_PREFIX = re.compile('(?:' + _any_of(ETF_BRANDS).pattern + ')')
+_EXCLUDE = _any_of(EXCLUDE_KEYWORDS)
+_COUNTRY = _any_of(COUNTRY_KEYWORDS)
+_COUNTRY_THEME = _any_of(COUNTRY_THEME_WORDS)
+_SECURITIES = _any_of(SECURITIES_PRODUCTS)
+_SECURITIES_COMPANY = _any_of(SECURITIES_COMPANY_WORDS)
+_DIVIDEND_THEME = _any_of(DIVIDEND_THEME_WORDS)
+
+# 규칙이 바뀌면 저장된 판정을 다시 계산하도록 키워드 목록의 해시를 함께 저장
+RULES_VERSION = hashlib.sha256(json.dumps([
+    ETF_BRANDS, EXCLUDE_KEYWORDS, COUNTRY_KEYWORDS, COUNTRY_THEME_WORDS,
+    SECURITIES_PRODUCTS, SECURITIES_COMPANY_WORDS, DIVIDEND_THEME_WORDS,
+], ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+def is_regular_stock(name):
+    """
+    일반 주식인지 판단하는 함수
+    ETF, 펀드, 채권 등을 제외하고 순수 주식 종목만 선별
+    """
+    if _BRAND_PREFIX.match(name) or _EXCLUDE.search(name):
+        return False
+    if _COUNTRY.search(name) and _COUNTRY_THEME.search(name):
+        return False
+    if _SECURITIES.search(name) and not _SECURITIES_COMPANY.search(name):
+        return False
+    if '배당' in name and _DIVIDEND_THEME.search(name):
+        return False
+    return True
+
+
+def universe_path() -> Path:
+    return Path(os.getenv('STOCK_UNIVERSE_PATH', '') or PROJECT_ROOT / '.stock_universe' / 'verdicts.json')
+
+
+class UniverseRegistry:
+    """종목코드별 판정 저장소. 코드와 종목명이 저장된 것과 같으면 판별 없이 저장값을 돌려줌."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else universe_path()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.verdicts = self._load()
+
+    def _load(self) -> dict:
+        try:
+            stored = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if stored.get('rules') != RULES_VERSION:
+            return {}
+        return stored.get('verdicts', {})
+
+    def is_regular(self, code, name) -> bool:
+        if not code:
+            return is_regular_stock(name)
+        code = str(code).replace('.0', '').zfill(6)
+        entry = self.verdicts.get(code)
+        if entry is not None and entry[0] == name:
+            return entry[1]
+        verdict = is_regular_stock(name)
+        with self._lock:
+            self.verdicts[code] = [name, verdict]
+            self._dirty = True
+        return verdict
+
+    def save(self) -> None:
+        """변경이 있을 때만 저장 (임시 파일에 쓴 뒤 교체)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({'rules': RULES_VERSION, 'verdicts': self.verdicts}, ensure_ascii=False)
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(payload, encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_registry() -> UniverseRegistry:
+    """프로세스 공용 저장소 (종료 시 변경분 저장)."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = UniverseRegistry()
+                atexit.register(_default.save)
+    return _default
+
+
+def classify(code, name) -> bool:
+    """종목코드·종목명으로 일반 주식 여부 (공용 저장소 사용)."""
+    return default_registry().is_regular(code, name)
@@ -1,14 +1,16 @@
 import os
 import time
 from datetime import datetime
-import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 import schedule
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
+import http_client
+from html_parser import make_soup
+from stock_classifier import classify, is_regular_stock
+
 # Load environment variables
 load_dotenv()
 
@@ -19,69 +21,17 @@ SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
 BASE_URL = "https://finance.naver.com/sise/sise_market_sum.naver"
 
 class StockCrawler:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    
     @staticmethod
     def is_regular_stock(stock_name):
-        """주식 종목 필터링 함수"""
-        # 금융상품 접두어/접미어 패턴 (증권사 이름 + 상품 식별자)
-        product_patterns = [
-            # 증권사 이름
-            '삼성', 'SAMSUNG', '키움', 'KIWOOM',
-            '미래에셋', '한국투자', 'NH투자', 'KB',
-            '메리츠', '신한', '하나', 'SK',
-            '대신', '유안타', '현대차', '교보',
-            'IBK', '유진', '이베스트', '신영',
-            'DB', '한화', 'BNK', '부국',
-            '케이프', '카카오페이', '토스', '다올',
-            'KTB', '하이', 'DS', '리딩',
-            '비엔케이', '아이비케이'
-        ]
-        
-        # 금융상품 식별자
-        product_identifiers = [
-            'ETF', 'ETN', '채권', '펀드',
-            '인버스', '레버리지', '선물', '옵션',
-            'KOSPI', 'KOSDAQ', '나스닥',
-            '배당주', '액티브', '합성',
-            'TIGER', 'KODEX', 'KBSTAR', 'ARIRANG', 'HANARO',
-            'KOSEF', 'KINDEX', 'TIMEFOLIO', 'MASTER'
-        ]
-        
-        # 채권 관련 키워드
-        bond_keywords = [
-            '국고채', '국채', '통안채', '회사채', '공채', '국공채'
-        ]
-        
-        stock_name = stock_name.upper()
-        
-        # 1. 채권 관련 상품 제외
-        if any(keyword.upper() in stock_name for keyword in bond_keywords):
-            return False
-            
-        # 2. 증권사 금융상품 패턴 확인
-        # 증권사 이름과 상품 식별자가 모두 포함된 경우에만 제외
-        for company in product_patterns:
-            if company.upper() in stock_name:
-                if any(identifier.upper() in stock_name for identifier in product_identifiers):
-                    return False
-        
-        # 3. 일반적인 금융상품 식별자 확인
-        if any(identifier.upper() in stock_name for identifier in product_identifiers):
-            return False
-        
-        return True
+        """주식 종목 필터링 함수 (규칙: stock_classifier)"""
+        return is_regular_stock(stock_name)
 
     def get_financial_ratios(self, stock_code):
         """개별 종목의 PER, PBR, ROE, 영업이익, 영업이익증가율 정보를 가져오는 함수"""
         url = f"https://finance.naver.com/item/main.naver?code={stock_code}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(http_client.fetch_text(url))
             
             # 재무비율 데이터 초기화
             financial_data = {
@@ -145,8 +95,7 @@ class StockCrawler:
         url = f"https://finance.naver.com/item/sise_day.naver?code={stock_code}"
         
         try:
-            response = requests.get(url, headers=self.headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(http_client.fetch_text(url))
             
             # 일별 시세 테이블 찾기
             table = soup.find('table', {'class': 'type2'})
@@ -193,8 +142,7 @@ class StockCrawler:
                 url = f"{BASE_URL}?{market}&page={page}"
                 print(f"\n{market_name} 페이지 {page} 처리 중...")
                 
-                response = requests.get(url, headers=self.headers)
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(http_client.fetch_text(url))
                 
                 # 테이블에서 종목 데이터 추출
                 table = soup.select_one('table.type_2')
@@ -246,7 +194,7 @@ class StockCrawler:
                         processed_count += 1
                         
                         # 일반 주식 필터링
-                        if self.is_regular_stock(name):
+                        if classify(code, name):
                             filtered_data.append(stock_data)
                             print(f"  - 일반 주식으로 필터링됨")
                         else:
@@ -258,8 +206,6 @@ class StockCrawler:
                 
                 print(f"\n{market_name} 페이지 {page} 완료 (처리된 종목: {processed_count}개)")
                 page += 1
-                print("잠시 대기 중... (서버 부하 방지)")
-                time.sleep(1)  # 서버 부하 방지
         
         print(f"\n전체 수집 완료!")
         print(f"- 전체 종목 수: {len(all_data)}개")
@@ -2,6 +2,8 @@
 import pandas as pd
 import numpy as np
 
+from stock_schema import numeric
+
 # 수집/저장 시 컬럼 순서 (전일거래대금은 거래대금 바로 다음)
 STOCK_DATA_COLUMN_ORDER = [
     '종목명', '종목코드', '시장구분', '업종',
@@ -74,41 +76,68 @@ def ensure_trading_amount_columns(df: pd.DataFrame) -> pd.DataFrame:
     return reorder_stock_data_columns(out)
 
 
+def _empty_mask(series: pd.Series) -> pd.Series:
+    """_is_empty의 열 단위 버전 (None·NaN·공백 문자열)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.isna()
+    blank = series.astype('string').str.strip().eq('').fillna(False).astype(bool)
+    return series.isna() | blank
+
+
+def trading_amounts(price: pd.Series, volume: pd.Series) -> pd.Series:
+    """calc_trading_amount의 열 단위 버전 (float64, 계산할 수 없으면 NaN)."""
+    p = numeric(price)
+    v = numeric(volume)
+    return np.rint(p * v).where((p > 0) & (v > 0))
+
+
+def _round2(values: pd.Series) -> pd.Series:
+    """
+    round(x, 2)와 같은 결과. Series.round(2)는 x*100을 정수로 반올림하므로 .5 경계 바로 옆 값에서
+    파이썬 round와 한 자리 다를 수 있어, 그런 값만 파이썬 round로 다시 계산.
+    """
+    rounded = values.round(2)
+    scaled = values * 100
+    near_tie = (scaled - np.floor(scaled) - 0.5).abs() <= scaled.abs() * 1e-12 + 1e-9
+    if near_tie.any():
+        rounded[near_tie] = values[near_tie].map(lambda x: round(x, 2))
+    return rounded
+
+
+def change_rates_pct(current: pd.Series, previous: pd.Series) -> pd.Series:
+    """calc_change_rate_pct의 열 단위 버전 (계산할 수 없으면 '' 대신 NaN)."""
+    cur = numeric(current)
+    prev = numeric(previous)
+    return _round2((cur - prev) / prev * 100).where(cur.notna() & prev.notna() & (prev != 0))
+
+
+def _fill_amount_column(out: pd.DataFrame, target: str, price_col: str, volume_col: str) -> None:
+    """target 열의 빈 칸만 price*volume으로 채움 (out을 직접 수정)."""
+    if price_col not in out.columns or volume_col not in out.columns:
+        return
+    amounts = trading_amounts(out[price_col], out[volume_col])
+    fill = _empty_mask(out[target]) & amounts.notna()
+    if not fill.any():
+        return
+    column = out[target]
+    if pd.api.types.is_float_dtype(column):
+        out[target] = column.mask(fill, amounts)
+    else:
+        # 문자열이 섞인 열: 채운 칸은 행 단위 계산과 같이 파이썬 int
+        column = column.astype(object)
+        column[fill] = amounts[fill].astype('int64').astype(object)
+        out[target] = column
+
+
 def fill_trading_amounts_df(df: pd.DataFrame) -> pd.DataFrame:
-    """거래대금·전일거래대금이 비어 있으면 종가*거래량으로 채움."""
+    """거래대금·전일거래대금이 비어 있으면 종가*거래량으로 채움 (열 단위 계산)."""
     if df is None or len(df) == 0:
         return df
 
     out = ensure_trading_amount_columns(df)
-
-    if '거래대금' in out.columns:
-        for idx in out.index:
-            if _is_empty(out.at[idx, '거래대금']):
-                val = calc_trading_amount(
-                    out.at[idx, '현재가'] if '현재가' in out.columns else None,
-                    out.at[idx, '거래량'] if '거래량' in out.columns else None,
-                )
-                if val is not None:
-                    out.at[idx, '거래대금'] = val
-
-    if '전일거래대금' in out.columns:
-        for idx in out.index:
-            if _is_empty(out.at[idx, '전일거래대금']):
-                val = calc_trading_amount(
-                    out.at[idx, '전일종가'] if '전일종가' in out.columns else None,
-                    out.at[idx, '전일거래량'] if '전일거래량' in out.columns else None,
-                )
-                if val is not None:
-                    out.at[idx, '전일거래대금'] = val
-
-    rates = []
-    for idx in out.index:
-        rate = calc_change_rate_pct(
-            out.at[idx, '거래대금'] if '거래대금' in out.columns else None,
-            out.at[idx, '전일거래대금'] if '전일거래대금' in out.columns else None,
-        )
-        rates.append(np.nan if rate == '' else rate)
-    out['거래대금증감율'] = rates
+    _fill_amount_column(out, '거래대금', '현재가', '거래량')
+    _fill_amount_column(out, '전일거래대금', '전일종가', '전일거래량')
+    out['거래대금증감율'] = change_rates_pct(out['거래대금'], out['전일거래대금'])
 
     return reorder_stock_data_columns(out)
 
@@ -0,0 +1,67 @@
+"""
+전체 종목 데이터 열 스키마 (dtype).
+
+수집기는 값을 문자열('' = 없음)로 모으므로, 스냅샷으로 저장하기 전에 한 번만 숫자로 바꿔
+dtype을 고정합니다. 분석 단계는 바로 계산할 수 있는 float64 열을 받고, 셀마다 문자열을
+다시 파싱하지 않습니다.
+
+    coerce_stock_frame(df)        스키마 적용: 숫자 열 float64(결측 NaN), 문자 열 string(결측 <NA>), 종목코드 6자리
+    numeric(series)               열 하나를 float64로 (이미 숫자 dtype이면 변환만) — 구 엑셀 등 입력용
+    change_rate(current, prev)    (당일 - 전일) / 전일 * 100, 전일이 0이거나 없으면 NaN
+
+숫자 열은 모두 float64입니다. Int64(nullable)는 비교 결과에 <NA>가 섞여 기존 분석 코드의
+if 조건에서 오류가 나므로 쓰지 않습니다 (거래량·가격은 2^53 미만이라 float64로 정확히 표현됨).
+"""
+import pandas as pd
+
+NUMERIC_COLUMNS = [
+    '현재가', '전일종가', '거래량', '전일거래량', '거래량증감율',
+    '거래대금', '전일거래대금', '거래대금증감율',
+    'PER', 'PBR', 'ROE', '시가총액',
+    '매출액', '영업이익', '당기순이익', '부채비율', '유보율',
+    '배당수익률', '배당금', '52주최고', '52주최저',
+    '외국인비율', '기관비율', '베타',
+]
+TEXT_COLUMNS = ['종목명', '종목코드', '시장구분', '업종', '수집일자']
+
+
+def numeric(series: pd.Series) -> pd.Series:
+    """
+    문자열 숫자('1,234', '-5.2', '', 'N/A') → float64, 변환할 수 없는 값은 NaN.
+    이미 숫자 dtype인 열은 문자열을 거치지 않습니다.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64')
+    text = series.astype('string').str.replace(',', '', regex=False).str.strip()
+    text = text.mask(text.eq(''))
+    try:
+        # 숫자·빈 값만 있는 열은 한 번에 변환 (to_numeric보다 몇 배 빠름)
+        return text.astype('float64')
+    except (TypeError, ValueError):
+        return pd.to_numeric(text, errors='coerce').astype('float64')
+
+
+def change_rate(current, previous) -> pd.Series:
+    """증감율(%) = (당일 - 전일) / 전일 * 100. 전일이 0이거나 결측이면 NaN."""
+    cur = numeric(current)
+    prev = numeric(previous)
+    return ((cur - prev) / prev.where(prev != 0)) * 100
+
+
+def coerce_stock_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """수집 결과(또는 구 엑셀)에 스키마 적용한 복사본. 스키마에 없는 열은 그대로."""
+    if df is None:
+        return df
+    out = df.copy()
+    for col in NUMERIC_COLUMNS:
+        if col in out.columns:
+            out[col] = numeric(out[col])
+    for col in TEXT_COLUMNS:
+        if col in out.columns:
+            text = out[col].astype('string').str.strip()
+            empty = text.eq('')
+            if col == '종목코드':
+                # 엑셀을 거치며 정수(5930)나 실수(5930.0)가 된 코드 복원
+                text = text.str.replace(r'\.0$', '', regex=True).str.zfill(6)
+            out[col] = text.mask(empty)
+    return out
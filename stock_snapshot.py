@@ -0,0 +1,106 @@
+"""
+전체 종목 스냅샷 (수집 → 분석 단계 간 전달 파일).
+
+quick_stock_check가 수집 결과를 Parquet로 저장하고, 역발상·20일선·리바운드·구글 시트 업로드·
+주간 분석 단계는 load_snapshot()으로 읽습니다. 엑셀(openpyxl)보다 읽기/쓰기가 수십~수백 배 빠르고
+dtype이 유지됩니다 (stock_schema: 숫자 열 float64, 종목코드 '005930' 문자열).
+엑셀은 사람이 열어 보는 용도의 선택 출력입니다 (quick_stock_check.py --excel).
+
+    save_snapshot(df, excel=False)   full_stock_data_detailed_YYYYMMDD_HHMM.parquet (+ .xlsx), 목록에 등록
+    load_snapshot(path=None)         path가 없으면 가장 최근 스냅샷. 기존 .xlsx도 읽음
+    find_latest_snapshot()           가장 최근 스냅샷 경로 (snapshot_catalog 조회)
+
+저장 위치: STOCK_SNAPSHOT_DIR (기본: 현재 폴더, 기존 엑셀과 같은 위치)
+"""
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from stock_schema import coerce_stock_frame
+
+SNAPSHOT_PREFIX = 'full_stock_data_detailed'
+SNAPSHOT_PATTERNS = ['full_stock_data*.parquet', 'full_stock_data*.xlsx']
+# 스냅샷 열 구성이 바뀌면 올림 (snapshot_catalog에 함께 기록)
+SNAPSHOT_SCHEMA_VERSION = 2
+
+_STAMP = re.compile(r'(\d{8}_\d{4})')
+
+
+def snapshot_dir() -> Path:
+    return Path(os.getenv('STOCK_SNAPSHOT_DIR', '') or '.')
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    object 열을 Parquet로 쓸 수 있게 정리.
+    '' → 결측 (엑셀 빈 셀과 같음), 숫자만 남은 열은 숫자 dtype, 문자열·숫자가 섞인 열은 문자열.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if not pd.api.types.is_object_dtype(out[col]) and not pd.api.types.is_string_dtype(out[col]):
+            continue
+        values = out[col].mask(out[col].eq(''))
+        present = values.dropna()
+        kinds = {type(v) for v in present}
+        if kinds and all(issubclass(k, (int, float)) and not issubclass(k, bool) for k in kinds):
+            out[col] = pd.to_numeric(values)
+        elif kinds == {str} or not kinds:
+            out[col] = values
+        else:
+            out[col] = values.map(lambda v: v if pd.isna(v) else str(v))
+    return out
+
+
+def save_snapshot(df: pd.DataFrame, excel: bool = False, when: datetime | None = None) -> Path:
+    """스냅샷 저장·목록 등록 후 Parquet 경로 반환. excel=True면 같은 이름의 .xlsx도 저장."""
+    import snapshot_catalog
+
+    when = when or datetime.now()
+    stamp = when.strftime('%Y%m%d_%H%M')
+    path = snapshot_dir() / f'{SNAPSHOT_PREFIX}_{stamp}.parquet'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _arrow_safe(coerce_stock_frame(df)).to_parquet(path, index=False)
+    if excel:
+        df.to_excel(path.with_suffix('.xlsx'), index=False)
+    snapshot_catalog.register(path, rows=len(df), when=when.replace(second=0, microsecond=0),
+                              schema_version=SNAPSHOT_SCHEMA_VERSION)
+    return path
+
+
+def collected_at(path: str) -> datetime:
+    """파일 이름의 YYYYMMDD_HHMM, 없으면 수정 시각"""
+    match = _STAMP.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.strptime(match.group(1), '%Y%m%d_%H%M')
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def find_latest_snapshot() -> Path | None:
+    """가장 최근 수집 스냅샷 (Parquet 우선, 없으면 기존 full_stock_data*.xlsx)."""
+    import snapshot_catalog
+
+    entry = snapshot_catalog.latest()
+    return entry['path'] if entry else None
+
+
+def load_snapshot(path=None) -> pd.DataFrame | None:
+    """
+    스냅샷 읽기 (.parquet / .feather / .xlsx). path가 없으면 최신 스냅샷, 없으면 None.
+    스키마(stock_schema)를 적용해 반환 — 이미 타입이 있는 Parquet는 변환 없이 통과, 구 엑셀은 여기서 숫자로 변환.
+    """
+    path = Path(path) if path else find_latest_snapshot()
+    if path is None:
+        return None
+    if path.suffix == '.parquet':
+        df = pd.read_parquet(path)
+    elif path.suffix == '.feather':
+        df = pd.read_feather(path)
+    else:
+        df = pd.read_excel(path)
+    return coerce_stock_frame(df)
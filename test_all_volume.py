@@ -1,15 +1,14 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import re
 from quick_stock_check import get_stock_volumes
 
 def get_main_page_volume(code):
     """메인 페이지에서 거래량 추출 시도"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
     
     try:
         url = f'https://finance.naver.com/item/main.naver?code={code}'
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # 모든 td 요소 가져오기
@@ -39,11 +38,10 @@ def get_main_page_volume(code):
 
 def get_daily_volume(code):
     """일별 시세 페이지에서 거래량 추출 시도"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
     
     try:
         url = f'https://finance.naver.com/item/sise_day.naver?code={code}'
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # 데이터 행 찾기
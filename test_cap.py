@@ -1,14 +1,13 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import re
 
 def extract_market_cap(code):
     """종목의 실제 시가총액 추출"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     url = f'https://finance.naver.com/item/main.naver?code={code}'
     
     try:
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # 시가총액 추출 (1)
@@ -1,8 +1,8 @@
-import gspread
-from google.oauth2.service_account import Credentials
 import pandas as pd
 from datetime import datetime
 
+import sheets_client
+
 def test_google_sheets():
     """구글 시트 연결 테스트"""
     
@@ -13,8 +13,8 @@ def test_google_sheets():
             'https://www.googleapis.com/auth/drive'
         ]
         
-        creds = Credentials.from_service_account_file('credentials.json', scopes=scope)
-        gc = gspread.authorize(creds)
+        # SHEETS_API_BASE를 주면 sheets_emulator.py 로컬 서버로 (인증 파일 불필요)
+        gc = sheets_client.authorize('credentials.json', scope)
         
         print("✅ 구글 시트 인증 성공!")
         
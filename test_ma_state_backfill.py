@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+import pandas as pd
+
+import ma_state
+import ohlcv_store
+from price_history import HISTORY_COLUMNS
+
+
+def fake_daily_history(code, days=400):
+    """네트워크 없이 days개 영업일 일봉 (종가는 날짜로 정해져 lookback이 달라도 겹치는 날은 같은 값)"""
+    dates = pd.bdate_range(end='2024-06-28', periods=days)
+    closes = 10000.0 + (dates - pd.Timestamp('2020-01-01')).days.to_numpy()
+    return pd.DataFrame({
+        'date': dates, 'open': closes, 'high': closes, 'low': closes,
+        'close': closes, 'volume': 1000,
+    })[HISTORY_COLUMNS]
+
+
+def test_refresh_after_longer_backfill():
+    """update(40) → refresh → update(400) → refresh 뒤 상태가 400봉으로 다시 만들어지는지 확인"""
+    code = '005930'
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['OHLCV_STORE_PATH'] = os.path.join(tmp, 'ohlcv.sqlite')
+        original = ohlcv_store.get_daily_history
+        ohlcv_store.get_daily_history = fake_daily_history
+        try:
+            ohlcv_store.update(code, 40)
+            state = ma_state.refresh([code])[code]
+            assert state.bars == 40
+
+            ohlcv_store.update(code, 400)
+            state = ma_state.refresh([code])[code]
+            closes = ohlcv_store.load([code], 400)[code]['close']
+            assert state.bars == len(closes) == 400
+            assert abs(state.average(360) - closes.rolling(360).mean().iloc[-1]) < 1e-6
+            assert abs(state.average(45) - closes.rolling(45).mean().iloc[-1]) < 1e-6
+            return state
+        finally:
+            ohlcv_store.get_daily_history = original
+            os.environ.pop('OHLCV_STORE_PATH', None)
+            ohlcv_store._local.__dict__.clear()
+            ma_state._local.__dict__.clear()
+
+
+if __name__ == "__main__":
+    state = test_refresh_after_longer_backfill()
+    print(f"봉 수: {state.bars}")
+    print(f"MA360: {state.average(360):.1f}")
+    print(f"MA45: {state.average(45):.1f}")
+    print("이력을 더 길게 다시 받은 뒤 이동평균 상태가 새로 만들어졌습니다")
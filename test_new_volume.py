@@ -1,15 +1,14 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import re
 
 def get_stock_volumes(code):
     """네이버 금융 외국인 거래 페이지에서 거래량 정보 추출"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
     
     try:
         # 외국인 거래 페이지 URL
         url = f'https://finance.naver.com/item/frgn.naver?code={code}'
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         
         # EUC-KR 인코딩 처리
         response.encoding = 'euc-kr'  
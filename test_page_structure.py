@@ -1,14 +1,13 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 
 def analyze_page_structure(code):
     """네이버 금융 외국인 거래 페이지의 HTML 구조 분석"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
     
     try:
         # 외국인 거래 페이지 URL
         url = f'https://finance.naver.com/item/frgn.naver?code={code}'
-        response = requests.get(url, headers=headers)
+        response = http_client.get(url)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # 페이지 인코딩 확인
@@ -1,4 +1,4 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import re
 
@@ -32,10 +32,9 @@ def extract_financial_value(value):
 def check_samsung_profit_data():
     """삼성전자 영업이익 및 당기순이익 데이터 확인"""
     code = "005930"
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'}
     
     url = f'https://finance.naver.com/item/main.naver?code={code}'
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url)
     soup = BeautifulSoup(response.text, 'html.parser')
     
     # 재무지표 영역의 모든 테이블 검색
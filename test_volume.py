@@ -1,9 +1,8 @@
-import requests
+import http_client
 from bs4 import BeautifulSoup
 
-headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
 url = 'https://finance.naver.com/item/main.naver?code=005930'
-response = requests.get(url, headers=headers)
+response = http_client.get(url)
 soup = BeautifulSoup(response.text, 'html.parser')
 
 # 현재가 추출 테스트
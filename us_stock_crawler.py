@@ -3,12 +3,12 @@ import time
 from datetime import datetime
 import yfinance as yf
 import pandas as pd
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from dotenv import load_dotenv
 import schedule
 import requests
 
+import sheets_client
+
 # Load environment variables
 load_dotenv()
 
@@ -82,9 +82,7 @@ def get_stock_data(symbols):
 def update_google_sheets(df):
     """Google Sheets API를 사용하여 데이터를 업데이트하는 함수"""
     try:
-        credentials = service_account.Credentials.from_service_account_file(
-            CREDENTIALS_FILE, scopes=SCOPES)
-        service = build('sheets', 'v4', credentials=credentials)
+        service = sheets_client.build_service(CREDENTIALS_FILE, SCOPES)
         
         # 현재 날짜로 시트 이름 생성
         date_str = datetime.now().strftime('%Y-%m-%d')